@@ -0,0 +1,51 @@
+"""
+Compare the runtime of the per column Kolmogorov-Smirnov tests with the batched tests of NumericalStatisticalCheck.
+
+    PYTHONPATH=. python benchmarks/benchmark_kolmogorov_smirnov.py --rows 100000 --columns 400 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.checks.statistical_checks.numerical_statistical_check import kolmogorov_smirnov_test, \
+    kolmogorov_smirnov_tests
+
+
+def measure(function, repetitions):
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return min(durations), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repetitions', type=int, default=3)
+    arguments = parser.parse_args()
+
+    random = np.random.RandomState(0)
+    df1 = pd.DataFrame(random.normal(0, 1, (arguments.rows, arguments.columns)))
+    df2 = pd.DataFrame(random.normal(0.01, 1, (arguments.rows, arguments.columns)))
+    columns = list(df1.columns)
+    # import scipy.stats before measuring
+    kolmogorov_smirnov_test(df1[0], df2[0])
+
+    per_column, expected = measure(lambda: [kolmogorov_smirnov_test(df1[c], df2[c]) for c in columns],
+                                   arguments.repetitions)
+    print("per column:           {:8.3f}s".format(per_column))
+    for workers in sorted({1, arguments.workers}):
+        batched, pvalues = measure(lambda: kolmogorov_smirnov_tests(df1, df2, columns, workers),
+                                   arguments.repetitions)
+        print("batched, {:2d} workers: {:8.3f}s ({:.1f}x, max p-value difference {:.1e})".format(
+            workers, batched, per_column / batched, np.nanmax(np.abs(np.subtract(pvalues, expected)))))
+
+
+if __name__ == '__main__':
+    main()
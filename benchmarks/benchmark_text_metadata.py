@@ -0,0 +1,55 @@
+"""
+Compare the runtime of the per text metadata functions of the cheap text metadata types with their metadata_batch,
+which TextMetadata uses and which is vectorized where that pays off.
+
+    PYTHONPATH=. python benchmarks/benchmark_text_metadata.py --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from shift_detector.precalculations.text_metadata import NumCharsMetadata, RatioUppercaseLettersMetadata, \
+    NumWordsMetadata, DistinctWordsRatioMetadata, UniqueWordsRatioMetadata
+from shift_detector.precalculations.text_precalculation import TokenizeIntoLowerWordsPrecalculation
+
+
+def measure(function, repetitions):
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return min(durations), result
+
+
+def random_texts(rows, random):
+    vocabulary = np.array(['word', 'Text', 'metadata', 'Shift', 'detector', 'über', 'ÉCOLE', 'data', '42', 'a'] +
+                          ['w{}'.format(i) for i in range(10000)], dtype=object)
+    lengths = random.randint(0, 30, rows)
+    words = vocabulary[random.randint(0, len(vocabulary), lengths.sum())]
+    ends = np.cumsum(lengths)
+    return [' '.join(words[end - length:end]) for end, length in zip(ends, lengths)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repetitions', type=int, default=3)
+    arguments = parser.parse_args()
+
+    texts = random_texts(arguments.rows, np.random.RandomState(0))
+    words = [TokenizeIntoLowerWordsPrecalculation.tokenize_into_words(text) for text in texts]
+    for metadata_type, values in [(NumCharsMetadata(), texts), (RatioUppercaseLettersMetadata(), texts),
+                                  (NumWordsMetadata(), words), (DistinctWordsRatioMetadata(), words),
+                                  (UniqueWordsRatioMetadata(), words)]:
+        per_text, expected = measure(lambda: [metadata_type.metadata_function(value) for value in values],
+                                     arguments.repetitions)
+        batch, metadata = measure(lambda: metadata_type.metadata_batch(values), arguments.repetitions)
+        print("{:20s} per text: {:8.3f}s, batch: {:8.3f}s ({:.1f}x, max difference {:.1e})".format(
+            metadata_type.metadata_name(), per_text, batch, per_text / batch,
+            np.max(np.abs(np.subtract(metadata, expected)))))
+
+
+if __name__ == '__main__':
+    main()
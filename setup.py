@@ -131,4 +131,7 @@ setup(
     # For an analysis of "install_requires" vs pip's requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
     install_requires=['pandas', 'scipy', 'datawig', 'gensim'],  # Optional
+
+    # Parquet, Feather and Arrow IPC input files require pyarrow
+    extras_require={'arrow': ['pyarrow']},  # Optional
 )
\ No newline at end of file
@@ -0,0 +1,54 @@
+import importlib
+import sys
+import types
+
+# maps the names of the checks to the modules that define them, see register_check
+CHECKS = {
+    'CategoricalStatisticalCheck': 'shift_detector.checks.statistical_checks.categorical_statistical_check',
+    'ConditionalProbabilitiesCheck': 'shift_detector.checks.conditional_probabilities_check',
+    'DistinctionCheck': 'shift_detector.checks.distinction_check',
+    'DQMetricsCheck': 'shift_detector.checks.dq_metrics_check',
+    'EmbeddingDistanceCheck': 'shift_detector.checks.embedding_distance_check',
+    'LdaCheck': 'shift_detector.checks.lda_check',
+    'NumericalStatisticalCheck': 'shift_detector.checks.statistical_checks.numerical_statistical_check',
+    'SorensenDiceCheck': 'shift_detector.checks.sorensen_dice_check',
+    'TextMetadataStatisticalCheck': 'shift_detector.checks.statistical_checks.text_metadata_statistical_check',
+    'WordPredictionCheck': 'shift_detector.checks.word_prediction_check',
+}
+
+
+def register_check(name, module):
+    """
+    Register a check, e.g. of another package, so that it can be imported from shift_detector.checks.
+    :param name: class name of the check
+    :param module: full name of the module that defines the check
+    """
+    CHECKS[name] = module
+
+
+def get_check(name):
+    """
+    Import a registered check.
+    :param name: class name of the check
+    :return: the class of the check
+    :raises AttributeError: if no check is registered with the name
+    """
+    if name in CHECKS:
+        return getattr(importlib.import_module(CHECKS[name]), name)
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+class CheckRegistry(types.ModuleType):
+    """
+    Module of the checks that imports registered checks when they are accessed, so that only the dependencies
+    of the used checks are imported. A module subclass is used as module level __getattr__ needs Python 3.7.
+    """
+
+    def __getattr__(self, name):
+        return get_check(name)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(CHECKS))
+
+
+sys.modules[__name__].__class__ = CheckRegistry
@@ -64,6 +64,9 @@ class Report:
 
 class Check(metaclass=ABCMeta):
 
+    # set to True for checks that need the full data when the store is sampled, see Store.unsampled
+    use_full_data = False
+
     @abstractmethod
     def run(self, store):
         """
@@ -72,3 +75,20 @@ class Check(metaclass=ABCMeta):
         :return: Anything
         """
         raise NotImplementedError
+
+    def needed_precalculations(self, store):
+        """
+        Declare the precalculations whose results the check requests from the store.
+        The store uses them to release results that no pending check needs anymore.
+        :param store: the store the check runs on
+        :return: list of precalculations or None if they are unknown
+        """
+        return None
+
+    def run_streaming(self, store):
+        """
+        Run the check on the column summaries of a StreamingStore.
+        :param store: StreamingStore
+        :return: Anything
+        """
+        raise NotImplementedError("{} does not support streaming".format(self.__class__.__name__))
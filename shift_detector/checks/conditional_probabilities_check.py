@@ -1,12 +1,14 @@
 from collections import defaultdict
 from pprint import pprint
 
-import matplotlib.pyplot as plt
 
 from shift_detector.checks.check import Check, Report
 from shift_detector.precalculations.conditional_probabilities_precalculation import \
     ConditionalProbabilitiesPrecalculation
 from shift_detector.utils.custom_print import nprint, mdprint
+from shift_detector.utils.lazy_import import LazyModule
+
+plt = LazyModule('matplotlib.pyplot')
 
 
 class ConditionalProbabilitiesReport(Report):
@@ -135,12 +137,16 @@ class ConditionalProbabilitiesCheck(Check):
         self.number_of_bins = int(number_of_bins)
         self.number_of_topics = int(number_of_topics)
 
+    def precalculation(self):
+        return ConditionalProbabilitiesPrecalculation(self.min_support, self.min_confidence,
+                                                      self.number_of_bins, self.number_of_topics,
+                                                      self.min_delta_supports, self.min_delta_confidences)
+
+    def needed_precalculations(self, store):
+        return [self.precalculation()]
+
     def run(self, store):
-        pre_calculation_result = store[
-            ConditionalProbabilitiesPrecalculation(self.min_support, self.min_confidence,
-                                                   self.number_of_bins, self.number_of_topics,
-                                                   self.min_delta_supports, self.min_delta_confidences)
-        ]
+        pre_calculation_result = store[self.precalculation()]
         explanation = defaultdict(list)
 
         def add_to_explanation(rules, identifier):
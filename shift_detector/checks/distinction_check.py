@@ -2,13 +2,14 @@ from collections.abc import Iterable
 from numbers import Number
 
 import numpy as np
-from IPython.display import display_html
 from pandas import DataFrame
-from sklearn.metrics import precision_recall_fscore_support
 
 from shift_detector.checks.check import Check, Report
 from shift_detector.precalculations.distinction_precalculation import DistinctionPrecalculation
-from shift_detector.utils.custom_print import nprint, is_in_jupyter
+from shift_detector.utils.custom_print import nprint, is_in_jupyter, ipython_display
+from shift_detector.utils.lazy_import import LazyModule
+
+sklearn_metrics = LazyModule('sklearn.metrics')
 
 
 class DistinctionCheck(Check):
@@ -97,14 +98,15 @@ class DistinctionCheck(Check):
         total = str(len(y_true))
 
         df = DataFrame(columns=['label', 'precision', 'recall', 'fscore', 'support'])
-        standard_report = np.transpose(precision_recall_fscore_support(y_true, y_pred, labels=['A', 'B']))
+        standard_report = np.transpose(sklearn_metrics.precision_recall_fscore_support(y_true, y_pred,
+                                                                                       labels=['A', 'B']))
         df.loc[0] = ['A'] + list(standard_report[0])
         df.loc[1] = ['B'] + list(standard_report[1])
-        micro = list(precision_recall_fscore_support(y_true, y_pred, average='micro'))[:3]
+        micro = list(sklearn_metrics.precision_recall_fscore_support(y_true, y_pred, average='micro'))[:3]
         df.loc[2] = ['micro avg'] + micro + [total]
-        macro = list(precision_recall_fscore_support(y_true, y_pred, average='macro'))[:3]
+        macro = list(sklearn_metrics.precision_recall_fscore_support(y_true, y_pred, average='macro'))[:3]
         df.loc[3] = ['macro avg'] + macro + [total]
-        weighted = list(precision_recall_fscore_support(y_true, y_pred, average='weighted'))[:3]
+        weighted = list(sklearn_metrics.precision_recall_fscore_support(y_true, y_pred, average='weighted'))[:3]
         df.loc[4] = ['weighted avg'] + weighted + [total]
         df = df.round(4)
 
@@ -128,7 +130,7 @@ class DistinctionReport(Report):
                 html_str = ''
                 html_str += explanation.render()
                 html_str += information.to_html()
-                display_html(html_str.replace('table', 'table style="display:inline"'), raw=True)
+                ipython_display.display_html(html_str.replace('table', 'table style="display:inline"'), raw=True)
             else:
                 print(explanation, '\n')
                 print(information, '\n')
@@ -1,7 +1,6 @@
 import logging as logger
 from collections import defaultdict, namedtuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
@@ -9,8 +8,11 @@ from shift_detector.checks.check import Check, Report
 from shift_detector.precalculations.dq_metrics_precalculation import DQMetricsPrecalculation
 from shift_detector.utils.column_management import ColumnType
 from shift_detector.utils.custom_print import nprint, diagram_title
+from shift_detector.utils.lazy_import import LazyModule
 from shift_detector.utils.visualization import LEGEND_1, LEGEND_2
 
+plt = LazyModule('matplotlib.pyplot')
+
 ReportRow = namedtuple('ReportRow', 'metric_name val1 val2 threshold diff')
 
 
@@ -42,6 +44,9 @@ class DQMetricsCheck(Check):
         self.text_metadata = None
         self.check_language_metadata = check_text_metadata
 
+    def needed_precalculations(self, store):
+        return [DQMetricsPrecalculation(text_metadata=self.check_language_metadata)]
+
     def run(self, store):
         df1_numerical, df2_numerical = store[ColumnType.numerical]
         self.data = store[DQMetricsPrecalculation(text_metadata=self.check_language_metadata)]
@@ -54,6 +59,24 @@ class DQMetricsCheck(Check):
         else:
             metadata_report = DQMetricsReport()
 
+        return self.aggregate_reports(numerical_report, attribute_val_report, metadata_report)
+
+    def run_streaming(self, store):
+        """
+        Run the check on the column summaries of a StreamingStore.
+        Text metadata cannot be checked in streaming mode. Numerical columns are not plotted.
+        :param store: StreamingStore
+        """
+        if self.check_language_metadata:
+            raise NotImplementedError("DQMetricsCheck does not support text metadata in streaming mode")
+        self.data = DQMetricsPrecalculation.process_summaries(store)
+
+        numerical_report = self.numerical_categorical_report()
+        attribute_val_report = self.attribute_val_report()
+        return self.aggregate_reports(numerical_report, attribute_val_report, DQMetricsReport())
+
+    @staticmethod
+    def aggregate_reports(numerical_report, attribute_val_report, metadata_report):
         agg_examined_columns = set(numerical_report.examined_columns + attribute_val_report.examined_columns +
                                    metadata_report.examined_columns)
         agg_shifted_columns = set(numerical_report.shifted_columns + attribute_val_report.shifted_columns +
@@ -106,7 +129,7 @@ class DQMetricsCheck(Check):
         return DQMetricsReport(examined_columns, shifted_columns, explanation={'text_metadata': explanation},
                                figures=[])
 
-    def numerical_categorical_report(self, df1, df2):
+    def numerical_categorical_report(self, df1=None, df2=None):
         numerical_comparison = self.data['numerical_comparison']
         categorical_comparison = self.data['categorical_comparison']
 
@@ -128,8 +151,9 @@ class DQMetricsCheck(Check):
                         explanation[column_name].append(
                             ReportRow(metric_name, val1, val2, self.metrics_thresholds_percentage[metric_name], diff))
 
+        figures = [DQMetricsReport.numerical_plot(df1, df2)] if df1 is not None else []
         return DQMetricsReport(examined_columns, shifted_columns, explanation={'numerical_categorical': explanation},
-                               figures=[DQMetricsReport.numerical_plot(df1, df2)])
+                               figures=figures)
 
     def attribute_val_report(self):
         attribute_val_comparison = self.data['attribute_val_comparison']
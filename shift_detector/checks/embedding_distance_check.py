@@ -1,6 +1,6 @@
 from shift_detector.checks.check import Check, Report
 from shift_detector.precalculations.embedding_distance_precalculation import EmbeddingDistancePrecalculation
-from IPython.display import display
+from shift_detector.utils.custom_print import display
 
 import pandas as pd
 
@@ -12,6 +12,9 @@ class EmbeddingDistanceCheck(Check):
         self.trained_model = trained_model
         self.threshold = threshold
 
+    def needed_precalculations(self, store):
+        return [EmbeddingDistancePrecalculation(model=self.model, trained_model=self.trained_model)]
+
     def run(self, store):
         data = store[EmbeddingDistancePrecalculation(model=self.model, trained_model=self.trained_model)]
 
@@ -1,7 +1,7 @@
 from shift_detector.checks.check import Check, Report
 from shift_detector.precalculations.n_gram import NGramType
 from shift_detector.precalculations.sorensen_dice_precalculation import SorensenDicePrecalculations
-from IPython.display import display
+from shift_detector.utils.custom_print import display
 
 import pandas as pd
 
@@ -13,9 +13,18 @@ class SorensenDiceCheck(Check):
         self.n = n
         self.threshold = threshold
 
+    def needed_precalculations(self, store):
+        return [SorensenDicePrecalculations(ngram_type=self.ngram_type, n=self.n)]
+
     def run(self, store):
         data = store[SorensenDicePrecalculations(ngram_type=self.ngram_type, n=self.n)]
+        return self.report(data)
+
+    def run_streaming(self, store):
+        data = SorensenDicePrecalculations(ngram_type=self.ngram_type, n=self.n).process_summaries(store)
+        return self.report(data)
 
+    def report(self, data):
         examined_columns = set(data.keys())
         shifted_columns = set()
 
@@ -1,22 +1,99 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-from scipy import stats
 
 from shift_detector.checks.statistical_checks.statistical_check import SimpleStatisticalCheck
 from shift_detector.precalculations.low_cardinality_precalculation import LowCardinalityPrecalculation
 from shift_detector.utils import visualization as vis
+from shift_detector.utils.lazy_import import LazyModule
 from shift_detector.utils.visualization import PLOT_ROW_HEIGHT, PlotData, plot_title
 
+plt = LazyModule('matplotlib.pyplot')
+stats = LazyModule('scipy.stats')
+special = LazyModule('scipy.special')
+
 
 def chi2_test(part1: pd.Series, part2: pd.Series):
-    observed = pd.DataFrame.from_dict({'a': part1.value_counts(), 'b': part2.value_counts()})
+    return chi2_test_on_counts(part1.value_counts(), part2.value_counts())
+
+
+def chi2_test_on_counts(counts1: pd.Series, counts2: pd.Series):
+    """
+    Perform the G-test on the value counts of two samples.
+    :param counts1: counts of the values of the first sample
+    :param counts2: counts of the values of the second sample
+    :return: p-value
+    """
+    observed = pd.DataFrame.from_dict({'a': counts1, 'b': counts2})
+    # unused categories of categorical columns
+    observed = observed[(observed['a'] > 0) | (observed['b'] > 0)]
     observed['a'] = observed['a'].add(1, fill_value=0)  # rule of succession
     observed['b'] = observed['b'].add(1, fill_value=0)
     chi2, p, dof, expected = stats.chi2_contingency(observed, lambda_='log-likelihood')
     return p
 
 
+def category_counts(column1: pd.Series, column2: pd.Series):
+    """
+    Count the values of two columns on the codes of a shared dictionary. Missing values are not counted and
+    values that occur in neither column are dropped, like value_counts does.
+    :param column1: first column
+    :param column2: second column
+    :return: arrays with the counts of the values of both columns in the same order
+    """
+    if isinstance(column1.dtype, pd.CategoricalDtype) and column1.dtype == column2.dtype:
+        codes1, codes2 = column1.cat.codes.values, column2.cat.codes.values
+        size = len(column1.cat.categories)
+    else:
+        codes, dictionary = pd.factorize(pd.concat([column1, column2], ignore_index=True))
+        codes1, codes2 = codes[:len(column1)], codes[len(column1):]
+        size = len(dictionary)
+    counts1 = np.bincount(codes1[codes1 >= 0], minlength=size)
+    counts2 = np.bincount(codes2[codes2 >= 0], minlength=size)
+    used = (counts1 + counts2) > 0
+    return counts1[used], counts2[used]
+
+
+def chi2_tests(df1: pd.DataFrame, df2: pd.DataFrame, columns):
+    """
+    Perform the G-test of chi2_test on many columns at once. The counts of all columns are concatenated,
+    so that the test statistics of all columns are computed with a few array operations.
+    :param df1: first data frame
+    :param df2: second data frame
+    :param columns: columns to test
+    :return: list with the p-value of every column, NaN for columns without values
+    """
+    columns = list(columns)
+    if not columns:
+        return []
+    counts = [category_counts(df1[column], df2[column]) for column in columns]
+    sizes = np.array([len(counts1) for counts1, _ in counts])
+    column_ids = np.repeat(np.arange(len(columns)), sizes)
+
+    # rule of succession
+    observed1 = np.concatenate([counts1 for counts1, _ in counts]).astype(float) + 1
+    observed2 = np.concatenate([counts2 for _, counts2 in counts]).astype(float) + 1
+    totals1 = np.bincount(column_ids, weights=observed1, minlength=len(columns))
+    totals2 = np.bincount(column_ids, weights=observed2, minlength=len(columns))
+    totals = totals1 + totals2
+    row_totals = observed1 + observed2
+    expected1 = row_totals * totals1[column_ids] / totals[column_ids]
+    expected2 = row_totals * totals2[column_ids] / totals[column_ids]
+
+    dof = sizes - 1
+    # Yates' correction for continuity, like scipy.stats.chi2_contingency applies it
+    corrected = dof[column_ids] == 1
+    for observed, expected in [(observed1, expected1), (observed2, expected2)]:
+        difference = expected[corrected] - observed[corrected]
+        observed[corrected] += np.minimum(0.5, np.abs(difference)) * np.sign(difference)
+
+    terms = special.xlogy(observed1, observed1 / expected1) + special.xlogy(observed2, observed2 / expected2)
+    statistics = 2 * np.bincount(column_ids, weights=terms, minlength=len(columns))
+    with np.errstate(invalid='ignore'):
+        pvalues = stats.chi2.sf(statistics, np.maximum(dof, 1))
+    pvalues = np.where(dof == 0, 1.0, pvalues)
+    return [float(p) for p in np.where(sizes == 0, np.nan, pvalues)]
+
+
 class CategoricalStatisticalCheck(SimpleStatisticalCheck):
 
     def check_name(self) -> str:
@@ -25,6 +102,9 @@ class CategoricalStatisticalCheck(SimpleStatisticalCheck):
     def statistical_test_name(self) -> str:
         return 'Chi^2-Test with Log-Likelihood (G-Test)'
 
+    def needed_precalculations(self, store):
+        return [LowCardinalityPrecalculation()]
+
     def data_to_process(self, store):
         df1, df2, columns = store[LowCardinalityPrecalculation()]
         return df1, df2, columns
@@ -32,6 +112,15 @@ class CategoricalStatisticalCheck(SimpleStatisticalCheck):
     def statistical_test(self, part1: pd.Series, part2: pd.Series) -> float:
         return chi2_test(part1, part2)
 
+    def statistical_tests(self, part1: pd.DataFrame, part2: pd.DataFrame, columns):
+        return chi2_tests(part1, part2, columns)
+
+    def summaries_to_process(self, store):
+        return store.categorical_summaries()
+
+    def summary_test(self, summary1, summary2) -> float:
+        return chi2_test_on_counts(summary1.value_counts(), summary2.value_counts())
+
     @staticmethod
     def paired_total_ratios_plot(figure, axes, column, df1, df2, top_k=15):
         axes = vis.plot_categorical_horizontal_ratio_histogram(axes, (df1[column], df2[column]), top_k)
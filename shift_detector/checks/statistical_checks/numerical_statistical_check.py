@@ -1,12 +1,19 @@
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
-from matplotlib import gridspec
-from scipy import stats
 
-from shift_detector.checks.statistical_checks.statistical_check import SimpleStatisticalCheck
+from shift_detector.checks.check import Report
+from shift_detector.checks.statistical_checks.statistical_check import SimpleStatisticalCheck, StatisticalReport
+from shift_detector.precalculations.quantile_sketch_precalculation import QuantileSketchPrecalculation
 from shift_detector.utils.column_management import ColumnType
 import shift_detector.utils.visualization as vis
+from shift_detector.utils.lazy_import import LazyModule
+from shift_detector.utils.sketches import QuantileSketch
+
+plt = LazyModule('matplotlib.pyplot')
+gridspec = LazyModule('matplotlib.gridspec')
+stats = LazyModule('scipy.stats')
 
 
 def kolmogorov_smirnov_test(part1: pd.Series, part2: pd.Series):
@@ -14,14 +21,159 @@ def kolmogorov_smirnov_test(part1: pd.Series, part2: pd.Series):
     return ks_test_result.pvalue
 
 
+# largest sample size for which scipy computes the exact distribution of the Kolmogorov-Smirnov statistic
+KS_EXACT_MAX_SIZE = 10000
+# maximum number of values that are sorted together by kolmogorov_smirnov_statistics
+KS_BATCH_SIZE = 10 ** 7
+
+
+def kolmogorov_smirnov_statistics(values1: np.ndarray, values2: np.ndarray, workers=1) -> np.ndarray:
+    """
+    Compute the Kolmogorov-Smirnov statistics of many columns at once. The samples of a batch of columns are
+    sorted with one call each, then the two samples of every column are merged and the distance of the
+    empirical distribution functions is evaluated at all values like scipy.stats.ks_2samp does.
+    Columns that contain NaN get NaN.
+    :param values1: 2-dimensional array with the first sample of every column
+    :param values2: 2-dimensional array with the second sample of every column
+    :param workers: number of threads that process batches of columns
+    :return: array with the statistic of every column
+    """
+    n1, n2 = len(values1), len(values2)
+    columns_per_batch = max(KS_BATCH_SIZE // max(n1 + n2, 1), 1)
+    if workers > 1:
+        columns_per_batch = min(columns_per_batch, -(-values1.shape[1] // workers))
+    batches = [slice(start, start + columns_per_batch) for start in range(0, values1.shape[1], columns_per_batch)]
+
+    def statistics_of_batch(batch):
+        # one row per column, so that every sample is contiguous
+        sorted1 = np.sort(values1[:, batch].T, axis=1)
+        sorted2 = np.sort(values2[:, batch].T, axis=1)
+        statistics = np.empty(len(sorted1))
+        last_of_equal = np.ones(n1 + n2, dtype=bool)
+        for i, (sample1, sample2) in enumerate(zip(sorted1, sorted2)):
+            values = np.concatenate([sample1, sample2])
+            # a stable sort merges the two sorted runs in linear time
+            order = np.argsort(values, kind='stable')
+            from_first = order < n1
+            distances = np.abs(np.cumsum(from_first) / n1 - np.cumsum(~from_first) / n2)
+            # the distribution functions are compared after the last of equal values
+            merged = values[order]
+            np.not_equal(merged[1:], merged[:-1], out=last_of_equal[:-1])
+            statistics[i] = distances[last_of_equal].max()
+        # NaN is sorted to the end
+        return np.where(np.isnan(sorted1[:, -1]) | np.isnan(sorted2[:, -1]), np.nan, statistics)
+
+    if workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(statistics_of_batch, batches))
+    else:
+        results = [statistics_of_batch(batch) for batch in batches]
+    return np.concatenate(results) if results else np.empty(0)
+
+
+def kolmogorov_smirnov_tests(df1: pd.DataFrame, df2: pd.DataFrame, columns, workers=1):
+    """
+    Perform the Kolmogorov-Smirnov two sample test on many columns at once, see kolmogorov_smirnov_statistics.
+    The p-values equal the ones of kolmogorov_smirnov_test.
+    :param df1: first data frame
+    :param df2: second data frame
+    :param columns: numerical columns to test
+    :param workers: number of threads that process batches of columns
+    :return: list with the p-value of every column
+    """
+    columns = list(columns)
+    values1 = df1[columns].to_numpy(dtype=float)
+    values2 = df2[columns].to_numpy(dtype=float)
+    if not columns or len(values1) == 0 or len(values2) == 0:
+        return [kolmogorov_smirnov_test(df1[column], df2[column]) for column in columns]
+    statistics = kolmogorov_smirnov_statistics(values1, values2, workers)
+
+    n1, n2 = len(values1), len(values2)
+    if max(n1, n2) > KS_EXACT_MAX_SIZE:
+        m, n = sorted([float(n1), float(n2)], reverse=True)
+        pvalues = np.clip(stats.distributions.kstwo.sf(statistics, np.round(m * n / (m + n))), 0, 1)
+        return [float(p) for p in pvalues]
+
+    # the exact p-value only depends on the statistic, as all columns have the same sample sizes
+    pvalues_of_statistics = {}
+    pvalues = []
+    for i, statistic in enumerate(statistics):
+        if np.isnan(statistic):
+            pvalues.append(float('nan'))
+            continue
+        if statistic not in pvalues_of_statistics:
+            pvalues_of_statistics[statistic] = float(stats.ks_2samp(values1[:, i], values2[:, i]).pvalue)
+        pvalues.append(pvalues_of_statistics[statistic])
+    return pvalues
+
+
+def kolmogorov_smirnov_sketch_statistic(sketch1: QuantileSketch, sketch2: QuantileSketch):
+    """
+    Approximate the Kolmogorov-Smirnov statistic on quantile sketches of two samples.
+    The approximate distribution functions of the sketches only change at the numbers retained by the sketches,
+    so their distance is evaluated at these numbers. The approximate distribution function of a sketch differs
+    from the empirical one by at most its rank_error, hence the statistic differs from the exact statistic
+    by at most the sum of the rank errors of both sketches.
+    :param sketch1: sketch of the first sample
+    :param sketch2: sketch of the second sample
+    :return: approximate statistic and the upper bound of its absolute error, NaN for empty sketches
+    """
+    if sketch1.count == 0 or sketch2.count == 0:
+        return float('nan'), float('nan')
+    points = np.concatenate([np.concatenate(sketch1.compactors), np.concatenate(sketch2.compactors)])
+    d = np.max(np.abs(sketch1.cdf(points) - sketch2.cdf(points)))
+    return float(d), sketch1.rank_error() + sketch2.rank_error()
+
+
+def kolmogorov_smirnov_sketch_test(sketch1: QuantileSketch, sketch2: QuantileSketch):
+    """
+    Approximate the Kolmogorov-Smirnov two sample test on quantile sketches of the samples,
+    see kolmogorov_smirnov_sketch_statistic. The p-value is calculated with the asymptotic distribution
+    of the approximate statistic.
+    :param sketch1: sketch of the first sample
+    :param sketch2: sketch of the second sample
+    :return: approximate p-value
+    """
+    d, _ = kolmogorov_smirnov_sketch_statistic(sketch1, sketch2)
+    if np.isnan(d):
+        return float('nan')
+    m, n = sorted([float(sketch1.count), float(sketch2.count)], reverse=True)
+    en = m * n / (m + n)
+    return float(np.clip(stats.distributions.kstwo.sf(d, np.round(en)), 0, 1))
+
+
 class NumericalStatisticalCheck(SimpleStatisticalCheck):
+    """
+    Compare the distributions of the numerical columns with the Kolmogorov-Smirnov two sample test.
+    :param workers: number of threads that compute the test statistics, see kolmogorov_smirnov_statistics
+    :param sketch_k: approximate the tests on quantile sketches with this accuracy parameter (see QuantileSketch)
+    instead of the data, None to use the data. The sketches are datasetwise results, so they are kept in reference
+    profiles and merged from the results of worker processes. sample_size and use_equal_dataset_sizes are not
+    applied to sketches. The report contains the upper bound of the error of every statistic ('statistic_errors').
+    See StatisticalCheck for the other parameters.
+    """
+
+    def __init__(self, significance=0.01, sample_size=None, use_equal_dataset_sizes=False, sampling_seed=0,
+                 workers=1, sketch_k=None):
+        super().__init__(significance, sample_size, use_equal_dataset_sizes, sampling_seed)
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers should be an integer greater than 0. Received: {}".format(workers))
+        self.workers = workers
+        self.sketches = QuantileSketchPrecalculation(sketch_k) if sketch_k is not None else None
 
     def check_name(self) -> str:
         return 'Numerical Statistical Check'
 
     def statistical_test_name(self) -> str:
+        if self.sketches is not None:
+            return 'Kolmogorov-Smirnov-Two-Sample-Test (approximated on quantile sketches)'
         return 'Kolmogorov-Smirnov-Two-Sample-Test'
 
+    def needed_precalculations(self, store):
+        if self.sketches is not None:
+            return [self.sketches]
+        return []
+
     def data_to_process(self, store):
         df1, df2 = store[ColumnType.numerical]
         columns = store.column_names(ColumnType.numerical)
@@ -30,6 +182,39 @@ class NumericalStatisticalCheck(SimpleStatisticalCheck):
     def statistical_test(self, part1: pd.Series, part2: pd.Series) -> float:
         return kolmogorov_smirnov_test(part1, part2)
 
+    def statistical_tests(self, part1: pd.DataFrame, part2: pd.DataFrame, columns):
+        return kolmogorov_smirnov_tests(part1, part2, columns, self.workers)
+
+    def run(self, store) -> Report:
+        if self.sketches is None:
+            return super().run(store)
+
+        sketches1, sketches2 = store[self.sketches]
+        columns = store.column_names(ColumnType.numerical)
+        pvalues = pd.DataFrame(index=['pvalue'])
+        statistic_errors = pd.DataFrame(index=['max_error'])
+        for column in columns:
+            pvalues[column] = [kolmogorov_smirnov_sketch_test(sketches1[column], sketches2[column])]
+            _, max_error = kolmogorov_smirnov_sketch_statistic(sketches1[column], sketches2[column])
+            statistic_errors[column] = [max_error]
+        significant_columns = self.significant_columns(pvalues)
+        df1, df2 = store[ColumnType.numerical]
+        return StatisticalReport(self.check_name(),
+                                 examined_columns=sorted(columns),
+                                 shifted_columns=sorted(significant_columns),
+                                 explanation=self.explain(pvalues),
+                                 explanation_header=self.explanation_header(),
+                                 information={'test_results': pvalues, 'statistic_errors': statistic_errors},
+                                 figures=self.column_figure(significant_columns, df1, df2))
+
+    def summaries_to_process(self, store):
+        summaries1, summaries2 = store.numerical_summaries()
+        columns = store.column_names(ColumnType.numerical)
+        return summaries1, summaries2, columns
+
+    def summary_test(self, summary1, summary2) -> float:
+        return kolmogorov_smirnov_sketch_test(summary1.sketch, summary2.sketch)
+
     @staticmethod
     def cumulative_hist_plot(figure, axes, column, df1, df2, bins=40):
         _, bin_edges = np.histogram(pd.concat([df1[column].dropna(), df2[column].dropna()]), bins=bins)
@@ -2,13 +2,15 @@ from abc import abstractmethod
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from IPython.display import display
-from matplotlib import gridspec
 
 from shift_detector.checks.check import Check, Report
+from shift_detector.utils.custom_print import display
+from shift_detector.utils.lazy_import import LazyModule
 from shift_detector.utils.visualization import PLOT_GRID_WIDTH, PLOT_ROW_HEIGHT
 
+plt = LazyModule('matplotlib.pyplot')
+gridspec = LazyModule('matplotlib.gridspec')
+
 
 class StatisticalCheck(Check):
     """
@@ -76,6 +78,16 @@ class SimpleStatisticalCheck(StatisticalCheck):
         """
         raise NotImplementedError
 
+    def statistical_tests(self, part1: pd.DataFrame, part2: pd.DataFrame, columns):
+        """
+        Performs the statistical test on every column. Override it to test many columns at once.
+        :param part1: first sample
+        :param part2: second sample
+        :param columns: columns to test
+        :return: list with the p-value of every column
+        """
+        return [self.statistical_test(part1[column], part2[column]) for column in columns]
+
     @abstractmethod
     def check_name(self) -> str:
         """
@@ -100,6 +112,22 @@ class SimpleStatisticalCheck(StatisticalCheck):
         """
         raise NotImplementedError
 
+    def summaries_to_process(self, store):
+        """
+        Receive the column summaries of a StreamingStore to run on.
+        :return: dictionaries that map the columns to their summaries for both files and the columns
+        """
+        raise NotImplementedError("{} does not support streaming".format(self.__class__.__name__))
+
+    def summary_test(self, summary1, summary2) -> float:
+        """
+        Performs the statistical test on the summaries of two samples, see statistical_test.
+        :param summary1: summary of the first sample
+        :param summary2: summary of the second sample
+        :return: p-value of statistical test
+        """
+        raise NotImplementedError("{} does not support streaming".format(self.__class__.__name__))
+
     def explain(self, pvalues):
         """
         Generates a dictionary with textual explanations for all significant columns.
@@ -157,8 +185,7 @@ class SimpleStatisticalCheck(StatisticalCheck):
 
         part1, part2 = self.adjust_dataset_sizes(df1, df2)
 
-        for column in columns:
-            p = self.statistical_test(part1[column], part2[column])
+        for column, p in zip(columns, self.statistical_tests(part1, part2, columns)):
             pvalues[column] = [p]
         significant_columns = self.significant_columns(pvalues)
         return StatisticalReport(self.check_name(),
@@ -169,6 +196,27 @@ class SimpleStatisticalCheck(StatisticalCheck):
                                  information={'test_results': pvalues},
                                  figures=self.column_figure(significant_columns, part1, part2))
 
+    def run_streaming(self, store) -> Report:
+        """
+        Run the check on the column summaries of a StreamingStore.
+        The whole files are compared, so sample_size and use_equal_dataset_sizes are not applied.
+        Reports of streaming runs have no figures.
+        """
+        pvalues = pd.DataFrame(index=['pvalue'])
+
+        summaries1, summaries2, columns = self.summaries_to_process(store)
+
+        for column in columns:
+            p = self.summary_test(summaries1[column], summaries2[column])
+            pvalues[column] = [p]
+        significant_columns = self.significant_columns(pvalues)
+        return StatisticalReport(self.check_name(),
+                                 examined_columns=sorted(columns),
+                                 shifted_columns=sorted(significant_columns),
+                                 explanation=self.explain(pvalues),
+                                 explanation_header=self.explanation_header(),
+                                 information={'test_results': pvalues})
+
 
 class StatisticalReport(Report):
 
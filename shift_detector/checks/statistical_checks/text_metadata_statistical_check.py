@@ -1,9 +1,6 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-from matplotlib import gridspec
 import warnings
-import nltk
 
 from shift_detector.checks.check import Report
 from shift_detector.checks.statistical_checks.categorical_statistical_check import CategoricalStatisticalCheck
@@ -12,8 +9,13 @@ from shift_detector.checks.statistical_checks.statistical_check import Statistic
 from shift_detector.precalculations.text_metadata import TextMetadata
 from shift_detector.utils.column_management import ColumnType
 from shift_detector.utils.errors import UnknownMetadataReturnColumnTypeError
+from shift_detector.utils.lazy_import import LazyModule
 from shift_detector.utils.visualization import PLOT_GRID_WIDTH, PLOT_ROW_HEIGHT, PlotData
 
+plt = LazyModule('matplotlib.pyplot')
+gridspec = LazyModule('matplotlib.gridspec')
+nltk = LazyModule('nltk')
+
 
 class TextMetadataStatisticalCheck(StatisticalCheck):
 
@@ -101,6 +103,9 @@ class TextMetadataStatisticalCheck(StatisticalCheck):
         return [lambda plots=tuple(self.plot_data(significant_columns, pvalues, df1, df2)):
                 self.plot_all_metadata(plots)]
 
+    def needed_precalculations(self, store):
+        return [self.metadata_precalculation]
+
     def run(self, store) -> Report:
         df1, df2 = store[self.metadata_precalculation]
         part1, part2 = self.adjust_dataset_sizes(df1, df2)
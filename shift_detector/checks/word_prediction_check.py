@@ -4,11 +4,11 @@ from numbers import Number
 from typing import List
 
 import pandas as pd
-from IPython.core.display import display
 
 from shift_detector.checks.check import Check, Report
 from shift_detector.precalculations.word_prediction_precalculation import WordPredictionPrecalculation
 from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.custom_print import display
 
 
 class WordPredictionCheck(Check):
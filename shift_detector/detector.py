@@ -1,19 +1,151 @@
 import logging as logger
+import pickle
+import uuid
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import Union
 
 import pandas as pd
-from IPython.display import display
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import colors
-
 
 from shift_detector.checks.check import Check, Report
+from shift_detector.precalculations.execution_plan import ExecutionPlan
+from shift_detector.precalculations.reference_profile import ReferenceProfile
 from shift_detector.precalculations.store import Store
 from shift_detector.utils.column_management import column_names
-from shift_detector.utils.custom_print import nprint, lprint
-from shift_detector.utils.data_io import read_from_csv
+from shift_detector.utils.custom_print import nprint, lprint, display
+from shift_detector.utils.data_io import read_data, read_column_names, file_format, read_csv_reservoir_sample
+from shift_detector.utils.lazy_import import LazyModule
+from shift_detector.utils.sampling import validate_sampling
+
+plt = LazyModule('matplotlib.pyplot')
+colors = LazyModule('matplotlib.colors')
+
+BACKENDS = ('thread', 'process')
+
+# store of the current worker process and the id of the run it was sent by, see run_in_processes
+worker_store = None
+worker_store_id = None
+
+
+def execute_check(check, store, log_print=False, streaming=False):
+    """
+    Run a single check on the store.
+    Exceptions raised by the check are converted into a report that contains the error message.
+    :param check: check to run
+    :param store: the store to run the check on
+    :param log_print: print progress information
+    :param streaming: run the check on the summaries of a StreamingStore
+    :return: report of the check
+    """
+    lprint("Executing {}".format(check.__class__.__name__), log_print)
+    if check.use_full_data is True and not streaming:
+        store = store.unsampled()
+    try:
+        with store.instrumentation.measure('check', check.__class__.__name__):
+            if streaming:
+                return check.run_streaming(store)
+            return check.run(store)
+    except Exception as e:
+        error_msg = {e.__class__.__name__: str(e)}
+        return Report(check.__class__.__name__,
+                      examined_columns=[],
+                      shifted_columns=[],
+                      information=error_msg)
+
+
+def load_worker_store(store_id, pickled_store):
+    """
+    Unpickle the store of a run once per worker process, so that the checks of the run that the worker executes
+    share the store and the precalculations they execute.
+    :param store_id: id of the run
+    :param pickled_store: the pickled store of the detector
+    :return: the store of the worker process
+    """
+    global worker_store, worker_store_id
+    if worker_store_id != store_id:
+        worker_store = pickle.loads(pickled_store)
+        worker_store_id = store_id
+    return worker_store
+
+
+def execute_check_in_worker(check, store_id, pickled_store):
+    """
+    Run the check on the store of the worker process.
+    :param check: check to run
+    :param store_id: id of the run, see load_worker_store
+    :param pickled_store: the pickled store of the detector
+    :return: the pickled report or None if it cannot be pickled,
+    a list of pickled (precalculation, result) pairs that were executed for this check and
+    the instrumentation records of the check
+    """
+    load_worker_store(store_id, pickled_store)
+    already_executed = set(worker_store.preprocessings)
+    already_recorded = len(worker_store.instrumentation.records)
+    report = execute_check(check, worker_store)
+
+    try:
+        pickled_report = pickle.dumps(report)
+    except Exception:
+        pickled_report = None
+
+    pickled_preprocessings = []
+    for precalculation, preprocessing in list(worker_store.preprocessings.items()):
+        if precalculation in already_executed:
+            continue
+        try:
+            pickled_preprocessings.append(pickle.dumps((precalculation, preprocessing)))
+        except Exception:
+            logger.info("Result of {} cannot be sent to the main process".format(precalculation.__class__.__name__))
+    return pickled_report, pickled_preprocessings, worker_store.instrumentation.records[already_recorded:]
+
+
+def validate_checks(checks):
+    if not checks:
+        raise Exception("Please include checks)")
+
+    if not all(isinstance(check, Check) for check in checks):
+        class_names = map(lambda c: c.__class__.__name__, checks)
+        raise Exception("All elements in checks should be a Check. Received: {}".format(', '.join(class_names)))
+
+
+def shared_columns_of_inputs(df1, df2, delimiter):
+    """
+    Determine the shared columns of two inputs before their data is loaded.
+    :param df1: either a pandas data frame or a file path
+    :param df2: either a pandas data frame or a file path
+    :param delimiter: delimiter for csv files
+    :return: list of the shared columns or None to load all columns
+    """
+    if type(df1) is not str and type(df2) is not str:
+        return None
+    try:
+        columns1 = list(df1.columns) if type(df1) is pd.DataFrame else read_column_names(df1, delimiter)
+        columns2 = list(df2.columns) if type(df2) is pd.DataFrame else read_column_names(df2, delimiter)
+    except AttributeError:
+        return None
+    shared_columns = [column for column in columns1 if column in columns2]
+    return shared_columns if shared_columns else None
+
+
+def load_data_frame(df, delimiter, name, columns=None, reservoir_rows=None, seed=0):
+    """
+    :param df: either a pandas data frame or a file path
+    :param delimiter: delimiter for csv files
+    :param name: name of the input in error messages
+    :param columns: columns to read from files, None to read all columns
+    :param reservoir_rows: number of rows to sample from csv files while they are read, None to read all rows
+    :param seed: seed of the sample
+    :return: the data frame
+    """
+    if type(df) is pd.DataFrame:
+        return df
+    elif type(df) is str:
+        if reservoir_rows is not None and file_format(df) == 'csv':
+            return read_csv_reservoir_sample(df, delimiter, reservoir_rows, seed, columns)
+        return read_data(df, delimiter, columns)
+    else:
+        raise Exception("{} is not a dataframe or a string".format(name))
 
 
 class Detector:
@@ -23,6 +155,19 @@ class Detector:
     :param df1: either a pandas data frame or a file path
     :param df2: either a pandas data frame or a file path
     :param delimiter: delimiter for csv files
+    :param cache_dir: directory to persist the results of precalculations in, see Store
+    :param cache_size: maximum size of cache_dir in bytes
+    :param trace_memory: measure the peak memory of checks and precalculations, see profile
+    :param memory_budget: maximum estimated size in bytes of the precalculation results kept in memory, see Store
+    :param release_precalculations: release precalculation results as soon as no check of the current run
+    needs them anymore
+    :param sample_rows: number of rows to sample from each input, None to use all rows. All checks work on the
+    same samples, except checks whose use_full_data is set.
+    :param sampling_strategy: 'uniform', 'reservoir' or 'stratified', see Store.
+    With 'reservoir', csv files are sampled while they are read chunk by chunk, so that they are never loaded
+    completely. Checks that opt out of sampling use the samples of csv files then.
+    :param sampling_seed: seed of the samples
+    :param stratify_by: column to stratify the samples by, required for the 'stratified' strategy
     """
 
     def __init__(self,
@@ -30,56 +175,186 @@ class Detector:
                  df2: Union[pd.DataFrame, str],
                  delimiter=',',
                  log_print=True,
+                 cache_dir=None,
+                 cache_size=None,
+                 trace_memory=False,
+                 memory_budget=None,
+                 release_precalculations=False,
+                 sample_rows=None,
+                 sampling_strategy='uniform',
+                 sampling_seed=0,
+                 stratify_by=None,
                  **custom_column_types):
-        if type(df1) is pd.DataFrame:
-            self.df1 = df1
-        elif type(df1) is str:
-            self.df1 = read_from_csv(df1, delimiter)
-        else:
-            raise Exception("df1 is not a dataframe or a string")
-
-        if type(df2) is pd.DataFrame:
-            self.df2 = df2
-        elif type(df2) is str:
-            self.df2 = read_from_csv(df2, delimiter)
-        else:
-            raise Exception("df2 is not a dataframe or a string")
+        validate_sampling(sample_rows, sampling_strategy, stratify_by)
+        reservoir_rows = sample_rows if sampling_strategy == 'reservoir' else None
+        columns = shared_columns_of_inputs(df1, df2, delimiter)
+        self.df1 = load_data_frame(df1, delimiter, 'df1', columns, reservoir_rows, sampling_seed)
+        self.df2 = load_data_frame(df2, delimiter, 'df2', columns, reservoir_rows, sampling_seed)
 
         self.log_print = log_print
         self.check_reports = []
-        self.store = Store(self.df1, self.df2, log_print=self.log_print, custom_column_types=custom_column_types)
+        self.store = Store(self.df1, self.df2, log_print=self.log_print, custom_column_types=custom_column_types,
+                           cache_dir=cache_dir, cache_size=cache_size, trace_memory=trace_memory,
+                           memory_budget=memory_budget, release_precalculations=release_precalculations,
+                           sample_rows=sample_rows, sampling_strategy=sampling_strategy,
+                           sampling_seed=sampling_seed, stratify_by=stratify_by)
 
         lprint("Used columns: {}".format(', '.join(column_names(self.store.column_names()))), self.log_print)
 
-    def run(self, *checks, logger_level=logger.ERROR):
+    @classmethod
+    def from_profile(cls,
+                     profile: ReferenceProfile,
+                     df2: Union[pd.DataFrame, str],
+                     delimiter=',',
+                     log_print=True,
+                     cache_dir=None,
+                     cache_size=None):
+        """
+        Create a detector that compares the reference data of a profile with df2.
+        Results of the profiled precalculations are reused, so that only df2 is processed for them.
+        :param profile: ReferenceProfile of the reference data
+        :param df2: either a pandas data frame or a file path
+        :param delimiter: delimiter for csv files
+        :param log_print: print progress information
+        :param cache_dir: directory to persist the results of precalculations in, see Store
+        :param cache_size: maximum size of cache_dir in bytes
+        :return: the detector
+        """
+        detector = cls.__new__(cls)
+        detector.df1 = profile.df
+        detector.df2 = load_data_frame(df2, delimiter, 'df2', profile.column_names())
+        detector.log_print = log_print
+        detector.check_reports = []
+        detector.store = Store.from_profile(profile, detector.df2, log_print=log_print,
+                                            cache_dir=cache_dir, cache_size=cache_size)
+
+        lprint("Used columns: {}".format(', '.join(column_names(detector.store.column_names()))), log_print)
+        return detector
+
+    def reference_profile(self):
+        """
+        Profile df1 with the results of all datasetwise precalculations that were executed so far,
+        e.g. by the checks of previous runs.
+        :return: ReferenceProfile of df1
+        """
+        return ReferenceProfile.from_store(self.store)
+
+    def plan(self, *checks) -> pd.DataFrame:
+        """
+        Plan the checks without running them: collect the precalculations they need, deduplicated across checks,
+        and estimate their relative costs from the number of rows, columns and the lengths of texts.
+        Costs are in units of handling one cell, executed precalculations cost nothing.
+        :param checks: checks to plan
+        :return: data frame with one row per precalculation, ordered so that dependencies come first,
+        followed by one row per check. The columns are:
+        kind ('precalculation' or 'check'), name, dependencies (ids of the rows it requests),
+        consumers (ids of the checks that need it), executed (whether its result is already available),
+        cost (of the row itself), total_cost (of the row and all its dependencies, each counted once) and
+        complete (False if a dependency or cost is unknown, then total_cost is a lower bound)
+        """
+        validate_checks(checks)
+        return ExecutionPlan(checks, self.store).to_frame()
+
+    def run(self, *checks, logger_level=logger.ERROR, workers=1, backend='thread'):
         """
         Run the Detector with the checks to run.
         :param checks: checks to run
         :param logger_level: level of logging
+        :param workers: number of checks that are executed concurrently
+        :param backend: 'thread' executes the checks in a thread pool that shares the store.
+        'process' executes the checks in a process pool. Precalculations that two or more checks declare
+        are computed in this process before the checks are distributed, so that they are computed once.
+        Precalculations computed by the worker processes are merged back into the store, so that later runs
+        can reuse them.
         """
         logger.getLogger().setLevel(logger_level)
 
-        if not checks:
-            raise Exception("Please include checks)")
+        validate_checks(checks)
 
-        if not all(isinstance(check, Check) for check in checks):
-            class_names = map(lambda c: c.__class__.__name__, checks)
-            raise Exception("All elements in checks should be a Check. Received: {}".format(', '.join(class_names)))
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers should be an integer greater than 0. Received: {}".format(workers))
 
-        check_reports = []
-        for check in checks:
-            lprint("Executing {}".format(check.__class__.__name__), self.log_print)
+        if backend not in BACKENDS:
+            raise ValueError("backend should be one of {}. Received: {}".format(', '.join(BACKENDS), backend))
+
+        self.store.plan(checks)
+        if workers == 1 or len(checks) == 1:
+            self.check_reports = [self.execute_and_release(check) for check in checks]
+        elif backend == 'thread':
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                self.check_reports = list(executor.map(self.execute_and_release, checks))
+        else:
+            self.check_reports = self.run_in_processes(checks, workers)
+
+    def execute_and_release(self, check):
+        report = execute_check(check, self.store, self.log_print)
+        self.store.release(check)
+        return report
+
+    def run_in_processes(self, checks, workers):
+        """
+        Execute the checks in a process pool.
+        Every worker process owns a copy of the store. Precalculations that two or more checks need
+        (see ExecutionPlan.shared_precalculations) are executed before the pool is started, so that the workers
+        start with their results instead of computing them each. Precalculations that were executed by a worker are
+        sent back and added to the store of the detector. Reports that cannot be pickled (e.g. because their
+        figures are lambdas) are created again in this process, which is cheap as all needed
+        precalculations are available by then.
+        :param checks: checks to run
+        :param workers: number of worker processes
+        :return: list of reports in the order of the checks
+        """
+        self.execute_shared_precalculations(checks)
+        # the store is sent with every check, as pool initializers are not available before Python 3.7
+        store_id, pickled_store = uuid.uuid4().hex, pickle.dumps(self.store)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(execute_check_in_worker, check, store_id, pickled_store) for check in checks]
+
+            check_reports = []
+            for check, future in zip(checks, futures):
+                try:
+                    pickled_report, pickled_preprocessings, records = future.result()
+                except Exception as e:
+                    logger.warning("Could not execute {} in a worker process: {}".format(check.__class__.__name__,
+                                                                                          e))
+                    pickled_report, pickled_preprocessings, records = None, [], []
+
+                self.store.update(dict(pickle.loads(entry) for entry in pickled_preprocessings))
+                self.store.instrumentation.extend(records)
+
+                if pickled_report is None:
+                    check_reports.append(self.execute_and_release(check))
+                else:
+                    check_reports.append(pickle.loads(pickled_report))
+                    self.store.release(check)
+        return check_reports
+
+    def execute_shared_precalculations(self, checks):
+        """
+        Execute the precalculations that two or more checks need. Checks that opt out of sampling are not
+        considered, as they run on the store of the full data. A precalculation that fails is left to
+        the checks, so that its error ends up in their reports.
+        :param checks: checks that are run next
+        """
+        sampled_checks = [check for check in checks if check.use_full_data is not True]
+        for precalculation in ExecutionPlan(sampled_checks, self.store).shared_precalculations():
             try:
-                report = check.run(self.store)
-                check_reports.append(report)
+                self.store[precalculation]
             except Exception as e:
-                error_msg = {e.__class__.__name__: str(e)}
-                error_report = Report(check.__class__.__name__,
-                                      examined_columns=[],
-                                      shifted_columns=[],
-                                      information=error_msg)
-                check_reports.append(error_report)
-        self.check_reports = check_reports
+                logger.info("Could not execute {} before the checks: {}".format(precalculation.display_name(), e))
+
+    def profile(self, chrome_trace=None) -> pd.DataFrame:
+        """
+        Profile the executed checks and precalculations.
+        Every precalculation access is recorded with its cache usage: 'hit' if the result was already in the store,
+        'wait' if another thread was executing it, 'disk' if it was loaded from the persistent cache and
+        'miss' if it was executed. Times are in seconds, memory is in bytes and only measured with trace_memory.
+        :param chrome_trace: path to additionally write the profile to as Chrome trace events
+        :return: data frame with one row per check and precalculation access
+        """
+        if chrome_trace is not None:
+            self.store.instrumentation.to_chrome_trace(chrome_trace)
+        return self.store.instrumentation.profile()
 
     def evaluate(self):
         """
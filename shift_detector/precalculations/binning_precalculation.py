@@ -2,7 +2,7 @@ import pandas as pd
 from pandas import DataFrame
 
 from shift_detector.precalculations.precalculation import Precalculation
-from shift_detector.utils.column_management import ColumnType, is_categorical
+from shift_detector.utils.column_management import ColumnType
 
 
 class BinningPrecalculation(Precalculation):
@@ -18,6 +18,12 @@ class BinningPrecalculation(Precalculation):
     def __hash__(self):
         return hash(tuple([self.__class__, self.bins]))
 
+    def dependencies(self, store):
+        return []
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.numerical)
+
     def process(self, store):
         """
         Bin the numerical columns of the datasets that do not
@@ -36,7 +42,7 @@ class BinningPrecalculation(Precalculation):
 
         for column_name in columns:
             column = dfs[column_name]
-            if is_categorical(column):
+            if store.is_categorical(column_name):
                 dfs_binned[column_name] = column
             else:
                 column_name_binned = "{}_binned".format(column_name)
@@ -19,6 +19,13 @@ class ConditionalProbabilitiesPrecalculation(Precalculation):
         self.min_delta_supports = min_delta_supports
         self.min_delta_confidences = min_delta_confidences
 
+    def dependencies(self, store):
+        return [BinningPrecalculation(self.number_of_bins)]
+
+    def estimated_cost(self, store):
+        # frequent pattern mining passes over the transactions several times
+        return 10 * store.estimated_workload(ColumnType.categorical, ColumnType.numerical)
+
     def process(self, store):
         df1_cat, df2_cat = store[ColumnType.categorical]
         df1_num, df2_num = store[BinningPrecalculation(self.number_of_bins)]
@@ -56,6 +56,12 @@ class CountVectorizer(Precalculation):
         hash_list.extend(self.columns)
         return hash(tuple(hash_list))
 
+    def dependencies(self, store):
+        return []
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.text, per_character=True)
+
     def process(self, store):
         df1_texts, df2_texts = store[ColumnType.text]
         merged_texts = pd.concat([df1_texts, df2_texts], ignore_index=True)
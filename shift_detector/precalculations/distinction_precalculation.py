@@ -3,12 +3,14 @@ from typing import Tuple
 
 import numpy as np
 import pandas as pd
-from datawig import SimpleImputer
-from datawig.utils import random_split
-from sklearn.metrics import accuracy_score
-from sklearn.utils import shuffle
 
 from shift_detector.precalculations.precalculation import Precalculation
+from shift_detector.utils.lazy_import import LazyModule
+
+datawig = LazyModule('datawig')
+datawig_utils = LazyModule('datawig.utils')
+sklearn_metrics = LazyModule('sklearn.metrics')
+sklearn_utils = LazyModule('sklearn.utils')
 
 
 class DistinctionPrecalculation(Precalculation):
@@ -42,6 +44,12 @@ class DistinctionPrecalculation(Precalculation):
         hash_items = sorted(self.columns) + [self.__class__, self.num_epochs]
         return hash(tuple(hash_items))
 
+    def dependencies(self, store):
+        return []
+
+    def estimated_cost(self, store):
+        return self.num_epochs * store.estimated_workload()
+
     def process(self, store):
         """
         Runs check on provided columns
@@ -51,7 +59,7 @@ class DistinctionPrecalculation(Precalculation):
             raise Exception("Not all defined columns are present in both data frames. "
                             "Defined: {}. Actual: {}".format(self.columns, store.column_names()))
 
-        self.imputer = SimpleImputer(
+        self.imputer = datawig.SimpleImputer(
             input_columns=self.columns,
             output_column=self.output_column,
             output_path=self.output_path)
@@ -121,8 +129,8 @@ class DistinctionPrecalculation(Precalculation):
         df1, df2 = self.label_dfs(df1, df2)
         df1_sampled, df2_sampled = self.sample_dfs(df1, df2)
 
-        df1_train, df1_test = random_split(df1_sampled)
-        df2_train, df2_test = random_split(df2_sampled)
+        df1_train, df1_test = datawig_utils.random_split(df1_sampled)
+        df2_train, df2_test = datawig_utils.random_split(df2_sampled)
 
         return df1_train, df1_test, df2_train, df2_test
 
@@ -135,7 +143,7 @@ class DistinctionPrecalculation(Precalculation):
         imputed = self.imputer.predict(df)
         y_true, y_pred = imputed[self.output_column], imputed[self.output_column + '_imputed']
 
-        return accuracy_score(y_true, y_pred)
+        return sklearn_metrics.accuracy_score(y_true, y_pred)
 
     def permuted_accuracy(self, df1, df2, column):
         """
@@ -151,8 +159,8 @@ class DistinctionPrecalculation(Precalculation):
         df = pd.concat([df1, df2], ignore_index=True)
 
         for _ in range(5):
-            df1_col_rand = shuffle(df1[column])
-            df2_col_rand = shuffle(df2[column])
+            df1_col_rand = sklearn_utils.shuffle(df1[column])
+            df2_col_rand = sklearn_utils.shuffle(df2[column])
 
             col_rand = pd.concat([df2_col_rand, df1_col_rand], ignore_index=True)
             df[column] = col_rand
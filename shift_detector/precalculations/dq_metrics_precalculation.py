@@ -17,6 +17,14 @@ class DQMetricsPrecalculation(Precalculation):
     def __hash__(self):
         return hash(self.__class__)
 
+    def dependencies(self, store):
+        if self.text_metadata:
+            return [TextMetadata(), LowCardinalityPrecalculation()]
+        return [LowCardinalityPrecalculation()]
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.numerical, ColumnType.categorical)
+
     def process(self, store):
         if self.text_metadata:
             df1_metadata, df2_metadata = store[TextMetadata()]
@@ -100,3 +108,75 @@ class DQMetricsPrecalculation(Precalculation):
                     category_comparison[column][key] = {'df1': 0, 'df2': value}
 
         return category_comparison
+
+    @staticmethod
+    def process_summaries(store):
+        """
+        Compare the column summaries of a StreamingStore with the same metrics as process.
+        Quantiles are approximated by quantile sketches. The uniqueness of numerical columns is left out
+        if they have too many distinct values to be counted.
+        :param store: StreamingStore
+        :return: the comparisons
+        """
+        numerical1, numerical2 = store.numerical_summaries()
+        categorical1, categorical2, _ = store.categorical_summaries()
+        return {'attribute_val_comparison':
+                DQMetricsPrecalculation.compare_categorical_attribute_summaries(categorical1, categorical2),
+                'numerical_comparison': DQMetricsPrecalculation.compare_numerical_summaries(numerical1, numerical2),
+                'categorical_comparison':
+                DQMetricsPrecalculation.compare_categorical_summaries(categorical1, categorical2),
+                'metadata_comparison': None}
+
+    @staticmethod
+    def compare_numerical_summaries(summaries1, summaries2):
+        numerical_comparison = dict()
+        metric_names = ['mean', 'median', 'value_range', 'quartile_1', 'quartile_3', 'uniqueness', 'completeness',
+                        'std']
+
+        for column in summaries1:
+            numerical_comparison[column] = {metric_name: {} for metric_name in metric_names}
+            for df_name, summary in [('df1', summaries1[column]), ('df2', summaries2[column])]:
+                metrics = numerical_comparison[column]
+                metrics['value_range'][df_name] = float(summary.max) - float(summary.min)
+                metrics['quartile_1'][df_name] = summary.quantile(.25)
+                metrics['quartile_3'][df_name] = summary.quantile(.75)
+                metrics['median'][df_name] = summary.quantile(.5)
+                metrics['mean'][df_name] = summary.mean if summary.count > 0 else float('nan')
+                metrics['std'][df_name] = summary.std()
+                metrics['completeness'][df_name] = summary.completeness()
+                counts = summary.categorical_summary()
+                if counts is not None and 'uniqueness' in metrics:
+                    metrics['uniqueness'][df_name] = counts.uniqueness()
+                else:
+                    metrics.pop('uniqueness', None)
+        return numerical_comparison
+
+    @staticmethod
+    def compare_categorical_summaries(summaries1, summaries2):
+        categorical_comparison = dict()
+
+        for column in summaries1:
+            categorical_comparison[column] = {'num_distinct': {}, 'completeness': {}, 'uniqueness': {}}
+            for df_name, summary in [('df1', summaries1[column]), ('df2', summaries2[column])]:
+                categorical_comparison[column]['num_distinct'][df_name] = len(summary.counts)
+                categorical_comparison[column]['completeness'][df_name] = summary.completeness()
+                categorical_comparison[column]['uniqueness'][df_name] = summary.uniqueness()
+        return categorical_comparison
+
+    @staticmethod
+    def compare_categorical_attribute_summaries(summaries1, summaries2):
+        category_comparison = {}
+
+        for column in summaries1:
+            category_comparison[column] = {}
+            count1 = summaries1[column].count
+            count2 = summaries2[column].count
+            for key, value in summaries1[column].counts.items():
+                category_comparison[column][key] = {'df1': value / count1, 'df2': 0}
+            for key, value in summaries2[column].counts.items():
+                if key in category_comparison[column]:
+                    category_comparison[column][key]['df2'] = value / count2
+                else:
+                    category_comparison[column][key] = {'df1': 0, 'df2': value / count2}
+
+        return category_comparison
@@ -1,10 +1,13 @@
 from shift_detector.precalculations.text_embedding_precalculation import TextEmbeddingPrecalculation
 from shift_detector.precalculations.store import Store
 from shift_detector.precalculations.precalculation import Precalculation
-from datawig.utils import random_split
+from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.lazy_import import LazyModule
 import numpy as np
 from numpy.linalg import norm
 
+datawig_utils = LazyModule('datawig.utils')
+
 
 class EmbeddingDistancePrecalculation(Precalculation):
 
@@ -25,6 +28,12 @@ class EmbeddingDistancePrecalculation(Precalculation):
             vector += cell
         return vector / len(series)
 
+    def dependencies(self, store):
+        return [TextEmbeddingPrecalculation(model=self.model, trained_model=self.trained_model, agg='sum')]
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.text)
+
     def process(self, store: Store) -> dict:
         """
         Calculate the euclidean distance between two embeddings.
@@ -34,8 +43,8 @@ class EmbeddingDistancePrecalculation(Precalculation):
 
         df1, df2 = store[TextEmbeddingPrecalculation(model=self.model, trained_model=self.trained_model, agg='sum')]
 
-        df1a, df1b = random_split(df1, [0.95, 0.05])           # Baseline for df1
-        df2a, df2b = random_split(df2, [0.95, 0.05])           # Baseline for df2
+        df1a, df1b = datawig_utils.random_split(df1, [0.95, 0.05])           # Baseline for df1
+        df2a, df2b = datawig_utils.random_split(df2, [0.95, 0.05])           # Baseline for df2
 
         if df1a.empty or df1b.empty or df2a.empty or df2b.empty:
             raise ValueError('Dataset to small for split ratio')
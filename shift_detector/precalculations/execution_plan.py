@@ -0,0 +1,111 @@
+import logging as logger
+
+import pandas as pd
+
+PLAN_COLUMNS = ['kind', 'name', 'dependencies', 'consumers', 'executed', 'cost', 'total_cost', 'complete']
+
+
+class ExecutionPlan:
+    """
+    Dry run of checks: the deduplicated graph of the precalculations they need, with estimated costs.
+    Nothing is executed, dependencies and costs are declared by the checks and precalculations
+    (see Check.needed_precalculations, Precalculation.dependencies and Precalculation.estimated_cost).
+    :param checks: the checks to plan
+    :param store: the store the checks would run on
+    """
+
+    def __init__(self, checks, store):
+        self.store = store
+        self.ids = {}
+        self.rows = []
+        self.closures = []
+        # precalculations are visited first, so that they precede all checks
+        planned_checks = [(check, self.__visit_needed_precalculations(check)) for check in checks]
+        for check, dependencies in planned_checks:
+            self.__add_row('check', check.__class__.__name__, dependencies or [], False, 0.0,
+                           known=dependencies is not None)
+
+    def __visit_needed_precalculations(self, check):
+        try:
+            needed_precalculations = check.needed_precalculations(self.store)
+        except Exception as e:
+            logger.info("Precalculations of {} are unknown: {}".format(check.__class__.__name__, e))
+            return None
+        if needed_precalculations is None:
+            return None
+        return [self.__visit(precalculation) for precalculation in needed_precalculations]
+
+    def __visit(self, precalculation):
+        if precalculation in self.ids:
+            return self.ids[precalculation]
+
+        executed = self.store.is_executed(precalculation)
+        if executed:
+            # the dependencies of an executed precalculation are not requested again
+            dependencies, cost = [], 0.0
+        else:
+            dependencies = self.__declared(precalculation.dependencies, precalculation)
+            cost = self.__declared(precalculation.estimated_cost, precalculation)
+
+        dependency_ids = [self.__visit(dependency) for dependency in dependencies or []]
+        row_id = self.__add_row('precalculation', precalculation.display_name(), dependency_ids, executed,
+                                float('nan') if cost is None else float(cost),
+                                known=dependencies is not None and cost is not None)
+        self.ids[precalculation] = row_id
+        return row_id
+
+    def __declared(self, method, precalculation):
+        try:
+            return method(self.store)
+        except Exception as e:
+            logger.info("{} of {} is unknown: {}".format(method.__name__, precalculation.display_name(), e))
+            return None
+
+    def __add_row(self, kind, name, dependencies, executed, cost, known):
+        closure = {len(self.rows)}.union(*(self.closures[dependency] for dependency in dependencies))
+        self.closures.append(closure)
+        self.rows.append({'kind': kind,
+                          'name': name,
+                          'dependencies': dependencies,
+                          'executed': executed,
+                          'cost': cost,
+                          'known': known})
+        return len(self.rows) - 1
+
+    def __consumers(self):
+        consumers = [[] for _ in self.rows]
+        for row_id, row in enumerate(self.rows):
+            if row['kind'] == 'check':
+                for dependency in sorted(self.closures[row_id] - {row_id}):
+                    consumers[dependency].append(row_id)
+        return consumers
+
+    def shared_precalculations(self):
+        """
+        :return: the precalculations that are not executed yet and that two or more checks need, directly or
+        through other precalculations, ordered so that dependencies come first
+        """
+        consumers = self.__consumers()
+        return [precalculation for precalculation, row_id in sorted(self.ids.items(), key=lambda item: item[1])
+                if not self.rows[row_id]['executed'] and len(consumers[row_id]) > 1]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        :return: data frame with one row per precalculation, ordered so that dependencies come first,
+        followed by one row per check. See Detector.plan for the columns.
+        """
+        consumers = self.__consumers()
+        records = []
+        for row_id, row in enumerate(self.rows):
+            closure = self.closures[row_id]
+            records.append({'kind': row['kind'],
+                            'name': row['name'],
+                            'dependencies': row['dependencies'],
+                            'consumers': consumers[row_id],
+                            'executed': row['executed'],
+                            'cost': row['cost'],
+                            'total_cost': float(pd.Series([self.rows[i]['cost'] for i in closure]).sum()),
+                            'complete': all(self.rows[i]['known'] for i in closure)})
+        plan = pd.DataFrame(records, columns=PLAN_COLUMNS)
+        plan.index.name = 'id'
+        return plan
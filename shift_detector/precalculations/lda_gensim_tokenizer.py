@@ -66,6 +66,12 @@ class LdaGensimTokenizer(Precalculation):
             tokenized.append(wordlist)
         return tokenized
 
+    def dependencies(self, store):
+        return []
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.text, per_character=True)
+
     def process(self, store):
         df1_texts, df2_texts = store[ColumnType.text]
 
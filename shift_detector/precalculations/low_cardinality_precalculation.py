@@ -2,7 +2,6 @@ import pandas as pd
 
 from shift_detector.precalculations.precalculation import Precalculation
 from shift_detector.utils.column_management import ColumnType
-from shift_detector.utils.column_management import is_categorical
 
 
 class LowCardinalityPrecalculation(Precalculation):
@@ -13,12 +12,17 @@ class LowCardinalityPrecalculation(Precalculation):
     def __hash__(self):
         return hash(LowCardinalityPrecalculation)
 
+    def dependencies(self, store):
+        return []
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.numerical, ColumnType.categorical)
+
     def process(self, store):
         df1_numerical, df2_numerical = store[ColumnType.numerical]
         numerical_columns = store.column_names(ColumnType.numerical)
 
-        low_cardinal_numerical_columns = [c for c in numerical_columns if
-                                          is_categorical(df1_numerical[c]) and is_categorical(df2_numerical[c])]
+        low_cardinal_numerical_columns = [c for c in numerical_columns if store.is_categorical(c)]
 
         categorical_columns = store.column_names(ColumnType.categorical)
 
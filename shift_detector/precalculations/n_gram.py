@@ -1,6 +1,6 @@
 from enum import Enum
 
-from shift_detector.precalculations.precalculation import Precalculation
+from shift_detector.precalculations.precalculation import DatasetwisePrecalculation
 from shift_detector.precalculations.store import Store
 from shift_detector.utils.column_management import ColumnType
 
@@ -10,7 +10,7 @@ class NGramType(Enum):
     character = "character"
 
 
-class NGram(Precalculation):
+class NGram(DatasetwisePrecalculation):
 
     def __init__(self, n: int, ngram_type: NGramType):
         self.n = n
@@ -19,7 +19,7 @@ class NGram(Precalculation):
             raise ValueError('n has to be greater than 0')
 
     def __eq__(self, other):
-        return self.n == other.n and self.ngram_type == other.ngram_type
+        return isinstance(other, self.__class__) and self.n == other.n and self.ngram_type == other.ngram_type
 
     def __hash__(self):
         """
@@ -40,26 +40,25 @@ class NGram(Precalculation):
             ngram[segment] = 1 if segment not in ngram else ngram[segment] + 1
         return ngram
 
-    def process(self, store: Store) -> tuple:
+    def dataset_dependencies(self, store, index):
+        return []
+
+    def estimated_dataset_cost(self, store, index):
+        return store.estimated_workload(ColumnType.text, index=index, per_character=True)
+
+    def process_dataset(self, store: Store, index: int):
         """
         :param store:
-        :return: a tuple that contains the processed dataframes
+        :param index: index of the data frame in the store
+        :return: the processed dataframe
         """
 
-        df1, df2 = store[ColumnType.text]
-        df1 = df1.copy()
-        df2 = df2.copy()
-
-        for column in df1:
-            df1[column] = df1[column].dropna().str.lower()
-            if self.ngram_type == NGramType.word:
-                df1[column] = df1[column].str.split()
-            df1[column] = df1[column].apply(lambda row: self.generate_ngram(tuple(row)))
+        df = store[ColumnType.text][index].copy()
 
-        for column in df2:
-            df2[column] = df2[column].dropna().str.lower()
+        for column in df:
+            df[column] = df[column].dropna().str.lower()
             if self.ngram_type == NGramType.word:
-                df2[column] = df2[column].str.split()
-            df2[column] = df2[column].apply(lambda row: self.generate_ngram(tuple(row)))
+                df[column] = df[column].str.split()
+            df[column] = df[column].apply(lambda row: self.generate_ngram(tuple(row)))
 
-        return df1, df2
+        return df
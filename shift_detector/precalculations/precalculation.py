@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
+from shift_detector.utils.fingerprint import stable_fingerprint
+
 
 class Precalculation(metaclass=ABCMeta):
 
@@ -16,3 +18,115 @@ class Precalculation(metaclass=ABCMeta):
     @abstractmethod
     def process(self, store):
         raise NotImplementedError
+
+    def display_name(self):
+        """
+        :return: name of the precalculation in logs and profiles
+        """
+        return self.__class__.__name__
+
+    def dependencies(self, store):
+        """
+        Declare the precalculations whose results this precalculation requests from the store, see Detector.plan.
+        :param store: the store
+        :return: list of precalculations or None if they are unknown
+        """
+        return None
+
+    def estimated_cost(self, store):
+        """
+        Estimate the relative cost of processing this precalculation, without the cost of its dependencies.
+        The unit is the cost of handling one cell, see Store.estimated_workload.
+        By default, every cell of the shared columns is handled once.
+        :param store: the store
+        :return: estimated cost
+        """
+        return store.estimated_workload()
+
+    def fingerprint(self):
+        """
+        Calculate a fingerprint that identifies the result of this precalculation across python processes.
+        By default, it is derived from the class and the attributes of the precalculation.
+        :return: hexadecimal fingerprint
+        :raises TypeError: if an attribute cannot be fingerprinted. The result is not cached persistently then.
+        """
+        return stable_fingerprint((self.__class__, vars(self)))
+
+
+class DatasetwisePrecalculation(Precalculation, metaclass=ABCMeta):
+    """
+    Precalculation whose result for one data frame does not depend on the other data frame.
+    The results for both data frames are executed separately as DatasetwiseResults,
+    so that the result for a reference data frame can be profiled once and reused (see ReferenceProfile).
+    """
+
+    @abstractmethod
+    def process_dataset(self, store, index):
+        """
+        :param store: the store
+        :param index: 0 for the first and 1 for the second data frame of the store
+        :return: the result for the data frame
+        """
+        raise NotImplementedError
+
+    def dataset_dependencies(self, store, index):
+        """
+        :param store: the store
+        :param index: 0 for the first and 1 for the second data frame of the store
+        :return: list of the precalculations that process_dataset requests or None if they are unknown
+        """
+        return None
+
+    def estimated_dataset_cost(self, store, index):
+        """
+        :param store: the store
+        :param index: 0 for the first and 1 for the second data frame of the store
+        :return: estimated cost of process_dataset, see Precalculation.estimated_cost
+        """
+        return store.estimated_workload(index=index)
+
+    def dependencies(self, store):
+        return [DatasetwiseResult(self, 0), DatasetwiseResult(self, 1)]
+
+    def estimated_cost(self, store):
+        return 0.0
+
+    def process(self, store):
+        return store[DatasetwiseResult(self, 0)], store[DatasetwiseResult(self, 1)]
+
+
+class DatasetwiseResult(Precalculation):
+    """
+    Result of a DatasetwisePrecalculation for one data frame of the store.
+    :param precalculation: the DatasetwisePrecalculation
+    :param index: 0 for the first and 1 for the second data frame of the store
+    """
+
+    def __init__(self, precalculation, index):
+        if not isinstance(precalculation, DatasetwisePrecalculation):
+            raise TypeError("precalculation should be a DatasetwisePrecalculation. "
+                            "Received: {}".format(precalculation.__class__.__name__))
+        if index not in (0, 1):
+            raise ValueError("index should be 0 or 1. Received: {}".format(index))
+        self.precalculation = precalculation
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) \
+               and self.precalculation == other.precalculation \
+               and self.index == other.index
+
+    def __hash__(self):
+        return hash((self.__class__, self.precalculation, self.index))
+
+    def display_name(self):
+        return '{}[df{}]'.format(self.precalculation.display_name(), self.index + 1)
+
+    def dependencies(self, store):
+        return self.precalculation.dataset_dependencies(store, self.index)
+
+    def estimated_cost(self, store):
+        return self.precalculation.estimated_dataset_cost(store, self.index)
+
+    def process(self, store):
+        return self.precalculation.process_dataset(store, self.index)
@@ -0,0 +1,130 @@
+import logging as logger
+import os
+import pickle
+import tempfile
+import threading
+
+CACHE_FILE_SUFFIX = '.pickle'
+
+
+class PrecalculationCache:
+    """
+    Persistent cache for the results of precalculations.
+    Every result is stored as a pickle file in the cache directory. If the size of the directory
+    exceeds max_size, the least recently used results are removed.
+    :param directory: directory to store the results in, it is created if it does not exist
+    :param max_size: maximum size of the cache in bytes, None for an unbounded cache
+    """
+
+    def __init__(self, directory, max_size=None):
+        if max_size is not None and (not isinstance(max_size, int) or max_size < 0):
+            raise ValueError("max_size should be None or a positive integer. Received: {}".format(max_size))
+        self.directory = directory
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + CACHE_FILE_SUFFIX)
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def load(self, key):
+        """
+        Load the result stored for key and mark it as recently used.
+        :param key: key of the result
+        :return: the stored result
+        :raises KeyError: if there is no result for key
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                result = pickle.load(file)
+        except FileNotFoundError:
+            raise KeyError(key)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning("Removing unreadable cache entry {}: {}".format(key, e))
+            self.invalidate(key)
+            raise KeyError(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def save(self, key, result):
+        """
+        Store result for key. Results that cannot be pickled are not stored.
+        :param key: key of the result
+        :param result: the result to store
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self.path(key))
+        except Exception as e:
+            logger.info("Result for cache entry {} cannot be stored: {}".format(key, e))
+            os.remove(temporary_path)
+            return
+        self.evict()
+
+    def invalidate(self, key):
+        """
+        Remove the result stored for key, if there is one.
+        :param key: key of the result
+        """
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Remove all results from the cache.
+        """
+        for key, _, _ in self.entries():
+            self.invalidate(key)
+
+    def entries(self):
+        """
+        :return: list of (key, size in bytes, time of last use) of all stored results
+        """
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                continue
+            entries.append((file_name[:-len(CACHE_FILE_SUFFIX)], stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove the least recently used results until the cache does not exceed max_size.
+        """
+        if self.max_size is None:
+            return
+        with self.lock:
+            entries = sorted(self.entries(), key=lambda entry: entry[2])
+            total_size = sum(size for _, size, _ in entries)
+            for key, size, _ in entries:
+                if total_size <= self.max_size:
+                    break
+                self.invalidate(key)
+                total_size -= size
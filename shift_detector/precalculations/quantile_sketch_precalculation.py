@@ -0,0 +1,60 @@
+from shift_detector.precalculations.precalculation import DatasetwisePrecalculation
+from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.sketches import QuantileSketch
+
+# number of values that are added to a sketch at once, bounds the memory that is needed besides the sketch
+SKETCH_CHUNK_SIZE = 100000
+
+
+def sketch_columns(df, columns, k=1000, chunk_size=SKETCH_CHUNK_SIZE):
+    """
+    Summarize numerical columns with QuantileSketches. Sketches of different chunks of the same data,
+    e.g. of partitions or of data that is processed by other processes, can be combined with QuantileSketch.merge.
+    :param df: data frame
+    :param columns: numerical columns of df
+    :param k: accuracy parameter of the sketches
+    :param chunk_size: number of values that are added to a sketch at once
+    :return: dictionary that maps the columns to their sketches
+    """
+    sketches = {}
+    for column in columns:
+        sketch = QuantileSketch(k)
+        values = df[column].values
+        for start in range(0, len(values), chunk_size):
+            sketch.update(values[start:start + chunk_size])
+        sketches[column] = sketch
+    return sketches
+
+
+class QuantileSketchPrecalculation(DatasetwisePrecalculation):
+    """
+    QuantileSketches of the numerical columns of both data frames. As the sketches are datasetwise results,
+    the sketches of a reference data frame are kept in its ReferenceProfile.
+    :param k: accuracy parameter of the sketches, see QuantileSketch
+    """
+
+    def __init__(self, k=1000):
+        if not isinstance(k, int) or k < 2:
+            raise ValueError("k should be an integer greater than 1. Received: {}".format(k))
+        self.k = k
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.k == other.k
+
+    def __hash__(self):
+        return hash((self.__class__, self.k))
+
+    def dataset_dependencies(self, store, index):
+        return []
+
+    def estimated_dataset_cost(self, store, index):
+        return store.estimated_workload(ColumnType.numerical, index=index)
+
+    def process_dataset(self, store, index):
+        """
+        :param store: the store
+        :param index: 0 for the first and 1 for the second data frame of the store
+        :return: dictionary that maps the numerical columns to their sketches
+        """
+        df = store[ColumnType.numerical][index]
+        return sketch_columns(df, store.column_names(ColumnType.numerical), self.k)
@@ -0,0 +1,99 @@
+import pickle
+
+from pandas import DataFrame
+
+from shift_detector.precalculations.precalculation import DatasetwisePrecalculation, DatasetwiseResult
+from shift_detector.precalculations.store import Store
+
+
+class ReferenceProfile:
+    """
+    Profile of a reference data frame, e.g. a training set, that is compared with many other data frames.
+    It contains the typed reference data, its column types, column statistics and column encodings and
+    the results of datasetwise precalculations for the reference data. Stores created from a profile
+    (see Store.from_profile) reuse these results and only analyze the data frame that is compared with the reference.
+    Use from_data or from_store to create a profile.
+    :param df: the typed reference data frame
+    :param type_to_columns: dictionary that maps the column types to the respective columns
+    :param preprocessings: dictionary that maps DatasetwiseResults for the reference data to their results
+    :param column_statistics: dictionary that maps the columns to their ColumnStatistics, None to estimate them
+    for every store again
+    :param encodings: dictionary that maps the categorical and text columns to their dictionary encodings
+    (see Store.column_encodings), None to encode them for every store again
+    """
+
+    def __init__(self, df: DataFrame, type_to_columns, preprocessings, column_statistics=None, encodings=None):
+        if any([not isinstance(precalculation, DatasetwiseResult) or precalculation.index != 0
+                for precalculation in preprocessings]):
+            raise TypeError("All keys of preprocessings should be DatasetwiseResults for the first data frame.")
+        self.df = df
+        self.type_to_columns = type_to_columns
+        self.preprocessings = preprocessings
+        self.column_statistics = column_statistics
+        self.encodings = encodings
+
+    def __setstate__(self, state):
+        # profiles that were saved before the statistics and encodings were profiled
+        self.__dict__.update({'column_statistics': None, 'encodings': None}, **state)
+
+    @classmethod
+    def from_data(cls, df: DataFrame, *precalculations, log_print=False, custom_column_types={}):
+        """
+        Profile df by detecting its column types and executing the precalculations for it.
+        :param df: the reference data frame
+        :param precalculations: DatasetwisePrecalculations to execute for the reference data
+        :param log_print: print progress information
+        :param custom_column_types: dictionary that maps column names to ColumnTypes
+        :return: the profile
+        """
+        if any([not isinstance(precalculation, DatasetwisePrecalculation) for precalculation in precalculations]):
+            class_names = map(lambda p: p.__class__.__name__, precalculations)
+            raise TypeError("All precalculations should be a DatasetwisePrecalculation. "
+                            "Received: {}".format(', '.join(class_names)))
+
+        store = Store(df, df, log_print=log_print, custom_column_types=custom_column_types)
+        for precalculation in precalculations:
+            store[DatasetwiseResult(precalculation, 0)]
+        return cls.from_store(store)
+
+    @classmethod
+    def from_store(cls, store: Store):
+        """
+        Profile the first data frame of store with all datasetwise results that were executed for it.
+        :param store: the store
+        :return: the profile
+        """
+        with store.lock:
+            preprocessings = {precalculation: preprocessing
+                              for precalculation, preprocessing in store.preprocessings.items()
+                              if isinstance(precalculation, DatasetwiseResult) and precalculation.index == 0}
+        type_to_columns = {column_type: list(columns) for column_type, columns in store.type_to_columns.items()}
+        return cls(store.df1, type_to_columns, preprocessings, store.column_statistics[0], store.column_encodings(0))
+
+    def column_names(self):
+        return [column for columns in self.type_to_columns.values() for column in columns]
+
+    def column_types(self):
+        """
+        :return: dictionary that maps the column names to their ColumnType
+        """
+        return {column: column_type for column_type, columns in self.type_to_columns.items() for column in columns}
+
+    def precalculations(self):
+        """
+        :return: the profiled DatasetwisePrecalculations
+        """
+        return [result.precalculation for result in self.preprocessings]
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as file:
+            profile = pickle.load(file)
+        if not isinstance(profile, ReferenceProfile):
+            raise TypeError("{} does not contain a ReferenceProfile. "
+                            "Received: {}".format(path, profile.__class__.__name__))
+        return profile
@@ -2,7 +2,10 @@ import pandas as pd
 from shift_detector.precalculations.n_gram import NGram, NGramType
 from shift_detector.precalculations.store import Store
 from shift_detector.precalculations.precalculation import Precalculation
-from datawig.utils import random_split
+from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.lazy_import import LazyModule
+
+datawig_utils = LazyModule('datawig.utils')
 
 
 class SorensenDicePrecalculations(Precalculation):
@@ -59,6 +62,12 @@ class SorensenDicePrecalculations(Precalculation):
             final_ngram[i] /= n
         return final_ngram
 
+    def dependencies(self, store):
+        return [NGram(n=self.n, ngram_type=self.ngram_type)]
+
+    def estimated_cost(self, store):
+        return store.estimated_workload(ColumnType.text)
+
     def process(self, store: Store) -> dict:
         """
         Calculate the Sørensen dice coefficient between two columns
@@ -68,8 +77,8 @@ class SorensenDicePrecalculations(Precalculation):
 
         df1, df2 = store[NGram(n=self.n, ngram_type=self.ngram_type)]
 
-        df1a, df1b = random_split(df1, [0.95, 0.05], seed=11)           # Baseline for df1
-        df2a, df2b = random_split(df2, [0.95, 0.05], seed=11)           # Baseline for df2
+        df1a, df1b = datawig_utils.random_split(df1, [0.95, 0.05], seed=11)           # Baseline for df1
+        df2a, df2b = datawig_utils.random_split(df2, [0.95, 0.05], seed=11)           # Baseline for df2
 
         if df1b.empty or df2b.empty:
             raise ValueError('Dataset to small for split ratio or n={} to big'.format(self.n))
@@ -85,3 +94,29 @@ class SorensenDicePrecalculations(Precalculation):
                                             self.join_and_normalize_ngrams(df2[i])))
 
         return result
+
+    def process_summaries(self, store) -> dict:
+        """
+        Calculate the Sørensen dice coefficients on the n-gram summaries of a StreamingStore.
+        The baselines compare the texts of each file that were assigned to the baseline part of its
+        NGramSummary with the remaining texts, analogous to the random split of process.
+        :param store: StreamingStore
+        :return: the coefficients like process
+        """
+        summaries1, summaries2 = store.ngram_summaries(ngram_type=self.ngram_type, n=self.n)
+
+        result = {}
+        for i in summaries1:
+            summary1, summary2 = summaries1[i], summaries2[i]
+            if min(summary1.rows['baseline'], summary1.rows['remaining'],
+                   summary2.rows['baseline'], summary2.rows['remaining']) == 0:
+                raise ValueError('Dataset to small for split ratio or n={} to big'.format(self.n))
+
+            result[i] = (self.calculate_sdc(summary1.normalized_histogram('remaining'),
+                                            summary1.normalized_histogram('baseline')),
+                         self.calculate_sdc(summary2.normalized_histogram('remaining'),
+                                            summary2.normalized_histogram('baseline')),
+                         self.calculate_sdc(summary1.normalized_histogram(),
+                                            summary2.normalized_histogram()))
+
+        return result
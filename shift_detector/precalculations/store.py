@@ -1,30 +1,91 @@
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict, Counter, defaultdict
+from concurrent.futures import Future
+
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
 from shift_detector.precalculations.precalculation import Precalculation
+from shift_detector.precalculations.precalculation_cache import PrecalculationCache
 from shift_detector.utils.column_management import detect_column_types, ColumnType, \
-    CATEGORICAL_MAX_RELATIVE_CARDINALITY, column_names
+    CATEGORICAL_MAX_RELATIVE_CARDINALITY, column_names, column_statistics, encode_columns, compact_codes, \
+    encode_column, merge_encodings
 from shift_detector.utils.custom_print import lprint
 from shift_detector.utils.data_io import shared_column_names
 from shift_detector.utils.errors import InsufficientDataError
+from shift_detector.utils.fingerprint import data_fingerprint, stable_fingerprint
+from shift_detector.utils.instrumentation import Instrumentation
+from shift_detector.utils.memory import estimate_size
+from shift_detector.utils.sampling import validate_sampling, sample_rows as sample_rows_of
 
 MIN_DATA_SIZE = int(CATEGORICAL_MAX_RELATIVE_CARDINALITY * 100)
 
+# part of every cache key, increase it if the format of cached results changes
+CACHE_VERSION = 1
+
+# number of texts per column whose lengths are measured to estimate workloads
+WORKLOAD_SAMPLE_SIZE = 1000
+
 
 class Store:
+    """
+    The store executes precalculations and keeps their results.
+    :param df1: first data frame
+    :param df2: second data frame
+    :param log_print: print progress information
+    :param custom_column_types: dictionary that maps column names to ColumnTypes
+    :param cache_dir: directory to persist the results of precalculations in, None disables the persistent cache.
+    Results are keyed by the content of the data and the parameters of the precalculation,
+    so they are reused by later stores on the same data.
+    :param cache_size: maximum size of cache_dir in bytes, None for an unbounded cache
+    :param trace_memory: measure the peak memory of precalculations, see Instrumentation
+    :param memory_budget: maximum estimated size in bytes of the kept results, None for no limit.
+    If it is exceeded, the least recently used results are spilled to disk and loaded again when they are needed.
+    Results that cannot be pickled are dropped and executed again.
+    :param release_precalculations: release results as soon as no planned check needs them anymore, see plan
+    :param sample_rows: number of rows to sample from each data frame before anything is processed, None to use all
+    rows. All precalculations work on the same samples, checks that need the full data can opt out (see unsampled).
+    :param sampling_strategy: 'uniform', 'reservoir' or 'stratified', see sample_rows in utils.sampling
+    :param sampling_seed: seed of the samples
+    :param stratify_by: column to stratify the samples by, required for the 'stratified' strategy
+    :param reference: ReferenceProfile of df1, whose column statistics and column encodings are reused instead of
+    being computed for df1 again, see from_profile
+    """
 
     def __init__(self,
                  df1: DataFrame,
                  df2: DataFrame,
                  log_print=False,
-                 custom_column_types={}):
+                 custom_column_types={},
+                 cache_dir=None,
+                 cache_size=None,
+                 trace_memory=False,
+                 memory_budget=None,
+                 release_precalculations=False,
+                 sample_rows=None,
+                 sampling_strategy='uniform',
+                 sampling_seed=0,
+                 stratify_by=None,
+                 reference=None):
         self.verify_min_data_size(min([len(df1), len(df2)]))
 
         self.shared_columns = shared_column_names(df1, df2)
-        self.df1 = df1[self.shared_columns]
-        self.df2 = df2[self.shared_columns]
         self.log_print = log_print
 
+        validate_sampling(sample_rows, sampling_strategy, stratify_by)
+        self.full_dfs = (df1[self.shared_columns], df2[self.shared_columns])
+        self.df1, self.df2 = (self.full_dfs if sample_rows is None else
+                              [sample_rows_of(df, sample_rows, sampling_strategy, sampling_seed, stratify_by)
+                               for df in self.full_dfs])
+        if sample_rows is not None:
+            lprint("Sampled {} and {} rows".format(len(self.df1), len(self.df2)), self.log_print)
+            self.verify_min_data_size(min([len(self.df1), len(self.df2)]))
+        self.cache_settings = (cache_dir, cache_size)
+        self.__unsampled = None
+
         if not isinstance(custom_column_types, dict):
             raise TypeError("column_types is not a dictionary."
                             "Received: {}".format(custom_column_types.__class__.__name__))
@@ -37,9 +98,18 @@ class Store:
             raise TypeError("Not all values of column_types are of type ColumnType."
                             "Received: {}".format(list(custom_column_types.values())))
 
-        self.type_to_columns = detect_column_types(self.df1, self.df2, self.shared_columns)
+        # cardinality estimates of all columns, estimated once and reused by all precalculations
+        reference_statistics = getattr(reference, 'column_statistics', None)
+        self.column_statistics = (column_statistics(self.df1, self.shared_columns) if reference_statistics is None
+                                  else {column: reference_statistics[column] for column in self.shared_columns},
+                                  column_statistics(self.df2, self.shared_columns))
+        undetermined_columns = [column for column in self.shared_columns if column not in custom_column_types]
+        self.type_to_columns = detect_column_types(self.df1, self.df2, undetermined_columns,
+                                                   statistics=self.column_statistics)
 
-        self.__apply_column_types(custom_column_types)
+        # dictionary encodings of the text columns, see text_encoding
+        self.text_encodings = {}
+        self.__apply_column_types(custom_column_types, getattr(reference, 'encodings', None) or {})
 
         lprint("Numerical columns: {}".format(", ".join(column_names(self.column_names(ColumnType.numerical)))),
                self.log_print)
@@ -49,7 +119,53 @@ class Store:
 
         self.splitted_dfs = {column_type: (self.df1[columns], self.df2[columns])
                              for column_type, columns in self.type_to_columns.items()}
-        self.preprocessings = {}
+        # ordered from least to most recently used
+        self.preprocessings = OrderedDict()
+        self.instrumentation = Instrumentation(trace_memory=trace_memory)
+        self.cache = PrecalculationCache(cache_dir, max_size=cache_size) if cache_dir is not None else None
+        self.__data_fingerprint = None
+
+        if memory_budget is not None and (not isinstance(memory_budget, int) or memory_budget < 0):
+            raise ValueError("memory_budget should be None or a positive integer. Received: {}".format(memory_budget))
+        self.memory_budget = memory_budget
+        self.sizes = {}
+        self.spilled = {}
+        # results that are being written to the spill directory, kept until they are written
+        self.spilling = {}
+        self.spill_directory = None
+        self.spill_cache = None
+
+        self.release_precalculations = release_precalculations
+        # number of pending planned checks that need a precalculation
+        self.consumers = Counter()
+        # number of pending planned checks that do not declare the precalculations they need
+        self.unknown_consumers = 0
+        # maps precalculations to the precalculations that requested them during their execution
+        self.dependents = defaultdict(set)
+        self.__init_synchronization()
+
+    def __init_synchronization(self):
+        # guards preprocessings, in_progress and spilling,
+        # never held while a precalculation is processed or a result is written to disk
+        self.lock = threading.Lock()
+        # maps precalculations that are currently processed to a Future of their result
+        self.in_progress = {}
+        # stack of the precalculations that are executed by the current thread
+        self.local = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        del state['in_progress']
+        del state['local']
+        # the spill directory is removed with the store of the main process only
+        state['spill_directory'] = None
+        state['spilling'] = dict(self.spilling)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__init_synchronization()
 
     def __getitem__(self, needed_preprocessing) -> DataFrame:
         if isinstance(needed_preprocessing, ColumnType):
@@ -58,17 +174,330 @@ class Store:
         if not isinstance(needed_preprocessing, Precalculation):
             raise TypeError("Needed Preprocessing must be of type Precalculation or ColumnType")
 
-        if needed_preprocessing in self.preprocessings:
-            lprint("- Use already executed {}".format(needed_preprocessing.__class__.__name__), self.log_print)
-            return self.preprocessings[needed_preprocessing]
+        name = needed_preprocessing.display_name()
+        executing = self.__executing()
+        with self.lock:
+            if executing:
+                self.dependents[needed_preprocessing].add(executing[-1])
+
+            if needed_preprocessing in self.preprocessings:
+                lprint("- Use already executed {}".format(name), self.log_print)
+                self.instrumentation.record('precalculation', name, 'hit')
+                self.preprocessings.move_to_end(needed_preprocessing)
+                return self.preprocessings[needed_preprocessing]
+
+            if needed_preprocessing in self.spilling:
+                lprint("- Use {}, it is being spilled".format(name), self.log_print)
+                self.instrumentation.record('precalculation', name, 'hit')
+                return self.spilling[needed_preprocessing]
+
+            future = self.in_progress.get(needed_preprocessing)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.in_progress[needed_preprocessing] = future
+
+        if not is_owner:
+            # another thread is already executing this precalculation: wait for its result
+            lprint("- Wait for {}".format(name), self.log_print)
+            with self.instrumentation.measure('precalculation', name, cache='wait'):
+                return future.result()
 
-        lprint("- Executing {}".format(needed_preprocessing.__class__.__name__), self.log_print)
-        preprocessing = needed_preprocessing.process(self)
+        lprint("- Executing {}".format(name), self.log_print)
+        executing.append(needed_preprocessing)
+        try:
+            with self.instrumentation.measure('precalculation', name, cache='miss') as record:
+                preprocessing = self.__load_or_process(needed_preprocessing, record)
+        except BaseException as e:
+            with self.lock:
+                del self.in_progress[needed_preprocessing]
+            future.set_exception(e)
+            raise
+        finally:
+            executing.pop()
         lprint("- Finished Precalculation", self.log_print)
 
-        self.preprocessings[needed_preprocessing] = preprocessing
+        with self.lock:
+            self.__add(needed_preprocessing, preprocessing)
+            del self.in_progress[needed_preprocessing]
+            spills = self.__enforce_memory_budget()
+        future.set_result(preprocessing)
+        self.__spill(spills)
+        return preprocessing
+
+    def __executing(self):
+        if not hasattr(self.local, 'executing'):
+            self.local.executing = []
+        return self.local.executing
+
+    def __add(self, precalculation, preprocessing):
+        self.preprocessings[precalculation] = preprocessing
+        self.preprocessings.move_to_end(precalculation)
+        if self.memory_budget is not None:
+            self.sizes[precalculation] = estimate_size(preprocessing)
+
+    def __remove(self, precalculation):
+        self.sizes.pop(precalculation, None)
+        return self.preprocessings.pop(precalculation, None)
+
+    def memory_usage(self):
+        """
+        :return: estimated size in bytes of the kept results, only available with a memory_budget
+        """
+        return sum(self.sizes.values())
+
+    def __enforce_memory_budget(self):
+        """
+        Select the results that exceed the memory budget. Must be called with the lock held,
+        the selected results are written to disk by __spill after the lock is released.
+        :return: list of the (precalculation, result) pairs to spill
+        """
+        spills = []
+        if self.memory_budget is None:
+            return spills
+        memory_usage = self.memory_usage()
+        # the most recently used result is kept even if it exceeds the budget on its own
+        while memory_usage > self.memory_budget and len(self.preprocessings) > 1:
+            precalculation = next(iter(self.preprocessings))
+            memory_usage -= self.sizes.get(precalculation, 0)
+            preprocessing = self.__remove(precalculation)
+            self.spilling[precalculation] = preprocessing
+            spills.append((precalculation, preprocessing))
+        if spills and self.spill_cache is None:
+            self.spill_directory = tempfile.TemporaryDirectory(prefix='shift_detector_')
+            self.spill_cache = PrecalculationCache(self.spill_directory.name)
+        return spills
+
+    def __spill(self, spills):
+        """
+        Write the results selected by __enforce_memory_budget to disk, without holding the lock.
+        Until a result is written, it is kept in spilling, where other threads find it.
+        :param spills: list of (precalculation, result) pairs
+        """
+        for precalculation, preprocessing in spills:
+            name = precalculation.display_name()
+            spill_key = None
+            key = self.cache_key(precalculation)
+            if key is not None and key in self.cache:
+                lprint("- Evict {}, it is in the persistent cache".format(name), self.log_print)
+            else:
+                spill_key = uuid.uuid4().hex
+                self.spill_cache.save(spill_key, preprocessing)
+                if spill_key not in self.spill_cache:
+                    lprint("- Evict {}".format(name), self.log_print)
+                    spill_key = None
+
+            with self.lock:
+                # the result may have been released or invalidated in the meantime
+                is_spilling = self.spilling.get(precalculation) is preprocessing
+                if is_spilling:
+                    del self.spilling[precalculation]
+                    if spill_key is not None:
+                        lprint("- Spill {} to disk".format(name), self.log_print)
+                        self.spilled[precalculation] = spill_key
+            if spill_key is not None and not is_spilling:
+                self.spill_cache.invalidate(spill_key)
+
+    def plan(self, checks):
+        """
+        Announce the checks that are run next. Only used with release_precalculations: the results of precalculations
+        are released as soon as all planned checks that need them are finished (see release).
+        Precalculations that are requested by other precalculations are released with them.
+        :param checks: the checks that are run next
+        """
+        if not self.release_precalculations:
+            return
+        with self.lock:
+            self.consumers = Counter()
+            self.unknown_consumers = 0
+            for check in checks:
+                needed_precalculations = check.needed_precalculations(self)
+                if needed_precalculations is None:
+                    self.unknown_consumers += 1
+                else:
+                    self.consumers.update(set(needed_precalculations))
+
+    def release(self, check):
+        """
+        Mark a planned check as finished and release the results that are not needed anymore.
+        :param check: the finished check
+        """
+        if not self.release_precalculations:
+            return
+        with self.lock:
+            needed_precalculations = check.needed_precalculations(self)
+            if needed_precalculations is None:
+                self.unknown_consumers = max(self.unknown_consumers - 1, 0)
+            else:
+                self.consumers.subtract(set(needed_precalculations))
+            self.__release_unneeded()
+
+    def __release_unneeded(self):
+        # checks that do not declare their precalculations may need any result
+        if self.unknown_consumers > 0:
+            return
+        for precalculation in list(self.preprocessings):
+            if self.__is_planned(precalculation, set()) and not self.__is_needed(precalculation, set()):
+                lprint("- Release {}".format(precalculation.display_name()), self.log_print)
+                self.__remove(precalculation)
+        for precalculation in list(self.spilled):
+            if self.__is_planned(precalculation, set()) and not self.__is_needed(precalculation, set()):
+                self.spill_cache.invalidate(self.spilled.pop(precalculation))
+        for precalculation in list(self.spilling):
+            if self.__is_planned(precalculation, set()) and not self.__is_needed(precalculation, set()):
+                del self.spilling[precalculation]
+
+    def __is_planned(self, precalculation, visited):
+        if precalculation in self.consumers:
+            return True
+        visited.add(precalculation)
+        return any(self.__is_planned(dependent, visited) for dependent in self.dependents.get(precalculation, ())
+                   if dependent not in visited)
+
+    def __is_needed(self, precalculation, visited):
+        if self.consumers.get(precalculation, 0) > 0 or precalculation in self.in_progress:
+            return True
+        visited.add(precalculation)
+        # a dependent that has not been executed yet requests the precalculation again
+        return any(dependent not in self.preprocessings and self.__is_needed(dependent, visited)
+                   for dependent in self.dependents.get(precalculation, ()) if dependent not in visited)
+
+    def __load_or_process(self, precalculation, record):
+        with self.lock:
+            spill_key = self.spilled.pop(precalculation, None)
+        if spill_key is not None:
+            try:
+                preprocessing = self.spill_cache.load(spill_key)
+                lprint("- Loaded spilled {}".format(precalculation.display_name()), self.log_print)
+                record['cache'] = 'spill'
+                return preprocessing
+            except KeyError:
+                pass
+            finally:
+                self.spill_cache.invalidate(spill_key)
+
+        key = self.cache_key(precalculation)
+        if key is not None:
+            try:
+                preprocessing = self.cache.load(key)
+                lprint("- Loaded {} from cache".format(precalculation.display_name()), self.log_print)
+                record['cache'] = 'disk'
+                return preprocessing
+            except KeyError:
+                pass
+
+        preprocessing = precalculation.process(self)
+
+        if key is not None:
+            self.cache.save(key, preprocessing)
         return preprocessing
 
+    @classmethod
+    def from_profile(cls, profile, df2, log_print=False, cache_dir=None, cache_size=None):
+        """
+        Create a store that compares the reference data of a profile with df2.
+        The column types, column statistics, column encodings and the results of the profiled precalculations
+        for the reference data are taken from the profile, so only df2 is analyzed and encoded.
+        :param profile: ReferenceProfile of the first data frame
+        :param df2: second data frame
+        :param log_print: print progress information
+        :param cache_dir: directory to persist the results of precalculations in
+        :param cache_size: maximum size of cache_dir in bytes
+        :return: the store
+        """
+        missing_columns = [column for column in profile.column_names() if column not in df2.columns]
+        if missing_columns:
+            raise ValueError("df2 does not contain the profiled columns: {}".format(', '.join(missing_columns)))
+
+        store = cls(profile.df, df2, log_print=log_print, custom_column_types=profile.column_types(),
+                    cache_dir=cache_dir, cache_size=cache_size, reference=profile)
+        store.update(profile.preprocessings)
+        return store
+
+    def unsampled(self):
+        """
+        Access the full data for checks that opt out of sampling (see Check.use_full_data).
+        The store of the full data keeps the column types, the persistent cache and the instrumentation of this store.
+        :return: store of the full data, or this store if it is not sampled
+        """
+        if self.df1 is self.full_dfs[0] and self.df2 is self.full_dfs[1]:
+            return self
+        with self.lock:
+            if self.__unsampled is None:
+                column_types = {column: column_type for column_type, columns in self.type_to_columns.items()
+                                for column in columns}
+                cache_dir, cache_size = self.cache_settings
+                self.__unsampled = Store(*self.full_dfs, log_print=self.log_print, custom_column_types=column_types,
+                                         cache_dir=cache_dir, cache_size=cache_size,
+                                         memory_budget=self.memory_budget)
+                self.__unsampled.instrumentation = self.instrumentation
+            return self.__unsampled
+
+    def data_fingerprint(self):
+        """
+        :return: fingerprint of the content and column types of both data frames
+        """
+        if self.__data_fingerprint is None:
+            column_types = {column: column_type for column_type, columns in self.type_to_columns.items()
+                            for column in columns}
+            self.__data_fingerprint = stable_fingerprint((data_fingerprint(self.df1, self.df2), column_types))
+        return self.__data_fingerprint
+
+    def cache_key(self, precalculation):
+        """
+        :param precalculation: the precalculation
+        :return: key of the result of precalculation in the persistent cache or
+        None if there is no cache or the precalculation cannot be fingerprinted
+        """
+        if self.cache is None:
+            return None
+        try:
+            precalculation_fingerprint = precalculation.fingerprint()
+        except TypeError as e:
+            lprint("- {} is not cached: {}".format(precalculation.__class__.__name__, e), self.log_print)
+            return None
+        return stable_fingerprint((CACHE_VERSION, self.data_fingerprint(), precalculation_fingerprint))
+
+    def invalidate(self, *precalculations):
+        """
+        Remove the results of the precalculations from the store and the persistent cache.
+        Without precalculations, all results are removed.
+        :param precalculations: precalculations to remove
+        """
+        with self.lock:
+            if not precalculations:
+                self.preprocessings.clear()
+                self.sizes.clear()
+                if self.spill_cache is not None:
+                    self.spill_cache.clear()
+                self.spilled.clear()
+                self.spilling.clear()
+                if self.cache is not None:
+                    self.cache.clear()
+                return
+            for precalculation in precalculations:
+                self.__remove(precalculation)
+                self.spilling.pop(precalculation, None)
+                spill_key = self.spilled.pop(precalculation, None)
+                if spill_key is not None:
+                    self.spill_cache.invalidate(spill_key)
+                key = self.cache_key(precalculation)
+                if key is not None:
+                    self.cache.invalidate(key)
+
+    def update(self, preprocessings):
+        """
+        Add already executed precalculations, e.g. results of another process, to the store.
+        Results that are already present are kept.
+        :param preprocessings: dictionary that maps precalculations to their results
+        """
+        with self.lock:
+            for precalculation, preprocessing in preprocessings.items():
+                if precalculation not in self.preprocessings and precalculation not in self.spilling:
+                    self.__add(precalculation, preprocessing)
+            spills = self.__enforce_memory_budget()
+        self.__spill(spills)
+
     def column_names(self, *column_types):
         if not column_types:
             return self.shared_columns
@@ -80,23 +509,117 @@ class Store:
         flattened = {column for columns in multi_columns for column in columns}
         return list(flattened)
 
+    def is_categorical(self, column):
+        """
+        :param column: a shared column
+        :return: True if the column is categorical in both data frames according to its cardinality estimates
+        """
+        return all(statistics[column].is_categorical() for statistics in self.column_statistics)
+
+    def column_encodings(self, index):
+        """
+        Dictionary encodings of the categorical and text columns of one data frame, restricted to the values that
+        occur in it. Used to profile a reference data frame, see ReferenceProfile.
+        :param index: 0 for the first and 1 for the second data frame
+        :return: dictionary that maps the columns to the codes of their values and the sorted dictionary
+        """
+        encodings = {}
+        for column in self.type_to_columns[ColumnType.categorical]:
+            values = [self.df1, self.df2][index][column]
+            encodings[column] = (values.cat.codes.values.astype(np.int64), values.cat.categories)
+        for column in self.type_to_columns[ColumnType.text]:
+            codes1, codes2, dictionary = self.text_encodings[column]
+            encodings[column] = ([codes1, codes2][index], dictionary)
+        for column, (codes, dictionary) in encodings.items():
+            used, codes = compact_codes(codes, len(dictionary))
+            encodings[column] = (codes, pd.Index(np.asarray(dictionary, dtype=object)[used], dtype=object))
+        return encodings
+
+    def text_encoding(self, column):
+        """
+        Dictionary encoding of a text column, so that texts that occur several times are processed only once.
+        :param column: a text column
+        :return: codes of the texts of the first and the second data frame and the unique texts they refer to
+        """
+        if column not in self.text_encodings:
+            raise ValueError("{} is not a text column".format(column))
+        return self.text_encodings[column]
+
+    def unique_texts(self, column, index=None):
+        """
+        Distinct texts of a text column. Text precalculations process the distinct texts only
+        and broadcast their results to the rows with the codes (see decode_values).
+        :param column: a text column
+        :param index: 0 or 1 for the texts of the first or the second data frame, both data frames by default
+        :return: codes of the rows into the distinct texts and the array of the distinct texts
+        """
+        codes1, codes2, dictionary = self.text_encoding(column)
+        codes = np.concatenate([codes1, codes2]) if index is None else [codes1, codes2][index]
+        used, codes = compact_codes(codes, len(dictionary))
+        return codes, dictionary.values[used]
+
+    def text_deduplication(self) -> DataFrame:
+        """
+        Measure the work that text precalculations save by processing every distinct text only once.
+        :return: data frame with a row per text column and the columns texts (number of texts of both data frames),
+        unique_texts (number of distinct texts) and deduplication_ratio (share of the texts that are not processed)
+        """
+        rows = []
+        for column in self.column_names(ColumnType.text):
+            codes, texts = self.unique_texts(column)
+            ratio = 1 - len(texts) / len(codes) if len(codes) > 0 else 0.0
+            rows.append((column, len(codes), len(texts), ratio))
+        return DataFrame(rows, columns=['column', 'texts', 'unique_texts', 'deduplication_ratio']).set_index('column')
+
+    def estimated_workload(self, *column_types, index=None, per_character=False):
+        """
+        Estimate the amount of data that is processed for the columns, see Precalculation.estimated_cost.
+        :param column_types: types of the columns, all shared columns by default
+        :param index: 0 or 1 to only count the first or the second data frame
+        :param per_character: weight the cells of text columns with the mean length of their texts
+        :return: number of cells, or of characters with per_character
+        """
+        data_frames = [self.df1, self.df2] if index is None else [[self.df1, self.df2][index]]
+        columns = self.column_names(*column_types)
+        text_columns = set(self.type_to_columns[ColumnType.text]) if per_character else set()
+
+        workload = 0
+        for df in data_frames:
+            for column in columns:
+                if column in text_columns:
+                    sample = df[column].dropna().head(WORKLOAD_SAMPLE_SIZE).astype(str)
+                    workload += len(df) * (sample.str.len().mean() if len(sample) > 0 else 0)
+                else:
+                    workload += len(df)
+        return float(workload)
+
+    def is_executed(self, precalculation):
+        """
+        :param precalculation: the precalculation
+        :return: whether the result of the precalculation is available without executing it
+        """
+        with self.lock:
+            if precalculation in self.preprocessings or precalculation in self.spilling \
+                    or precalculation in self.spilled:
+                return True
+        key = self.cache_key(precalculation)
+        return key is not None and key in self.cache
+
     @staticmethod
     def verify_min_data_size(size):
         if size < MIN_DATA_SIZE:
             raise InsufficientDataError(actual_size=size, expected_size=MIN_DATA_SIZE)
 
-    def __apply_column_types(self, custom_column_to_column_type):
+    def __apply_column_types(self, custom_column_to_column_type, reference_encodings):
         column_to_column_type = {}
         for column_type, columns in self.type_to_columns.items():
-            # iterate over columns for column_types
             for column in columns:
-                # apply custom column type
-                custom_column_type = column_type
-                if column in custom_column_to_column_type:
-                    custom_column_type = custom_column_to_column_type[column]
+                column_to_column_type[column] = column_type
 
+        # custom column types are not detected, but applied directly
+        for column, custom_column_type in custom_column_to_column_type.items():
+            if column in self.shared_columns:
                 column_to_column_type[column] = custom_column_type
-                self.__set_column_type(column, custom_column_type)
 
         new_column_type_to_columns = {
             ColumnType.categorical: [],
@@ -104,13 +627,20 @@ class Store:
             ColumnType.text: []
         }
 
-        # revert back to old column structure
-        for column, column_type in column_to_column_type.items():
+        # convert the columns and revert back to old column structure
+        for column in self.shared_columns:
+            column_type = column_to_column_type[column]
+            self.__set_column_type(column, column_type, reference_encodings.get(column))
             new_column_type_to_columns[column_type].append(column)
 
         self.type_to_columns = new_column_type_to_columns
 
-    def __set_column_type(self, column, column_type):
+    def __encode(self, column, reference_encoding):
+        if reference_encoding is None:
+            return encode_columns(self.df1[column], self.df2[column])
+        return merge_encodings(*reference_encoding, *encode_column(self.df2[column]))
+
+    def __set_column_type(self, column, column_type, reference_encoding=None):
         if column_type == ColumnType.numerical:
             try:
                 self.df1[column] = pd.to_numeric(self.df1[column]).astype(float)
@@ -119,6 +649,15 @@ class Store:
                 raise Exception("An error occurred during the conversion of column '{}' to the column type '{}'. "
                                 "{}".format(column, column_type.name, str(e)))
 
-        elif column_type == ColumnType.categorical or column_type == ColumnType.text:
-            self.df1[column] = self.df1[column].astype(str)
-            self.df2[column] = self.df2[column].astype(str)
+        elif column_type == ColumnType.categorical:
+            codes1, codes2, categories = self.__encode(column, reference_encoding)
+            dtype = pd.CategoricalDtype(categories)
+            self.df1[column] = pd.Categorical.from_codes(codes1, dtype=dtype)
+            self.df2[column] = pd.Categorical.from_codes(codes2, dtype=dtype)
+
+        elif column_type == ColumnType.text:
+            codes1, codes2, unique_texts = self.__encode(column, reference_encoding)
+            self.text_encodings[column] = (codes1, codes2, unique_texts)
+            # equal texts share one string object
+            self.df1[column] = unique_texts.values[codes1]
+            self.df2[column] = unique_texts.values[codes2]
@@ -0,0 +1,149 @@
+import threading
+
+import pandas as pd
+
+from shift_detector.precalculations.low_cardinality_precalculation import LowCardinalityPrecalculation
+from shift_detector.precalculations.n_gram import NGramType
+from shift_detector.precalculations.store import Store
+from shift_detector.utils.column_management import ColumnType, column_names
+from shift_detector.utils.column_summaries import NumericalSummary, CategoricalSummary, NGramSummary
+from shift_detector.utils.custom_print import lprint
+from shift_detector.utils.data_io import read_csv_sample, read_csv_in_chunks
+from shift_detector.utils.instrumentation import Instrumentation
+
+
+class StreamingStore:
+    """
+    Store for CSV files that do not fit into memory.
+    The column types are detected on the first sample_size rows of both files. Instead of the data frames,
+    the store provides mergeable summaries of the columns, which are computed by reading the files chunk by chunk.
+    Numerical values that cannot be parsed are treated as missing values.
+    :param file_path1: path of the first CSV file
+    :param file_path2: path of the second CSV file
+    :param delimiter: delimiter of the CSV files
+    :param chunk_size: number of rows that are read at once
+    :param sample_size: number of rows to detect the column types on
+    :param log_print: print progress information
+    :param custom_column_types: dictionary that maps column names to ColumnTypes
+    :param sketch_k: accuracy parameter of the quantile sketches of numerical columns
+    """
+
+    def __init__(self,
+                 file_path1: str,
+                 file_path2: str,
+                 delimiter=',',
+                 chunk_size=100000,
+                 sample_size=10000,
+                 log_print=False,
+                 custom_column_types={},
+                 sketch_k=1000):
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size should be an integer greater than 0. Received: {}".format(chunk_size))
+
+        self.file_paths = (file_path1, file_path2)
+        self.delimiter = delimiter
+        self.chunk_size = chunk_size
+        self.log_print = log_print
+        self.sketch_k = sketch_k
+
+        sample1 = read_csv_sample(file_path1, delimiter, sample_size)
+        sample2 = read_csv_sample(file_path2, delimiter, sample_size)
+        sample_store = Store(sample1, sample2, log_print=log_print, custom_column_types=custom_column_types)
+        self.shared_columns = sample_store.shared_columns
+        self.type_to_columns = sample_store.type_to_columns
+        _, _, low_cardinal_columns = sample_store[LowCardinalityPrecalculation()]
+        self.low_cardinal_numerical_columns = [column for column in low_cardinal_columns
+                                               if column in self.type_to_columns[ColumnType.numerical]]
+
+        self.summaries = {}
+        self.lock = threading.Lock()
+        self.instrumentation = Instrumentation()
+
+    def column_names(self, *column_types):
+        if not column_types:
+            return self.shared_columns
+
+        if any([not isinstance(column_type, ColumnType) for column_type in column_types]):
+            raise TypeError("column_types should be empty or of type ColumnType.")
+
+        multi_columns = [self.type_to_columns[column_type] for column_type in column_types]
+        flattened = {column for columns in multi_columns for column in columns}
+        return list(flattened)
+
+    def chunks(self, index, columns):
+        """
+        Read the columns of a file chunk by chunk and convert them to their column types.
+        :param index: 0 for the first and 1 for the second file
+        :param columns: columns to read
+        :return: iterator over data frames
+        """
+        numerical_columns = set(self.type_to_columns[ColumnType.numerical])
+        for chunk in read_csv_in_chunks(self.file_paths[index], self.delimiter, self.chunk_size, columns=columns):
+            for column in columns:
+                if column in numerical_columns:
+                    chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(float)
+                else:
+                    chunk[column] = chunk[column].astype(str)
+            yield chunk
+
+    def __summarize(self, key, name, columns, create_summary):
+        with self.lock:
+            if key in self.summaries:
+                self.instrumentation.record('precalculation', name, 'hit')
+                return self.summaries[key]
+            with self.instrumentation.measure('precalculation', name, cache='miss'):
+                summaries = []
+                for index in (0, 1):
+                    lprint("- Summarizing {} of {}".format(', '.join(column_names(columns)), self.file_paths[index]),
+                           self.log_print)
+                    file_summaries = {column: create_summary(column) for column in columns}
+                    if columns:
+                        for chunk in self.chunks(index, columns):
+                            for column in columns:
+                                file_summaries[column].update(chunk[column])
+                    summaries.append(file_summaries)
+            self.summaries[key] = tuple(summaries)
+            return self.summaries[key]
+
+    def __column_summaries(self):
+        numerical_columns = self.type_to_columns[ColumnType.numerical]
+        columns = numerical_columns + self.type_to_columns[ColumnType.categorical]
+        return self.__summarize('columns', 'ColumnSummaries', columns,
+                                lambda column: NumericalSummary(self.sketch_k) if column in numerical_columns
+                                else CategoricalSummary())
+
+    def numerical_summaries(self):
+        """
+        :return: dictionaries that map the numerical columns to their NumericalSummary for both files
+        """
+        summaries1, summaries2 = self.__column_summaries()
+        columns = self.type_to_columns[ColumnType.numerical]
+        return {column: summaries1[column] for column in columns}, {column: summaries2[column] for column in columns}
+
+    def categorical_summaries(self):
+        """
+        Summarize the categorical columns and the numerical columns with a low cardinality,
+        analogous to LowCardinalityPrecalculation.
+        Numerical columns with too many distinct values in one of the files are left out.
+        :return: dictionaries that map the columns to their CategoricalSummary for both files and the columns
+        """
+        summaries1, summaries2 = self.__column_summaries()
+        categorical1 = {column: summaries1[column] for column in self.type_to_columns[ColumnType.categorical]}
+        categorical2 = {column: summaries2[column] for column in self.type_to_columns[ColumnType.categorical]}
+        for column in self.low_cardinal_numerical_columns:
+            summary1 = summaries1[column].categorical_summary()
+            summary2 = summaries2[column].categorical_summary()
+            if summary1 is not None and summary2 is not None:
+                categorical1[column] = summary1
+                categorical2[column] = summary2
+        return categorical1, categorical2, list(categorical1.keys())
+
+    def ngram_summaries(self, ngram_type=NGramType.character, n=3):
+        """
+        :param ngram_type: type of the n-grams
+        :param n: length of the n-grams
+        :return: dictionaries that map the text columns to their NGramSummary for both files
+        """
+        return self.__summarize(('ngram', ngram_type, n), 'NGramSummaries({}, {})'.format(ngram_type.value, n),
+                                self.type_to_columns[ColumnType.text],
+                                lambda column: NGramSummary(n, words=ngram_type == NGramType.word))
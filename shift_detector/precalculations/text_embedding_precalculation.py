@@ -1,14 +1,16 @@
 import numpy as np
 import pandas as pd
-from gensim.models import FastText, Word2Vec
 from numbers import Number
 from copy import copy
 
-from gensim.models.base_any2vec import BaseWordEmbeddingsModel
-
 from shift_detector.precalculations.precalculation import Precalculation
 from shift_detector.precalculations.text_precalculation import TokenizeIntoLowerWordsPrecalculation
 from shift_detector.precalculations.store import Store
+from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.lazy_import import LazyModule
+
+gensim_models = LazyModule('gensim.models')
+gensim_base_any2vec = LazyModule('gensim.models.base_any2vec')
 
 
 class TextEmbeddingPrecalculation(Precalculation):
@@ -21,10 +23,10 @@ class TextEmbeddingPrecalculation(Precalculation):
         if trained_model:
             self.trained_model = trained_model
         elif model == 'fasttext':
-            self.model = FastText(size=100, window=5, min_count=1, workers=4)
+            self.model = gensim_models.FastText(size=100, window=5, min_count=1, workers=4)
         elif model == 'word2vec':
-            self.model = Word2Vec(size=100, window=5, min_count=1, workers=4)
-        elif isinstance(model, BaseWordEmbeddingsModel):
+            self.model = gensim_models.Word2Vec(size=100, window=5, min_count=1, workers=4)
+        elif isinstance(model, gensim_base_any2vec.BaseWordEmbeddingsModel):
             # TODO: make model's params size and window configurable through the constructor
             self.model = model
         else:
@@ -78,6 +80,14 @@ class TextEmbeddingPrecalculation(Precalculation):
 
         return ser
 
+    def dependencies(self, store):
+        return [TokenizeIntoLowerWordsPrecalculation()]
+
+    def estimated_cost(self, store):
+        cost = store.estimated_workload(ColumnType.text, per_character=True)
+        # an untrained model is trained for 10 epochs before the texts are embedded
+        return cost if self.trained_model else 11 * cost
+
     def process(self, store: Store):
         df1_tokenized, df2_tokenized = store[TokenizeIntoLowerWordsPrecalculation()]
 
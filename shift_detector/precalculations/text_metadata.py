@@ -1,30 +1,168 @@
 import logging as logger
 import re
-import regex
 import unicodedata
 from abc import abstractmethod
-from collections import defaultdict
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
-import nltk
-# noinspection PyPackageRequirements
-from iso639 import languages
-from langdetect import detect, DetectorFactory
-from nltk.corpus import stopwords
-# noinspection PyPackageRequirements
-from spellchecker import SpellChecker
-from textstat import textstat
-from langdetect.lang_detect_exception import LangDetectException
-
-from shift_detector.precalculations.precalculation import Precalculation
+
+from shift_detector.precalculations.precalculation import DatasetwisePrecalculation, DatasetwiseResult
 from shift_detector.precalculations.text_precalculation import TokenizeIntoLowerWordsPrecalculation
 from shift_detector.utils import ucb_list
-from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.column_management import ColumnType, decode_values
+from shift_detector.utils.fingerprint import stable_fingerprint
+from shift_detector.utils.language_identification import language_identifier
+from shift_detector.utils.lazy_import import LazyModule
 from shift_detector.utils.text_metadata_utils import most_common_n_to_string_frequency, \
-    most_common_n_to_string_alphabetically, delimiters
-
-
-class GenericTextMetadata(Precalculation):
+    most_common_n_to_string_alphabetically, delimiter_type, split_by_delimiter, spelling_dictionary, unknown_words, \
+    stopwords, codepoints, category_ids, id_histogram, count_histogram, UNICODE_CATEGORIES, letter_flags, \
+    segment_sums, ALPHA_FLAG, UPPER_FLAG
+
+nltk = LazyModule('nltk')
+nltk_tag_mapping = LazyModule('nltk.tag.mapping')
+textstat = LazyModule('textstat')
+
+# shorter texts are faster to count character by character than with numpy
+UNICODE_HISTOGRAM_MIN_LENGTH = 64
+# number of texts that a worker process of TextMetadata analyzes at once
+TEXT_METADATA_CHUNK_SIZE = 10000
+# tags of the universal tagset of nltk, in the order of the counts of PartOfSpeechMetadata.tag_counts
+UNIVERSAL_TAGS = ['.', 'ADJ', 'ADP', 'ADV', 'CONJ', 'DET', 'NOUN', 'NUM', 'PRON', 'PRT', 'VERB', 'X']
+# parameters of the parallel processing of texts, the results do not depend on them
+PARALLELISM_PARAMETERS = ('n_jobs', 'chunk_size')
+
+
+class AnalyzedText:
+    """
+    A text together with the intermediate results that several metadata types need. Every intermediate
+    result is computed at most once, when the first metadata type asks for it (see GenericTextMetadata.evaluate).
+    :param text: the text
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.__words = None
+        self.__delimiter = None
+        self.__delimiter_parts = None
+        self.__languages = {}
+
+    def words(self):
+        """
+        :return: the lower case words of the text (see TokenizeIntoLowerWordsPrecalculation) or NaN for missing texts
+        """
+        if self.__words is None:
+            if isinstance(self.text, str):
+                self.__words = TokenizeIntoLowerWordsPrecalculation.tokenize_into_words(self.text)
+            else:
+                self.__words = float('nan')
+        return self.__words
+
+    def delimiter(self):
+        """
+        :return: the delimiter type of the text, see DelimiterTypeMetadata
+        """
+        if self.__delimiter is None:
+            self.__delimiter = DelimiterTypeMetadata().metadata_function(self.text)
+        return self.__delimiter
+
+    def delimiter_parts(self):
+        """
+        :return: the parts of the text between its delimiters, see split_by_delimiter
+        """
+        if self.__delimiter_parts is None:
+            self.__delimiter_parts = split_by_delimiter(self.text, self.delimiter())
+        return self.__delimiter_parts
+
+    def language(self, seed=0, max_length=None):
+        """
+        :param seed: seed of the language identification
+        :param max_length: number of characters the language is identified from, see LanguageIdentifier
+        :return: the language of the text, see LanguageMetadata
+        """
+        if (seed, max_length) not in self.__languages:
+            self.__languages[(seed, max_length)] = LanguageMetadata(seed, max_length).metadata_function(self.text)
+        return self.__languages[(seed, max_length)]
+
+
+def analyzed_languages(analyzed_texts, language, infer_language) -> np.ndarray:
+    """
+    :param analyzed_texts: list of AnalyzedTexts
+    :param language: language of the texts
+    :param infer_language: whether the language of every text is detected instead
+    :return: array of the languages of the texts
+    """
+    if infer_language:
+        return np.array([analyzed_text.language() for analyzed_text in analyzed_texts], dtype=object)
+    return np.full(len(analyzed_texts), language, dtype=object)
+
+
+def fingerprint_without_parallelism(precalculation) -> str:
+    """
+    :param precalculation: a precalculation with PARALLELISM_PARAMETERS
+    :return: its fingerprint (see Precalculation.fingerprint) without the PARALLELISM_PARAMETERS,
+    so that results are found in the persistent cache independently of them
+    """
+    attributes = {name: value for name, value in vars(precalculation).items() if name not in PARALLELISM_PARAMETERS}
+    return stable_fingerprint((precalculation.__class__, attributes))
+
+
+def unique_rows(store, column, index):
+    """
+    :param store: the store
+    :param column: a text column
+    :param index: 0 for the first and 1 for the second data frame of the store
+    :return: codes of the rows into the distinct texts of the column (see Store.unique_texts)
+    and the position of the first row of every distinct text
+    """
+    codes, _ = store.unique_texts(column, index)
+    return codes, np.unique(codes, return_index=True)[1]
+
+
+class MetadataColumn:
+    """
+    Preallocated values of a metadata type for all texts of a column. Numerical values are written into a
+    float array, categorical values into an array of codes of a dictionary of their values.
+    :param metadata_type: the GenericTextMetadata
+    :param size: number of texts
+    """
+
+    def __init__(self, metadata_type, size):
+        self.numerical = metadata_type.metadata_return_type() == ColumnType.numerical
+        if self.numerical:
+            self.values = np.full(size, np.nan)
+            # integral metadata like num_chars are returned as integers, as by GenericTextMetadata.process_dataset
+            self.integral = size > 0
+        else:
+            self.codes = np.full(size, -1, dtype=np.int64)
+            self.dictionary = {}
+
+    def __setitem__(self, row, value):
+        if self.numerical:
+            self.values[row] = value
+            self.integral = self.integral and isinstance(value, int)
+        elif not (isinstance(value, float) and np.isnan(value)):
+            self.codes[row] = self.dictionary.setdefault(value, len(self.dictionary))
+
+    def to_array(self) -> np.ndarray:
+        """
+        :return: array of the values, missing categorical values are NaN
+        """
+        if self.numerical:
+            return self.values.astype(np.int64) if self.integral else self.values
+        values = np.empty(len(self.dictionary) + 1, dtype=object)
+        for value, code in self.dictionary.items():
+            values[code] = value
+        values[-1] = float('nan')
+        return values[self.codes]
+
+
+class GenericTextMetadata(DatasetwisePrecalculation):
+
+    # cost of the metadata per character, relative to counting the characters (see estimated_dataset_cost)
+    relative_cost = 1
 
     def __eq__(self, other):
         return isinstance(other, self.__class__)
@@ -57,18 +195,52 @@ class GenericTextMetadata(Precalculation):
     def metadata_function(self, text):
         raise NotImplementedError
 
-    def process(self, store):
-        metadata1 = pd.DataFrame()
-        metadata2 = pd.DataFrame()
-        df1, df2 = store[ColumnType.text]
+    def metadata_batch(self, texts):
+        """
+        Compute the metadata of several texts at once. Subclasses can override it with a vectorized implementation.
+        :param texts: list or array of texts
+        :return: list or array of the metadata of the texts
+        """
+        return [self.metadata_function(text) for text in texts]
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        """
+        Compute the metadata of a text of the fused engine of TextMetadata.
+        :param analyzed_text: the AnalyzedText, which shares intermediate results between metadata types
+        :return: the metadata of the text, like metadata_function
+        """
+        return self.metadata_function(analyzed_text.text)
+
+    def evaluate_batch(self, analyzed_texts):
+        """
+        Compute the metadata of a chunk of texts of the fused engine of TextMetadata. Metadata types that
+        process texts faster in batches override it.
+        :param analyzed_texts: list of AnalyzedTexts
+        :return: list of the metadata of the texts, like evaluate
+        """
+        return [self.evaluate(analyzed_text) for analyzed_text in analyzed_texts]
+
+    def load_resources(self):
+        """
+        Load the models that the metadata needs, e.g. the language profiles of langdetect.
+        Worker processes of TextMetadata call it once before they analyze their first texts.
+        """
+        pass
+
+    def dataset_dependencies(self, store, index):
+        return []
+
+    def estimated_dataset_cost(self, store, index):
+        return self.relative_cost * store.estimated_workload(ColumnType.text, index=index, per_character=True)
+
+    def process_dataset(self, store, index):
+        metadata = pd.DataFrame()
         columns = store.column_names(ColumnType.text)
         for column in columns:
-            clean1 = df1[column].dropna()
-            clean2 = df2[column].dropna()
+            codes, texts = store.unique_texts(column, index)
             logger.info(self.metadata_name() + ' analysis for ' + column)
-            metadata1[column] = [self.metadata_function(text) for text in clean1]
-            metadata2[column] = [self.metadata_function(text) for text in clean2]
-        return metadata1, metadata2
+            metadata[column] = decode_values(self.metadata_batch(texts), codes)
+        return metadata
 
 
 class GenericTextMetadataWithTokenizing(GenericTextMetadata):
@@ -86,15 +258,31 @@ class GenericTextMetadataWithTokenizing(GenericTextMetadata):
     def metadata_function(self, words):
         raise NotImplementedError
 
-    def process(self, store):
-        metadata1 = pd.DataFrame()
-        metadata2 = pd.DataFrame()
-        df1, df2 = store[TokenizeIntoLowerWordsPrecalculation()]
-        for column in df1.columns:
+    def metadata_batch(self, words):
+        """
+        Compute the metadata of several texts at once. Subclasses can override it with a vectorized implementation.
+        :param words: list or array of the lists of words of the texts
+        :return: list or array of the metadata of the texts
+        """
+        return [self.metadata_function(text_words) for text_words in words]
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        return self.metadata_function(analyzed_text.words())
+
+    def evaluate_batch(self, analyzed_texts):
+        return self.metadata_batch([analyzed_text.words() for analyzed_text in analyzed_texts])
+
+    def dataset_dependencies(self, store, index):
+        return [DatasetwiseResult(TokenizeIntoLowerWordsPrecalculation(), index)]
+
+    def process_dataset(self, store, index):
+        metadata = pd.DataFrame()
+        df = store[DatasetwiseResult(TokenizeIntoLowerWordsPrecalculation(), index)]
+        for column in df.columns:
+            codes, first = unique_rows(store, column, index)
             logger.info(self.metadata_name() + ' analysis for ' + column)
-            metadata1[column] = [self.metadata_function(words) for words in df1[column]]
-            metadata2[column] = [self.metadata_function(words) for words in df2[column]]
-        return metadata1, metadata2
+            metadata[column] = decode_values(self.metadata_batch(df[column].values[first]), codes)
+        return metadata
 
 
 class GenericTextMetadataWithTokenizingAndLanguage(GenericTextMetadata):
@@ -116,27 +304,45 @@ class GenericTextMetadataWithTokenizingAndLanguage(GenericTextMetadata):
     def metadata_function(self, language, words):
         raise NotImplementedError
 
-    def process(self, store):
-        metadata1 = pd.DataFrame()
-        metadata2 = pd.DataFrame()
-        df1, df2 = store[TokenizeIntoLowerWordsPrecalculation()]
+    def metadata_batch(self, languages, words):
+        """
+        Compute the metadata of several texts at once. Subclasses can override it with a vectorized implementation.
+        :param languages: array of the languages of the texts
+        :param words: array of the lists of words of the texts
+        :return: list or array of the metadata of the texts
+        """
+        return [self.metadata_function(language, text_words) for language, text_words in zip(languages, words)]
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        language = analyzed_text.language() if self.infer_language else self.language
+        return self.metadata_function(language, analyzed_text.words())
+
+    def evaluate_batch(self, analyzed_texts):
+        languages = analyzed_languages(analyzed_texts, self.language, self.infer_language)
+        return self.metadata_batch(languages, [analyzed_text.words() for analyzed_text in analyzed_texts])
+
+    def dataset_dependencies(self, store, index):
+        dependencies = [DatasetwiseResult(TokenizeIntoLowerWordsPrecalculation(), index)]
+        if self.infer_language:
+            dependencies.append(DatasetwiseResult(LanguageMetadata(), index))
+        return dependencies
+
+    def process_dataset(self, store, index):
+        metadata = pd.DataFrame()
+        df = store[DatasetwiseResult(TokenizeIntoLowerWordsPrecalculation(), index)]
         columns = store.column_names(ColumnType.text)
         if self.infer_language:
-            lang1, lang2 = store[LanguageMetadata()]
+            languages = store[DatasetwiseResult(LanguageMetadata(), index)]
         for column in columns:
+            # every distinct text is processed once, with the language of its first row
+            codes, first = unique_rows(store, column, index)
             logger.info(self.metadata_name() + ' analysis for ' + column)
-            temp_column1 = []
-            temp_column2 = []
-            for i in range(len(df1)):
-                if self.infer_language:
-                    temp_column1.append(self.metadata_function(lang1[column][i], df1[column][i]))
-                    temp_column2.append(self.metadata_function(lang2[column][i], df2[column][i]))
-                else:
-                    temp_column1.append(self.metadata_function(self.language, df1[column][i]))
-                    temp_column2.append(self.metadata_function(self.language, df2[column][i]))
-            metadata1[column] = temp_column1
-            metadata2[column] = temp_column2
-        return metadata1, metadata2
+            if self.infer_language:
+                column_languages = languages[column].values[first]
+            else:
+                column_languages = np.full(len(first), self.language, dtype=object)
+            metadata[column] = decode_values(self.metadata_batch(column_languages, df[column].values[first]), codes)
+        return metadata
 
 
 class GenericTextMetadataWithLanguage(GenericTextMetadata):
@@ -158,27 +364,42 @@ class GenericTextMetadataWithLanguage(GenericTextMetadata):
     def metadata_function(self, language, text):
         raise NotImplementedError
 
-    def process(self, store):
-        metadata1 = pd.DataFrame()
-        metadata2 = pd.DataFrame()
-        df1, df2 = store[ColumnType.text]
+    def metadata_batch(self, languages, texts):
+        """
+        Compute the metadata of several texts at once. Subclasses can override it with a vectorized implementation.
+        :param languages: array of the languages of the texts
+        :param texts: array of the texts
+        :return: list or array of the metadata of the texts
+        """
+        return [self.metadata_function(language, text) for language, text in zip(languages, texts)]
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        language = analyzed_text.language() if self.infer_language else self.language
+        return self.metadata_function(language, analyzed_text.text)
+
+    def evaluate_batch(self, analyzed_texts):
+        languages = analyzed_languages(analyzed_texts, self.language, self.infer_language)
+        return self.metadata_batch(languages, [analyzed_text.text for analyzed_text in analyzed_texts])
+
+    def dataset_dependencies(self, store, index):
+        return [DatasetwiseResult(LanguageMetadata(), index)] if self.infer_language else []
+
+    def process_dataset(self, store, index):
+        metadata = pd.DataFrame()
+        df = store[ColumnType.text][index]
         columns = store.column_names(ColumnType.text)
         if self.infer_language:
-            lang1, lang2 = store[LanguageMetadata()]
+            languages = store[DatasetwiseResult(LanguageMetadata(), index)]
         for column in columns:
+            # every distinct text is processed once, with the language of its first row
+            codes, first = unique_rows(store, column, index)
             logger.info(self.metadata_name() + ' analysis for ' + column)
-            temp_column1 = []
-            temp_column2 = []
-            for i in range(len(df1)):
-                if self.infer_language:
-                    temp_column1.append(self.metadata_function(lang1[column][i], df1[column][i]))
-                    temp_column2.append(self.metadata_function(lang2[column][i], df2[column][i]))
-                else:
-                    temp_column1.append(self.metadata_function(self.language, df1[column][i]))
-                    temp_column2.append(self.metadata_function(self.language, df2[column][i]))
-            metadata1[column] = temp_column1
-            metadata2[column] = temp_column2
-        return metadata1, metadata2
+            if self.infer_language:
+                column_languages = languages[column].values[first]
+            else:
+                column_languages = np.full(len(first), self.language, dtype=object)
+            metadata[column] = decode_values(self.metadata_batch(column_languages, df[column].values[first]), codes)
+        return metadata
 
 
 class NumCharsMetadata(GenericTextMetadata):
@@ -211,9 +432,26 @@ class RatioUppercaseLettersMetadata(GenericTextMetadata):
         if text == "":
             return 0
         alpha = sum(1 for c in text if c.isalpha())
+        if alpha == 0:
+            return 0.0
         upper = sum(1 for c in text if c.isupper())
         return upper / alpha
 
+    def metadata_batch(self, texts):
+        # the letters of all texts are classified at once, in the concatenation of the texts
+        present = np.array([isinstance(text, str) for text in texts], dtype=bool)
+        texts = [text for text in texts if isinstance(text, str)]
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        flags = letter_flags(codepoints(''.join(texts)))
+        alpha = segment_sums(flags & ALPHA_FLAG, lengths)
+        upper = segment_sums((flags & UPPER_FLAG) > 0, lengths)
+        ratios = np.full(len(present), np.nan)
+        ratios[present] = np.where(alpha > 0, upper / np.maximum(alpha, 1), 0.0)
+        return ratios.tolist()
+
+    def evaluate_batch(self, analyzed_texts):
+        return self.metadata_batch([analyzed_text.text for analyzed_text in analyzed_texts])
+
 
 class UnicodeCategoriesMetadata(GenericTextMetadata):
 
@@ -228,11 +466,9 @@ class UnicodeCategoriesMetadata(GenericTextMetadata):
     def unicode_category_histogram(text):
         if not isinstance(text, str):
             return float('nan')
-        characters = defaultdict(int)
-        for c in text:
-            category = unicodedata.category(c)
-            characters[category] += 1
-        return characters
+        if len(text) < UNICODE_HISTOGRAM_MIN_LENGTH:
+            return dict(Counter(unicodedata.category(c) for c in text))
+        return id_histogram(category_ids(codepoints(text)), UNICODE_CATEGORIES)
 
     def metadata_function(self, text):
         return most_common_n_to_string_frequency(self.unicode_category_histogram(text), 5)
@@ -251,11 +487,7 @@ class UnicodeBlocksMetadata(GenericTextMetadata):
     def unicode_block_histogram(text):
         if not isinstance(text, str):
             return float('nan')
-        characters = defaultdict(int)
-        for c in text:
-            block = ucb_list.block(c)
-            characters[block] += 1
-        return characters
+        return id_histogram(ucb_list.block_ids(codepoints(text)), ucb_list.block_names)
 
     def metadata_function(self, text):
         return most_common_n_to_string_frequency(self.unicode_block_histogram(text), 5)
@@ -288,13 +520,9 @@ class DistinctWordsRatioMetadata(GenericTextMetadataWithTokenizing):
     def metadata_function(self, words):
         if not isinstance(words, list):
             return float('nan')
-        distinct_words = set()
         if len(words) == 0:
             return 0.0
-        for word in words:
-            if word not in distinct_words:
-                distinct_words.add(word)
-        return len(distinct_words) / len(words)
+        return len(set(words)) / len(words)
 
 
 class UniqueWordsRatioMetadata(GenericTextMetadataWithTokenizing):
@@ -325,6 +553,8 @@ class UniqueWordsRatioMetadata(GenericTextMetadataWithTokenizing):
 
 class UnknownWordRatioMetadata(GenericTextMetadataWithTokenizingAndLanguage):
 
+    relative_cost = 10
+
     @staticmethod
     def metadata_name() -> str:
         return 'unknown_word_ratio'
@@ -337,16 +567,19 @@ class UnknownWordRatioMetadata(GenericTextMetadataWithTokenizingAndLanguage):
 
         if not isinstance(words, list):
             return float('nan')
-        try:
-            spell = SpellChecker(language)
-        except ValueError as error:
+        dictionary = spelling_dictionary(language)
+        if dictionary is None:
             return float('nan')
         if len(words) == 0:
             return 0.0
 
-        misspelled = spell.unknown(words)
+        misspelled = unknown_words(words, dictionary)
         return len(misspelled) / len(words)
 
+    def load_resources(self):
+        if not self.infer_language:
+            spelling_dictionary(self.language)
+
 
 class StopwordRatioMetadata(GenericTextMetadataWithTokenizingAndLanguage):
 
@@ -362,17 +595,20 @@ class StopwordRatioMetadata(GenericTextMetadataWithTokenizingAndLanguage):
 
         if not isinstance(words, list):
             return float('nan')
-        stopword_count = 0
-        try:
-            stopwords_for_language_lower = stopwords.words(languages.get(part1=language).name.lower())
-            if len(words) == 0:
-                return 0.0
-            for word in words:
-                if word in stopwords_for_language_lower:
-                    stopword_count += 1
-            return stopword_count / len(words)
-        except OSError as error:
+        stopwords_for_language_lower = stopwords(language)
+        if stopwords_for_language_lower is None:
             return float('nan')
+        if len(words) == 0:
+            return 0.0
+        stopword_count = 0
+        for word in words:
+            if word in stopwords_for_language_lower:
+                stopword_count += 1
+        return stopword_count / len(words)
+
+    def load_resources(self):
+        if not self.infer_language:
+            stopwords(self.language)
 
 
 class DelimiterTypeMetadata(GenericTextMetadata):
@@ -387,10 +623,10 @@ class DelimiterTypeMetadata(GenericTextMetadata):
     def metadata_function(self, text):
         if not isinstance(text, str):
             return float('nan')
-        for key, value in delimiters.items():
-            if regex.compile(value).search(text):
-                return key
-        return 'no delimiter'
+        return delimiter_type(text)
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        return analyzed_text.delimiter()
 
 
 class NumPartsMetadata(GenericTextMetadata):
@@ -407,17 +643,25 @@ class NumPartsMetadata(GenericTextMetadata):
     def metadata_function(self, text):
         if not isinstance(text, str):
             return float('nan')
-        delimiter = DelimiterTypeMetadata().metadata_function(text)
-        for key, value in delimiters.items():
-            if key == delimiter:
-                return len(regex.split(regex.compile(value), text))
-        return 0
+        return len(split_by_delimiter(text, delimiter_type(text)))
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        if not isinstance(analyzed_text.text, str):
+            return float('nan')
+        return len(analyzed_text.delimiter_parts())
+
+
+# paragraphs of texts for LanguagePerParagraph
+HTML_LINE_BREAK = re.compile(r'<\s*br\s*/?\s*>')
+LINE_BREAK = re.compile(r'[\n\r]+')
 
 
 class LanguagePerParagraph(GenericTextMetadata):
     # Depending on the texts delimiter splits the text into parts and calculates the language for each part.
     # Returns a string with the languages, sorted by their frequency
 
+    relative_cost = 20
+
     def __init__(self, seed=0):
         self.seed = seed
 
@@ -429,34 +673,58 @@ class LanguagePerParagraph(GenericTextMetadata):
         return ColumnType.categorical
 
     @staticmethod
-    def detect_languages(text):
+    def detect_languages(text, delimiter=None, seed=0):
         if not isinstance(text, str) or len(text) == 0:
             return float('nan')
-        if DelimiterTypeMetadata().metadata_function(text) == 'HTML':
-            parts = re.split(r'<\s*br\s*/?\s*>', text)
+        if delimiter is None:
+            delimiter = delimiter_type(text)
+        if delimiter == 'HTML':
+            parts = HTML_LINE_BREAK.split(text)
         else:
-            parts = re.split(r'[\n\r]+', text)
+            parts = LINE_BREAK.split(text)
         parts = [x.strip() for x in parts if x.strip()]
         detected_languages = defaultdict(int)
-        for part in parts:
-            try:
-                lang = detect(part)
+        for lang in language_identifier(seed).identify_batch(parts):
+            if lang is not None:
                 detected_languages[lang] += 1
-            except LangDetectException:
-                continue
         if detected_languages == {}:
             return float('nan')
         return detected_languages
 
     def metadata_function(self, text, seed=0):
-        DetectorFactory.seed = self.seed
-        return most_common_n_to_string_alphabetically(self.detect_languages(text), 3)
+        return most_common_n_to_string_alphabetically(self.detect_languages(text, seed=self.seed), 3)
 
+    def load_resources(self):
+        language_identifier(self.seed).load()
 
-class LanguageMetadata(GenericTextMetadata):
+    def evaluate(self, analyzed_text: AnalyzedText):
+        delimiter = analyzed_text.delimiter() if isinstance(analyzed_text.text, str) else None
+        return most_common_n_to_string_alphabetically(self.detect_languages(analyzed_text.text, delimiter, self.seed),
+                                                      3)
 
-    def __init__(self, seed=0):
+
+class LanguageMetadata(GenericTextMetadata):
+    """
+    Language of the texts, identified by the LanguageIdentifier that all metadata types of a process share.
+    Texts without features to identify their language from, e.g. numbers, have the language NaN.
+    :param seed: seed of the language identification
+    :param max_length: number of characters at the start of a text that its language is identified from,
+    None for langdetect's default
+    """
+
+    relative_cost = 20
+
+    def __init__(self, seed=0, max_length=None):
+        if max_length is not None and (not isinstance(max_length, int) or max_length < 1):
+            raise ValueError("max_length should be None or an integer greater than 0. Received: {}".format(max_length))
         self.seed = seed
+        self.max_length = max_length
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and (self.seed, self.max_length) == (other.seed, other.max_length)
+
+    def __hash__(self):
+        return hash((self.__class__, self.seed, self.max_length))
 
     @staticmethod
     def metadata_name() -> str:
@@ -468,12 +736,31 @@ class LanguageMetadata(GenericTextMetadata):
     def metadata_function(self, text):
         if not isinstance(text, str):
             return float('nan')
-        DetectorFactory.seed = self.seed
-        return detect(text)
+        language = language_identifier(self.seed, self.max_length).identify(text)
+        return float('nan') if language is None else language
+
+    def evaluate(self, analyzed_text: AnalyzedText):
+        return analyzed_text.language(self.seed, self.max_length)
+
+    def load_resources(self):
+        language_identifier(self.seed, self.max_length).load()
+
+    def process_dataset(self, store, index):
+        metadata = pd.DataFrame()
+        identifier = language_identifier(self.seed, self.max_length)
+        for column in store.column_names(ColumnType.text):
+            codes, texts = store.unique_texts(column, index)
+            logger.info(self.metadata_name() + ' analysis for ' + column)
+            languages = identifier.identify_batch(texts)
+            metadata[column] = decode_values([float('nan') if language is None else language
+                                              for language in languages], codes)
+        return metadata
 
 
 class ComplexityMetadata(GenericTextMetadataWithLanguage):
 
+    relative_cost = 5
+
     @staticmethod
     def metadata_name() -> str:
         return 'complexity'
@@ -487,7 +774,47 @@ class ComplexityMetadata(GenericTextMetadataWithLanguage):
         return textstat.text_standard(text, True)
 
 
+@lru_cache(maxsize=None)
+def universal_tag_ids():
+    """
+    :return: dictionary that maps the Penn Treebank tags of nltk.pos_tag to the positions of their
+    universal tags in UNIVERSAL_TAGS, loaded once per process
+    """
+    mapping = nltk_tag_mapping.tagset_mapping('en-ptb', 'universal')
+    return {tag: UNIVERSAL_TAGS.index(universal_tag) for tag, universal_tag in mapping.items()}
+
+
+@lru_cache(maxsize=None)
+def pos_tagger():
+    """
+    :return: the perceptron tagger of nltk for English texts, loaded once per process
+    """
+    return nltk.tag.PerceptronTagger()
+
+
 class PartOfSpeechMetadata(GenericTextMetadataWithLanguage):
+    """
+    The five most frequent universal part of speech tags of English texts.
+    Texts are tagged in batches with the perceptron tagger of nltk (see pos_tagger), chunk by chunk.
+    :param language: language of the texts, only English texts are tagged
+    :param infer_language: whether the language of every text is detected instead
+    :param n_jobs: number of worker processes that tag chunks of texts
+    :param chunk_size: number of texts that are tagged at once
+    """
+
+    relative_cost = 20
+
+    def __init__(self, language='en', infer_language=False, n_jobs=1, chunk_size=TEXT_METADATA_CHUNK_SIZE):
+        super().__init__(language, infer_language)
+        if not isinstance(n_jobs, int) or n_jobs < 1:
+            raise ValueError("n_jobs should be an integer greater than 0. Received: {}".format(n_jobs))
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size should be an integer greater than 0. Received: {}".format(chunk_size))
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+
+    def fingerprint(self):
+        return fingerprint_without_parallelism(self)
 
     @staticmethod
     def metadata_name() -> str:
@@ -496,25 +823,120 @@ class PartOfSpeechMetadata(GenericTextMetadataWithLanguage):
     def metadata_return_type(self) -> ColumnType:
         return ColumnType.categorical
 
+    @staticmethod
+    def tag_counts(texts) -> np.ndarray:
+        """
+        Tag texts in a batch and count their universal tags.
+        :param texts: list of texts
+        :return: array with a row per text and a column per tag of UNIVERSAL_TAGS
+        """
+        if len(texts) == 0:
+            return np.zeros((0, len(UNIVERSAL_TAGS)), dtype=np.int64)
+        tag_ids = universal_tag_ids()
+        unknown = UNIVERSAL_TAGS.index('X')
+        tagged_texts = pos_tagger().tag_sents([nltk.word_tokenize(text) for text in texts])
+        rows = np.repeat(np.arange(len(texts)), [len(tagged_text) for tagged_text in tagged_texts])
+        ids = np.array([tag_ids.get(tag, unknown) for tagged_text in tagged_texts for _, tag in tagged_text],
+                       dtype=np.int64)
+        counts = np.bincount(rows * len(UNIVERSAL_TAGS) + ids, minlength=len(texts) * len(UNIVERSAL_TAGS))
+        return counts.reshape(len(texts), len(UNIVERSAL_TAGS))
+
     @staticmethod
     def tag_histogram(text):
-        tokenized_text = nltk.word_tokenize(text)
-        tagged_text = nltk.pos_tag(tokenized_text)
-        simplified_tagged_text = [(word, nltk.map_tag('en-ptb', 'universal', tag)) for word, tag in tagged_text]
-        tagdict = defaultdict(int)
-        for word in simplified_tagged_text:
-            tagdict[word[1]] += 1
-        return tagdict
+        return count_histogram(PartOfSpeechMetadata.tag_counts([text])[0], UNIVERSAL_TAGS)
 
     def metadata_function(self, language, text):
         if not isinstance(text, str) or language != 'en':
             return float('nan')
         return most_common_n_to_string_frequency(self.tag_histogram(text), 5)
 
+    def metadata_batch(self, languages, texts):
+        tagged = [row for row, (language, text) in enumerate(zip(languages, texts))
+                  if isinstance(text, str) and language == 'en']
+        metadata = [float('nan')] * len(texts)
+        for row, counts in zip(tagged, self.tag_counts([texts[row] for row in tagged])):
+            metadata[row] = most_common_n_to_string_frequency(count_histogram(counts, UNIVERSAL_TAGS), 5)
+        return metadata
 
-class TextMetadata(Precalculation):
+    def load_resources(self):
+        try:
+            pos_tagger()
+            universal_tag_ids()
+        except LookupError:
+            logger.info('The part of speech tagger of nltk is not available')
 
-    def __init__(self, text_metadata_types=None, language='en', infer_language=False):
+    def process_dataset(self, store, index):
+        columns = store.column_names(ColumnType.text)
+        return TextMetadata.process_fused(store[ColumnType.text][index], columns, [self], self.n_jobs,
+                                          self.chunk_size)[self]
+
+
+# metadata types whose resources are loaded in this process, see load_metadata_resources
+loaded_metadata_types = set()
+
+
+def load_metadata_resources(metadata_types):
+    """
+    Load the models of the metadata types once per process, see GenericTextMetadata.load_resources.
+    :param metadata_types: the GenericTextMetadata types the process computes
+    """
+    for metadata_type in metadata_types:
+        if metadata_type not in loaded_metadata_types:
+            metadata_type.load_resources()
+            loaded_metadata_types.add(metadata_type)
+
+
+def analyze_texts_in_worker(texts, metadata_types):
+    """
+    Analyze a chunk of texts in a worker process of TextMetadata, see analyze_texts.
+    The models of the metadata types are loaded with the first chunk of a worker.
+    :param texts: sequence of texts without missing values
+    :param metadata_types: the GenericTextMetadata types to compute
+    :return: list with an array of the metadata of the texts for every metadata type
+    """
+    load_metadata_resources(metadata_types)
+    return analyze_texts(texts, metadata_types)
+
+
+def analyze_texts(texts, metadata_types):
+    """
+    Compute several metadata types of texts. Intermediate results like the words, the delimiter or the language
+    of a text are shared by all metadata types (see AnalyzedText) and the metadata are written into
+    preallocated arrays (see MetadataColumn).
+    :param texts: sequence of texts without missing values
+    :param metadata_types: the GenericTextMetadata types to compute
+    :return: list with an array of the metadata of the texts for every metadata type
+    """
+    analyzed_texts = [AnalyzedText(text) for text in texts]
+    arrays = []
+    for metadata_type in metadata_types:
+        metadata_column = MetadataColumn(metadata_type, len(texts))
+        for row, metadata in enumerate(metadata_type.evaluate_batch(analyzed_texts)):
+            metadata_column[row] = metadata
+        arrays.append(metadata_column.to_array())
+    return arrays
+
+
+class TextMetadata(DatasetwisePrecalculation):
+    """
+    Metadata of the text columns, e.g. their number of characters or their languages.
+    :param text_metadata_types: the GenericTextMetadata types to compute,
+    by default NumCharsMetadata, NumWordsMetadata and DistinctWordsRatioMetadata
+    :param language: language of the texts for metadata types that depend on it
+    :param infer_language: whether these metadata types detect the language of every text instead
+    :param n_jobs: number of worker processes that analyze chunks of texts,
+    the results do not depend on it
+    :param chunk_size: number of texts that a worker process analyzes at once
+    """
+
+    def __init__(self, text_metadata_types=None, language='en', infer_language=False, n_jobs=1,
+                 chunk_size=TEXT_METADATA_CHUNK_SIZE):
+        if not isinstance(n_jobs, int) or n_jobs < 1:
+            raise ValueError("n_jobs should be an integer greater than 0. Received: {}".format(n_jobs))
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size should be an integer greater than 0. Received: {}".format(chunk_size))
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
         if text_metadata_types is None:
             self.text_metadata_types = frozenset([NumCharsMetadata(), NumWordsMetadata(), DistinctWordsRatioMetadata()])
         else:
@@ -531,16 +953,85 @@ class TextMetadata(Precalculation):
     def __hash__(self):
         return hash((self.__class__, self.text_metadata_types))
 
-    def process(self, store):
+    def fingerprint(self):
+        return fingerprint_without_parallelism(self)
+
+    def dataset_dependencies(self, store, index):
+        return [DatasetwiseResult(metadata_type, index) for metadata_type in sorted(self.text_metadata_types)]
+
+    def estimated_dataset_cost(self, store, index):
+        return store.estimated_workload(ColumnType.text, index=index)
+
+    def process_dataset(self, store, index):
+        """
+        The metadata types whose results are not in the store yet are computed together by the fused engine
+        (see process_fused) and added to the store, so that other TextMetadata precalculations reuse them.
+        :param store: the store
+        :param index: 0 for the first and 1 for the second data frame of the store
+        :return: data frame with a column for every pair of text column and metadata name
+        """
         columns = store.column_names(ColumnType.text)
+        pending = [metadata_type for metadata_type in sorted(self.text_metadata_types)
+                   if not store.is_executed(DatasetwiseResult(metadata_type, index))]
+        if pending and not any(store.is_executed(DatasetwiseResult(metadata_type, 1 - index))
+                               for metadata_type in pending):
+            # the results of both data frames are computed together, so that texts that occur in both
+            # data frames are analyzed only once
+            df1, df2 = store[ColumnType.text]
+            results = self.process_fused(pd.concat([df1[columns], df2[columns]], ignore_index=True), columns,
+                                         pending, self.n_jobs, self.chunk_size)
+            for metadata_type, result in results.items():
+                store.update({DatasetwiseResult(metadata_type, 0): result.iloc[:len(df1)].reset_index(drop=True),
+                              DatasetwiseResult(metadata_type, 1): result.iloc[len(df1):].reset_index(drop=True)})
+        elif pending:
+            results = self.process_fused(store[ColumnType.text][index], columns, pending, self.n_jobs,
+                                         self.chunk_size)
+            store.update({DatasetwiseResult(metadata_type, index): result
+                          for metadata_type, result in results.items()})
 
         metadata_names = sorted([mdtype.metadata_name() for mdtype in self.text_metadata_types])
-        index = pd.MultiIndex.from_product([columns, metadata_names], names=['column', 'metadata'])
-        metadata1 = pd.DataFrame(columns=index)
-        metadata2 = pd.DataFrame(columns=index)
+        multi_index = pd.MultiIndex.from_product([columns, metadata_names], names=['column', 'metadata'])
+        metadata = pd.DataFrame(columns=multi_index)
         for metadata_type in self.text_metadata_types:
-            md1, md2 = store[metadata_type]
+            md = store[DatasetwiseResult(metadata_type, index)]
             for column in columns:
-                metadata1[(column, metadata_type.metadata_name())] = md1[column]
-                metadata2[(column, metadata_type.metadata_name())] = md2[column]
-        return metadata1, metadata2
+                metadata[(column, metadata_type.metadata_name())] = md[column]
+        return metadata
+
+    @staticmethod
+    def process_fused(df, columns, metadata_types, n_jobs=1, chunk_size=TEXT_METADATA_CHUNK_SIZE):
+        """
+        Compute several metadata types in a single pass over the distinct texts, see analyze_texts.
+        Their results are broadcast to the rows with the same text.
+        With several jobs, the texts are split into chunks that are analyzed by a process pool.
+        :param df: data frame with the text columns
+        :param columns: the text columns
+        :param metadata_types: the GenericTextMetadata types to compute
+        :param n_jobs: number of worker processes
+        :param chunk_size: number of texts that a worker process analyzes at once
+        :return: dictionary that maps the metadata types to data frames like their process_dataset returns
+        """
+        logger.info('Fused analysis of {} for {}'.format(
+            ', '.join(metadata_type.metadata_name() for metadata_type in metadata_types), ', '.join(columns)))
+        chunks = {}
+        codes = {}
+        for column in columns:
+            codes[column], texts = pd.factorize(df[column].dropna().values)
+            logger.info('{} distinct texts of {} texts in {}'.format(len(texts), len(codes[column]), column))
+            # a column without texts has a single empty chunk
+            chunks[column] = [texts[start:start + chunk_size] for start in range(0, max(len(texts), 1), chunk_size)]
+
+        if n_jobs > 1 and sum(len(column_chunks) for column_chunks in chunks.values()) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = {column: [executor.submit(analyze_texts_in_worker, chunk, metadata_types)
+                                    for chunk in column_chunks]
+                           for column, column_chunks in chunks.items()}
+                arrays = {column: [future.result() for future in column_futures]
+                          for column, column_futures in futures.items()}
+        else:
+            arrays = {column: [analyze_texts(chunk, metadata_types) for chunk in column_chunks]
+                      for column, column_chunks in chunks.items()}
+
+        return {metadata_type: pd.DataFrame({column: np.concatenate([chunk[position] for chunk in arrays[column]])
+                                             [codes[column]] for column in columns}, columns=columns)
+                for position, metadata_type in enumerate(metadata_types)}
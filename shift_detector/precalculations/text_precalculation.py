@@ -1,11 +1,11 @@
 import re
 import pandas as pd
 
-from shift_detector.precalculations.precalculation import Precalculation
-from shift_detector.utils.column_management import ColumnType
+from shift_detector.precalculations.precalculation import DatasetwisePrecalculation
+from shift_detector.utils.column_management import ColumnType, decode_values
 
 
-class TokenizeIntoLowerWordsPrecalculation(Precalculation):
+class TokenizeIntoLowerWordsPrecalculation(DatasetwisePrecalculation):
 
     def __eq__(self, other):
         return isinstance(other, self.__class__)
@@ -28,13 +28,16 @@ class TokenizeIntoLowerWordsPrecalculation(Precalculation):
         splitted = re.split(r'\W\s|\s', text)
         return splitted
 
-    def process(self, store):
-        tokenized1 = pd.DataFrame()
-        tokenized2 = pd.DataFrame()
-        df1, df2 = store[ColumnType.text]
-        for column in df1.columns:
-            clean1 = df1[column].dropna()
-            clean2 = df2[column].dropna()
-            tokenized1[column] = [self.tokenize_into_words(text) for text in clean1]
-            tokenized2[column] = [self.tokenize_into_words(text) for text in clean2]
-        return tokenized1, tokenized2
+    def dataset_dependencies(self, store, index):
+        return []
+
+    def estimated_dataset_cost(self, store, index):
+        return store.estimated_workload(ColumnType.text, index=index, per_character=True)
+
+    def process_dataset(self, store, index):
+        tokenized = pd.DataFrame()
+        for column in store.column_names(ColumnType.text):
+            # rows with the same text share the list of its words
+            codes, texts = store.unique_texts(column, index)
+            tokenized[column] = decode_values([self.tokenize_into_words(text) for text in texts], codes)
+        return tokenized
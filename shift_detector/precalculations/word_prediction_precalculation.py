@@ -3,17 +3,18 @@ import os
 from typing import Tuple
 
 import numpy as np
-from gensim.models import FastText
-from keras.callbacks import ModelCheckpoint, EarlyStopping
-from keras.layers import Dense
-from keras.layers import LSTM
-from keras.models import Sequential
 from numpy.random import seed
-from tensorflow import set_random_seed
 
 from shift_detector.precalculations.precalculation import Precalculation
 from shift_detector.precalculations.text_embedding_precalculation import TextEmbeddingPrecalculation
 from shift_detector.utils.column_management import ColumnType
+from shift_detector.utils.lazy_import import LazyModule
+
+gensim_models = LazyModule('gensim.models')
+keras_callbacks = LazyModule('keras.callbacks')
+keras_layers = LazyModule('keras.layers')
+keras_models = LazyModule('keras.models')
+tensorflow = LazyModule('tensorflow')
 
 
 class WordPredictionPrecalculation(Precalculation):
@@ -62,12 +63,12 @@ class WordPredictionPrecalculation(Precalculation):
                              'Please pass one of [{}] instead.'
                              .format(self.column, store.column_names(ColumnType.text)))
 
-        ft_model = FastText(size=self.ft_size, window=self.ft_window_size, min_count=1,
-                            workers=self.ft_workers, seed=self.seed)
+        ft_model = gensim_models.FastText(size=self.ft_size, window=self.ft_window_size, min_count=1,
+                                          workers=self.ft_workers, seed=self.seed)
         processed_df1, processed_df2 = store[TextEmbeddingPrecalculation(model=ft_model, agg=None)]
 
         seed(self.seed)
-        set_random_seed(self.seed)
+        tensorflow.set_random_seed(self.seed)
 
         df1_prediction_loss, df2_prediction_loss = self.get_prediction_losses(processed_df1,
                                                                               processed_df2,
@@ -141,17 +142,17 @@ class WordPredictionPrecalculation(Precalculation):
     def create_callbacks(self):
         callbacks = []
 
-        callbacks += [ModelCheckpoint(self.output_path + '/model.h5', verbose=self.verbose,
-                                      monitor='loss', save_best_only=True, mode='auto')]
-        callbacks += [EarlyStopping(monitor='loss', patience=3, verbose=self.verbose,
-                                    mode='auto', restore_best_weights=True)]
+        callbacks += [keras_callbacks.ModelCheckpoint(self.output_path + '/model.h5', verbose=self.verbose,
+                                                      monitor='loss', save_best_only=True, mode='auto')]
+        callbacks += [keras_callbacks.EarlyStopping(monitor='loss', patience=3, verbose=self.verbose,
+                                                    mode='auto', restore_best_weights=True)]
 
         return callbacks
 
     def create_model(self):
-        model = Sequential()
-        model.add(LSTM(128, input_shape=(self.lstm_window, self.ft_size)))
-        model.add(Dense(self.ft_size))
+        model = keras_models.Sequential()
+        model.add(keras_layers.LSTM(128, input_shape=(self.lstm_window, self.ft_size)))
+        model.add(keras_layers.Dense(self.ft_size))
 
         model.compile(loss='mean_squared_error', optimizer='adam')
         return model
@@ -0,0 +1,49 @@
+import logging as logger
+
+from shift_detector.detector import Detector, execute_check, validate_checks
+from shift_detector.precalculations.streaming_store import StreamingStore
+from shift_detector.utils.column_management import column_names
+from shift_detector.utils.custom_print import lprint
+
+
+class StreamingDetector(Detector):
+    """
+    Detector for CSV files that do not fit into memory.
+    The files are read chunk by chunk into mergeable column summaries (see StreamingStore),
+    so that the memory usage does not depend on the number of rows.
+    Supported checks are NumericalStatisticalCheck, CategoricalStatisticalCheck, DQMetricsCheck and
+    SorensenDiceCheck. Other checks report that they do not support streaming.
+    :param df1_path: path of the first CSV file
+    :param df2_path: path of the second CSV file
+    :param delimiter: delimiter of the CSV files
+    :param chunk_size: number of rows that are read at once
+    :param sample_size: number of rows to detect the column types on
+    """
+
+    def __init__(self,
+                 df1_path: str,
+                 df2_path: str,
+                 delimiter=',',
+                 log_print=True,
+                 chunk_size=100000,
+                 sample_size=10000,
+                 **custom_column_types):
+        self.log_print = log_print
+        self.check_reports = []
+        self.store = StreamingStore(df1_path, df2_path, delimiter=delimiter, chunk_size=chunk_size,
+                                    sample_size=sample_size, log_print=log_print,
+                                    custom_column_types=custom_column_types)
+
+        lprint("Used columns: {}".format(', '.join(column_names(self.store.column_names()))), self.log_print)
+
+    def run(self, *checks, logger_level=logger.ERROR):
+        """
+        Run the Detector with the checks to run.
+        :param checks: checks to run
+        :param logger_level: level of logging
+        """
+        logger.getLogger().setLevel(logger_level)
+
+        validate_checks(checks)
+
+        self.check_reports = [execute_check(check, self.store, self.log_print, streaming=True) for check in checks]
@@ -1,6 +1,8 @@
+from collections import namedtuple
 from enum import Enum
-from typing import List
+from typing import List, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 from pandas.core.dtypes.common import is_numeric_dtype
 
@@ -13,9 +15,71 @@ class ColumnType(Enum):
     text = 'text'
 
 
+# number of rows whose distinct values are counted to estimate the cardinality of a column
+CARDINALITY_SAMPLE_SIZE = 100
+# seed of the rows that are sampled to estimate cardinalities, so that column types are stable between runs
+CARDINALITY_SEED = 0
+
+
+class ColumnStatistics(namedtuple('ColumnStatistics', ['sample_size', 'distinct'])):
+    """
+    Cardinality estimate of a column from a sample of its rows, see column_statistics.
+    :param sample_size: number of sampled rows
+    :param distinct: number of distinct values in the sample, missing values count as one value
+    """
+
+    @property
+    def unique_fraction(self) -> float:
+        return self.distinct / self.sample_size if self.sample_size else 0.0
+
+    def is_categorical(self, max_unique_fraction: float = CATEGORICAL_MAX_RELATIVE_CARDINALITY) -> bool:
+        """
+        :param max_unique_fraction: maximum relative cardinality
+        :return: True if the column is categorical according to the heuristic of is_categorical
+        """
+        return self.unique_fraction <= max_unique_fraction
+
+    def may_be_binary(self) -> bool:
+        """
+        :return: False if the sample shows that the column is not binary, see is_binary
+        """
+        # zero, one and missing values
+        return self.distinct <= 3
+
+
+def column_statistics(df: pd.DataFrame,
+                      columns=None,
+                      n_samples: int = CARDINALITY_SAMPLE_SIZE,
+                      seed: int = CARDINALITY_SEED) -> Dict[str, ColumnStatistics]:
+    """
+    Estimate the cardinalities of many columns at once. The same seeded sample of rows is taken for all columns and
+    the distinct values of the sample are counted on their hashes, so the cost does not depend on the number of rows.
+    :param df: the data frame
+    :param columns: the columns to estimate, all columns by default
+    :param n_samples: maximum sample size, if the data frame is shorter all rows are used
+    :param seed: seed of the sample
+    :return: dictionary that maps the columns to their ColumnStatistics
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    if len(df) > n_samples:
+        positions = np.sort(np.random.RandomState(seed).choice(len(df), n_samples, replace=False))
+        sample = df.iloc[positions][columns]
+    else:
+        sample = df[columns]
+    if len(sample) == 0 or not columns:
+        return {column: ColumnStatistics(len(sample), 0) for column in columns}
+
+    hashes = np.column_stack([pd.util.hash_pandas_object(sample.iloc[:, i], index=False).values
+                              for i in range(len(columns))])
+    hashes.sort(axis=0)
+    distinct = 1 + (np.diff(hashes, axis=0) != 0).sum(axis=0)
+    return {column: ColumnStatistics(len(sample), int(count)) for column, count in zip(columns, distinct)}
+
+
 def is_categorical(col: pd.Series,
-                   n_samples: int = 100,
-                   max_unique_fraction: float = CATEGORICAL_MAX_RELATIVE_CARDINALITY) -> bool:
+                   n_samples: int = CARDINALITY_SAMPLE_SIZE,
+                   max_unique_fraction: float = CATEGORICAL_MAX_RELATIVE_CARDINALITY,
+                   seed: int = CARDINALITY_SEED) -> bool:
     """
     A heuristic to check whether a column is categorical:
     a column is considered categorical (as opposed to a plain text column)
@@ -23,24 +87,103 @@ def is_categorical(col: pd.Series,
     :param col: pandas Series containing strings
     :param n_samples: maximum sample size used for heuristic (default: 100) if series is shorter all values are used
     :param max_unique_fraction: maximum relative cardinality.
+    :param seed: seed of the sample
     :return: True if the column is categorical according to the heuristic
     """
-
-    if len(col) >= n_samples:
-        sample = col.sample(n=n_samples)
-        unique_fraction = sample.unique().shape[0] / n_samples
-    else:
-        sample = col
-        unique_fraction = sample.unique().shape[0] / sample.shape[0]
-
-    return unique_fraction <= max_unique_fraction
+    statistics = column_statistics(col.to_frame(name='column'), n_samples=n_samples, seed=seed)['column']
+    return statistics.is_categorical(max_unique_fraction)
 
 
 def is_binary(col: pd.Series, allow_na=True):
+    """
+    :param col: the column
+    :param allow_na: ignore missing values
+    :return: True if the values of the column are exactly 0 and 1 (or False and True)
+    """
     if allow_na:
         col = col.dropna()
-    values = sorted(col.unique())
-    return values == [0, 1]
+    elif col.isna().any():
+        return False
+    try:
+        zeros = (col == 0).values
+        ones = (col == 1).values
+    except TypeError:
+        return False
+    return bool((zeros | ones).all() and zeros.any() and ones.any())
+
+
+def encode_columns(column1: pd.Series, column2: pd.Series) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    Dictionary encode two columns with a shared dictionary of the string representations of their values.
+    Only the distinct values are converted to strings, missing values are represented like str does
+    (e.g. 'nan' and 'None').
+    :param column1: column of the first data frame
+    :param column2: column of the second data frame
+    :return: codes of the values of column1, codes of the values of column2 and the sorted dictionary
+    """
+    values = pd.concat([column1, column2], ignore_index=True)
+    value_codes, uniques = pd.factorize(values)
+    missing = value_codes < 0
+    missing_strings = values[missing].astype(str).values
+
+    # distinct values can have the same string representation, e.g. 1 and '1'
+    string_codes, dictionary = pd.factorize(np.concatenate([np.asarray(uniques.astype(str), dtype=object),
+                                                            missing_strings]), sort=True)
+    codes = np.empty(len(values), dtype=np.int64)
+    codes[~missing] = string_codes[:len(uniques)][value_codes[~missing]]
+    codes[missing] = string_codes[len(uniques):]
+    return codes[:len(column1)], codes[len(column1):], pd.Index(dictionary, dtype=object)
+
+
+def encode_column(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Dictionary encode a single column like encode_columns does, e.g. to merge it with the encoding of
+    another column later (see merge_encodings).
+    :param column: the column
+    :return: codes of the values of the column and the sorted dictionary
+    """
+    codes, _, dictionary = encode_columns(column, column.iloc[:0])
+    return codes, dictionary
+
+
+def merge_encodings(codes1: np.ndarray, dictionary1: pd.Index,
+                    codes2: np.ndarray, dictionary2: pd.Index) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    Merge the encodings of two columns into the encoding that encode_columns returns for both columns,
+    without encoding their values again. Only the codes are translated into the merged dictionary.
+    :param codes1: codes of the first column
+    :param dictionary1: sorted dictionary of the first column
+    :param codes2: codes of the second column
+    :param dictionary2: sorted dictionary of the second column
+    :return: codes of the first column, codes of the second column and the merged sorted dictionary
+    """
+    dictionary = pd.Index(np.unique(np.concatenate([np.asarray(dictionary1, dtype=object),
+                                                    np.asarray(dictionary2, dtype=object)])), dtype=object)
+    return (dictionary.get_indexer(dictionary1)[codes1], dictionary.get_indexer(dictionary2)[codes2],
+            dictionary)
+
+
+def compact_codes(codes: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Restrict dictionary codes to the values that occur, e.g. in one of the two encoded columns.
+    :param codes: codes into a dictionary
+    :param size: size of the dictionary
+    :return: sorted positions of the occurring values in the dictionary and the codes into these positions
+    """
+    used = np.flatnonzero(np.bincount(codes, minlength=size))
+    lookup = np.zeros(size, dtype=np.int64)
+    lookup[used] = np.arange(len(used))
+    return used, lookup[codes]
+
+
+def decode_values(values: list, codes: np.ndarray) -> np.ndarray:
+    """
+    Broadcast the results of a function that was applied to every distinct value back to the rows.
+    :param values: list or array of results, one per distinct value
+    :param codes: codes of the rows into the distinct values
+    :return: array with the result of every row, whose dtype is inferred like pandas infers it from a list
+    """
+    return pd.Series(values, dtype=None if len(values) > 0 else object).values[codes]
 
 
 def column_names(columns) -> List[str]:
@@ -52,32 +195,40 @@ def column_names(columns) -> List[str]:
     return [str(c) for c in columns]
 
 
-def detect_column_types(df1, df2, columns):
+def detect_column_types(df1, df2, columns, statistics=None):
     """
     Split df1 and df2 in different dataframes related to type of the column.
     The column types are numeric, categorical and text.
     :param df1: first dataframe
     :param df2: second dataframe
     :param columns: the columns that both dataframes contain
+    :param statistics: pair of dictionaries with the ColumnStatistics of the columns of df1 and df2,
+    they are estimated if they are not given
     :return: dictionary that maps the column types to the respective columns
     {
         ColumnType: [column1, ...],
         ...
     }
     """
-    categorical_columns = [c for c in columns if is_binary(df1[c]) and is_binary(df2[c])]
+    if statistics is None:
+        statistics = (column_statistics(df1, columns), column_statistics(df2, columns))
+    statistics1, statistics2 = statistics
 
-    remaining_columns = list(set(columns) - set(categorical_columns))
+    categorical_columns = [c for c in columns
+                           if statistics1[c].may_be_binary() and statistics2[c].may_be_binary()
+                           and is_binary(df1[c]) and is_binary(df2[c])]
+
+    remaining_columns = [c for c in columns if c not in categorical_columns]
     numerical_columns = [c for c in remaining_columns if is_numeric_dtype(df1[c]) and is_numeric_dtype(df2[c])]
 
-    non_numerical = list(set(remaining_columns) - set(numerical_columns))
-    categorical_columns.extend([c for c in non_numerical if is_categorical(df1[c]) and is_categorical(df2[c])])
+    non_numerical = [c for c in remaining_columns if c not in numerical_columns]
+    categorical_columns.extend([c for c in non_numerical
+                                if statistics1[c].is_categorical() and statistics2[c].is_categorical()])
 
-    text_columns = list(set(non_numerical) - set(categorical_columns))
+    text_columns = [c for c in non_numerical if c not in categorical_columns]
 
     return {
         ColumnType.numerical: numerical_columns,
         ColumnType.categorical: categorical_columns,
         ColumnType.text: text_columns
     }
-
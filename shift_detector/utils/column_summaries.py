@@ -0,0 +1,204 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.utils.sketches import QuantileSketch
+
+# maximum number of distinct values whose counts are kept for a numerical column
+MAX_DISTINCT_COUNTS = 100000
+
+
+class NumericalSummary:
+    """
+    Mergeable summary of a numerical column: count of values and missing values, moments, minimum, maximum,
+    a quantile sketch and the counts of the distinct values as long as there are at most max_distinct of them.
+    :param sketch_k: accuracy parameter of the quantile sketch
+    :param max_distinct: maximum number of distinct values to count
+    """
+
+    def __init__(self, sketch_k=1000, max_distinct=MAX_DISTINCT_COUNTS):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(sketch_k)
+        self.max_distinct = max_distinct
+        self.value_counts = Counter()
+
+    def update(self, values: pd.Series):
+        """
+        Add the values of a chunk of the column.
+        :param values: series of numbers
+        """
+        values = values.astype(float)
+        present = values.dropna()
+        chunk = NumericalSummary(self.sketch.k, self.max_distinct)
+        chunk.count = len(present)
+        chunk.missing = len(values) - len(present)
+        if chunk.count > 0:
+            chunk.mean = float(present.mean())
+            chunk.m2 = float(((present - chunk.mean) ** 2).sum())
+        chunk.sketch.update(present.values)
+        if self.value_counts is not None:
+            chunk.value_counts.update(present.value_counts().to_dict())
+        else:
+            chunk.value_counts = None
+        self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Add all values summarized by other.
+        :param other: NumericalSummary
+        :return: this summary
+        """
+        count = self.count + other.count
+        if count > 0:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.mean += delta * other.count / count
+        self.count = count
+        self.missing += other.missing
+        self.sketch.merge(other.sketch)
+        if self.value_counts is None or other.value_counts is None:
+            self.value_counts = None
+        else:
+            self.value_counts.update(other.value_counts)
+            if len(self.value_counts) > self.max_distinct:
+                self.value_counts = None
+        return self
+
+    @property
+    def min(self):
+        return self.sketch.min
+
+    @property
+    def max(self):
+        return self.sketch.max
+
+    def std(self):
+        """
+        :return: sample standard deviation
+        """
+        if self.count < 2:
+            return float('nan')
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    def quantile(self, q):
+        return float(self.sketch.quantile(q))
+
+    def completeness(self):
+        return self.count / (self.count + self.missing) if self.count + self.missing > 0 else float('nan')
+
+    def categorical_summary(self):
+        """
+        :return: CategoricalSummary of the values or None if there are too many distinct values
+        """
+        if self.value_counts is None:
+            return None
+        summary = CategoricalSummary()
+        summary.counts = self.value_counts.copy()
+        summary.missing = self.missing
+        return summary
+
+
+class CategoricalSummary:
+    """
+    Mergeable summary of a categorical column: the counts of all values and of missing values.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.missing = 0
+
+    def update(self, values: pd.Series):
+        """
+        Add the values of a chunk of the column.
+        :param values: series of values
+        """
+        counts = values.value_counts()
+        self.counts.update(counts.to_dict())
+        self.missing += len(values) - int(counts.sum())
+
+    def merge(self, other):
+        """
+        Add all values summarized by other.
+        :param other: CategoricalSummary
+        :return: this summary
+        """
+        self.counts.update(other.counts)
+        self.missing += other.missing
+        return self
+
+    @property
+    def count(self):
+        return sum(self.counts.values())
+
+    def value_counts(self) -> pd.Series:
+        return pd.Series(dict(self.counts), dtype=float).sort_values(ascending=False)
+
+    def completeness(self):
+        total = self.count + self.missing
+        return self.count / total if total > 0 else float('nan')
+
+    def uniqueness(self):
+        """
+        :return: ratio of values that occur exactly once
+        """
+        count = self.count
+        return sum(1 for value_count in self.counts.values() if value_count == 1) / count if count else float('nan')
+
+
+class NGramSummary:
+    """
+    Mergeable summary of a text column: the summed n-gram histograms of its texts.
+    Every text is also assigned at random to the baseline part or the remaining part of the column,
+    whose histograms are summarized separately (see SorensenDiceCheck).
+    :param n: length of the n-grams
+    :param words: True for word n-grams, False for character n-grams
+    :param baseline_ratio: ratio of texts that are assigned to the baseline part
+    :param seed: seed of the assignment to the parts
+    """
+
+    def __init__(self, n, words=False, baseline_ratio=0.05, seed=11):
+        self.n = n
+        self.words = words
+        self.baseline_ratio = baseline_ratio
+        self.random_state = np.random.RandomState(seed)
+        self.histograms = {'all': Counter(), 'remaining': Counter(), 'baseline': Counter()}
+        self.rows = {'all': 0, 'remaining': 0, 'baseline': 0}
+
+    def update(self, texts: pd.Series):
+        """
+        Add the texts of a chunk of the column.
+        :param texts: series of strings
+        """
+        texts = texts.dropna().str.lower()
+        if self.words:
+            texts = texts.str.split()
+        is_baseline = self.random_state.random_sample(len(texts)) < self.baseline_ratio
+        for text, baseline in zip(texts, is_baseline):
+            ngram = Counter(tuple(text[i:i + self.n]) for i in range(len(text) - self.n + 1))
+            part = 'baseline' if baseline else 'remaining'
+            for name in ('all', part):
+                self.histograms[name].update(ngram)
+                self.rows[name] += 1
+
+    def merge(self, other):
+        """
+        Add all texts summarized by other.
+        :param other: NGramSummary
+        :return: this summary
+        """
+        for name in self.histograms:
+            self.histograms[name].update(other.histograms[name])
+            self.rows[name] += other.rows[name]
+        return self
+
+    def normalized_histogram(self, part='all'):
+        """
+        :param part: 'all', 'remaining' or 'baseline'
+        :return: dictionary that maps the n-grams to their average count per text
+        """
+        rows = self.rows[part]
+        return {ngram: count / rows for ngram, count in self.histograms[part].items()}
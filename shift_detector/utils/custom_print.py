@@ -1,5 +1,15 @@
 import sys
-from IPython.display import display, Markdown
+
+from shift_detector.utils.lazy_import import LazyModule
+
+ipython_display = LazyModule('IPython.display')
+
+
+def display(*objs, **kwargs):
+    """
+    Display the objects with IPython, which is only imported when something is displayed.
+    """
+    return ipython_display.display(*objs, **kwargs)
 
 
 def nprint(input_str, num_tabs=0, text_formatting='normal'):
@@ -11,16 +21,16 @@ def nprint(input_str, num_tabs=0, text_formatting='normal'):
         print(input_str)
     else:
         if text_formatting == 'h1':
-            display(Markdown('# {}'.format(input_str)))
+            display(ipython_display.Markdown('# {}'.format(input_str)))
 
         elif text_formatting == 'h2':
-            display(Markdown('## {}'.format(input_str)))
+            display(ipython_display.Markdown('## {}'.format(input_str)))
 
         elif text_formatting == 'h3':
-            display(Markdown('### {}'.format(input_str)))
+            display(ipython_display.Markdown('### {}'.format(input_str)))
 
         elif text_formatting == 'h4':
-            display(Markdown('#### {}'.format(input_str)))
+            display(ipython_display.Markdown('#### {}'.format(input_str)))
 
         else:
             display(input_str)
@@ -31,7 +41,7 @@ def mdprint(input_str):
     if not is_in_jupyter():
         print(input_str)
     else:
-        display(Markdown(input_str))
+        display(ipython_display.Markdown(input_str))
 
 
 def is_in_jupyter():
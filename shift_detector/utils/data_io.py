@@ -1,14 +1,153 @@
 import logging as logger
+import os
 from typing import List
 
 import pandas as pd
 
+from shift_detector.utils.sampling import ReservoirSampler, RESERVOIR_CHUNK_SIZE
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+
 
 def read_from_csv(file_path: str, separator: str) -> pd.DataFrame:
     logger.info('Reading in CSV file. This may take a while ...')
     return pd.read_csv(file_path, sep=separator, error_bad_lines=False)
 
 
+def file_format(file_path: str) -> str:
+    """
+    Determine the format of a data file by its extension.
+    :param file_path: path of the file
+    :return: 'parquet', 'arrow' for Feather and Arrow IPC files, or 'csv' for all other files
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        return 'parquet'
+    if extension in ARROW_EXTENSIONS:
+        return 'arrow'
+    return 'csv'
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Reading Parquet, Feather and Arrow files requires pyarrow. "
+                          "Install it with 'pip install pyarrow'.")
+    return pyarrow
+
+
+def read_arrow_schema(file_path: str):
+    """
+    Read the schema of a Feather V1, Feather V2, Arrow IPC file or Arrow IPC stream without loading its data.
+    :param file_path: path of the file
+    :return: the pyarrow.Schema of the file
+    """
+    pyarrow = import_pyarrow()
+    # Feather V2 files are Arrow IPC files
+    for open_reader in [pyarrow.ipc.open_file, pyarrow.ipc.open_stream]:
+        with pyarrow.memory_map(file_path) as source:
+            try:
+                return open_reader(source).schema
+            except pyarrow.ArrowInvalid:
+                pass
+    # Feather V1 files are uncompressed, memory mapping them does not load their data
+    return pyarrow.feather.read_table(file_path, memory_map=True).schema
+
+
+def read_column_names(file_path: str, separator: str) -> List[str]:
+    """
+    Read the column names of a data file without loading its data.
+    Parquet, Feather and Arrow IPC files are recognized by their extension, all other files are read as CSV.
+    :param file_path: path of the file
+    :param separator: delimiter of CSV files
+    :return: list of the column names
+    """
+    file_type = file_format(file_path)
+    if file_type == 'parquet':
+        pyarrow = import_pyarrow()
+        return pyarrow.parquet.read_schema(file_path, memory_map=True).names
+    if file_type == 'arrow':
+        return read_arrow_schema(file_path).names
+    return list(pd.read_csv(file_path, sep=separator, nrows=0).columns)
+
+
+def read_data(file_path: str, separator: str, columns=None) -> pd.DataFrame:
+    """
+    Read a data file. Parquet, Feather and Arrow IPC files are recognized by their extension and are
+    memory mapped, all other files are read as CSV.
+    :param file_path: path of the file
+    :param separator: delimiter of CSV files
+    :param columns: columns to read, None to read all columns
+    :return: data frame with the columns
+    """
+    file_type = file_format(file_path)
+    if file_type == 'csv':
+        if columns is None:
+            return read_from_csv(file_path, separator)
+        logger.info('Reading in CSV file. This may take a while ...')
+        return pd.read_csv(file_path, sep=separator, error_bad_lines=False, usecols=columns)[columns]
+
+    pyarrow = import_pyarrow()
+    if file_type == 'parquet':
+        table = pyarrow.parquet.read_table(file_path, columns=columns, memory_map=True)
+    else:
+        try:
+            table = pyarrow.feather.read_table(file_path, columns=columns, memory_map=True)
+        except pyarrow.ArrowInvalid:
+            # Arrow IPC streams are not Feather files
+            with pyarrow.memory_map(file_path) as source:
+                table = pyarrow.ipc.open_stream(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    # split_blocks avoids consolidating the columns into a single block, which would copy all of them
+    return table.to_pandas(split_blocks=True)
+
+
+def read_csv_sample(file_path: str, separator: str, rows: int) -> pd.DataFrame:
+    """
+    Read the first rows of a CSV file.
+    :param file_path: path of the file
+    :param separator: delimiter of the file
+    :param rows: maximum number of rows to read
+    :return: data frame with the rows
+    """
+    return pd.read_csv(file_path, sep=separator, error_bad_lines=False, nrows=rows)
+
+
+def read_csv_in_chunks(file_path: str, separator: str, chunk_size: int, columns=None):
+    """
+    Read a CSV file chunk by chunk, so that only one chunk is in memory at a time.
+    :param file_path: path of the file
+    :param separator: delimiter of the file
+    :param chunk_size: number of rows per chunk
+    :param columns: columns to read, None to read all columns
+    :return: iterator over data frames with at most chunk_size rows
+    """
+    logger.info('Reading in CSV file in chunks of {} rows.'.format(chunk_size))
+    return pd.read_csv(file_path, sep=separator, error_bad_lines=False, chunksize=chunk_size, usecols=columns)
+
+
+def read_csv_reservoir_sample(file_path: str, separator: str, rows: int, seed=0, columns=None) -> pd.DataFrame:
+    """
+    Sample rows of a CSV file uniformly while it is read chunk by chunk, so that the file is never loaded completely.
+    :param file_path: path of the file
+    :param separator: delimiter of the file
+    :param rows: number of rows to sample
+    :param seed: seed of the sample
+    :param columns: columns to read, None to read all columns
+    :return: data frame with the sampled rows in the order of the file
+    """
+    sampler = ReservoirSampler(rows, seed)
+    for chunk in read_csv_in_chunks(file_path, separator, RESERVOIR_CHUNK_SIZE, columns):
+        sampler.update(chunk)
+    return sampler.sample()
+
+
 def shared_column_names(df1: pd.DataFrame, df2: pd.DataFrame) -> List[str]:
     """
     Find the column names that both dataframes share.
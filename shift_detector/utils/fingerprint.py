@@ -0,0 +1,65 @@
+import hashlib
+from enum import Enum
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+
+def stable_fingerprint(obj) -> str:
+    """
+    Calculate a fingerprint of obj that is equal for equal objects in every python process.
+    In contrast to hash(), the fingerprint is not salted per process and can be used as a key for persisted data.
+    Supported are None, numbers, strings, bytes, enums, classes, lists, tuples, sets, dicts,
+    objects with a fingerprint() method and objects with a scikit-learn style get_params() method.
+    :param obj: object to fingerprint
+    :return: hexadecimal fingerprint
+    :raises TypeError: if obj (or one of its elements) is not supported
+    """
+    return hashlib.sha1(canonical_bytes(obj)).hexdigest()
+
+
+def canonical_bytes(obj) -> bytes:
+    if obj is None or isinstance(obj, (bool, str, bytes)):
+        return repr(obj).encode('utf-8', 'surrogatepass')
+    if isinstance(obj, Enum):
+        return b'enum:' + qualified_name(obj.__class__) + b'.' + obj.name.encode('utf-8')
+    if isinstance(obj, np.generic):
+        return canonical_bytes(obj.item())
+    if isinstance(obj, Number):
+        return obj.__class__.__name__.encode('utf-8') + b':' + repr(obj).encode('utf-8')
+    if isinstance(obj, type):
+        return b'class:' + qualified_name(obj)
+    if isinstance(obj, (list, tuple)):
+        return b'(' + b','.join(canonical_bytes(item) for item in obj) + b')'
+    if isinstance(obj, (set, frozenset)):
+        return b'{' + b','.join(sorted(canonical_bytes(item) for item in obj)) + b'}'
+    if isinstance(obj, dict):
+        items = sorted(canonical_bytes(key) + b':' + canonical_bytes(value) for key, value in obj.items())
+        return b'{' + b','.join(items) + b'}'
+    if callable(getattr(obj, 'fingerprint', None)):
+        return b'fingerprint:' + obj.fingerprint().encode('utf-8')
+    if callable(getattr(obj, 'get_params', None)):
+        return b'params:' + qualified_name(obj.__class__) + canonical_bytes(obj.get_params(deep=False))
+    raise TypeError("Cannot calculate a stable fingerprint for objects of type {}".format(obj.__class__.__name__))
+
+
+def qualified_name(cls) -> bytes:
+    return '{}.{}'.format(cls.__module__, cls.__qualname__).encode('utf-8')
+
+
+def data_fingerprint(*dfs: pd.DataFrame) -> str:
+    """
+    Calculate a fingerprint of the content of the data frames.
+    It covers column names, data types and the values of all cells, but not the index.
+    :param dfs: data frames to fingerprint
+    :return: hexadecimal fingerprint
+    """
+    sha1 = hashlib.sha1()
+    for df in dfs:
+        sha1.update(canonical_bytes([str(column) for column in df.columns]))
+        sha1.update(canonical_bytes([str(dtype) for dtype in df.dtypes]))
+        for column in df.columns:
+            hashed_values = pd.util.hash_pandas_object(df[column], index=False).values
+            sha1.update(np.ascontiguousarray(hashed_values).tobytes())
+    return sha1.hexdigest()
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+PROFILE_COLUMNS = ['kind', 'name', 'check', 'cache', 'start', 'wall_time', 'cpu_time', 'peak_memory', 'process',
+                   'thread']
+
+# CPU time of the current thread, before Python 3.7 only the CPU time of the whole process is available
+thread_time = getattr(time, 'thread_time', time.process_time)
+# resets the peak of the traced memory, not available before Python 3.9
+reset_peak = getattr(tracemalloc, 'reset_peak', None)
+
+
+class Instrumentation:
+    """
+    Records the wall time, CPU time, peak memory and cache usage of checks and precalculations.
+    Every measurement is attributed to the check that is run by the measuring thread.
+    :param trace_memory: measure the peak memory with tracemalloc. This slows down the execution and
+    is not attributed exactly if checks run concurrently, as all threads share one trace.
+    Before Python 3.9, the peak cannot be reset, so the peak memory of a measurement is an upper bound that
+    includes the peaks of previous measurements. Before Python 3.7, the CPU time is that of the whole process.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self.origin = time.perf_counter()
+        self.__init_synchronization()
+
+    def __init_synchronization(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.active_measurements = 0
+        self.started_tracing = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        del state['local']
+        del state['active_measurements']
+        del state['started_tracing']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__init_synchronization()
+
+    def current_check(self):
+        """
+        :return: name of the check that is run by the current thread or None
+        """
+        return getattr(self.local, 'check', None)
+
+    def __measurements(self):
+        if not hasattr(self.local, 'measurements'):
+            self.local.measurements = []
+        return self.local.measurements
+
+    @contextmanager
+    def measure(self, kind, name, cache=None):
+        """
+        Measure the execution of the block. Measurements of kind 'check' set the check of the current thread.
+        :param kind: 'check' or 'precalculation'
+        :param name: name of the measured check or precalculation
+        :param cache: how the result was obtained, e.g. 'miss'. The block can change it with the yielded record.
+        :return: context manager that yields the record of the measurement
+        """
+        record = {'kind': kind, 'name': name, 'check': name if kind == 'check' else self.current_check(),
+                  'cache': cache, 'peak_memory': float('nan'), 'process': os.getpid(),
+                  'thread': threading.get_ident()}
+        previous_check = self.current_check()
+        if kind == 'check':
+            self.local.check = name
+
+        measurements = self.__measurements()
+        if self.trace_memory:
+            self.__start_tracing()
+            _, peak_memory = tracemalloc.get_traced_memory()
+            if measurements:
+                # keep the peak of the enclosing measurement before resetting it
+                measurements[-1]['peak'] = max(measurements[-1]['peak'], peak_memory)
+            if reset_peak is not None:
+                reset_peak()
+        measurement = {'memory': tracemalloc.get_traced_memory()[0] if self.trace_memory else 0, 'peak': 0}
+        measurements.append(measurement)
+
+        start = time.perf_counter()
+        cpu_start = thread_time()
+        try:
+            yield record
+        finally:
+            record['wall_time'] = time.perf_counter() - start
+            record['cpu_time'] = thread_time() - cpu_start
+            record['start'] = start - self.origin
+            measurements.pop()
+            if self.trace_memory:
+                measurement['peak'] = max(measurement['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_memory'] = max(measurement['peak'] - measurement['memory'], 0)
+                if measurements:
+                    measurements[-1]['peak'] = max(measurements[-1]['peak'], measurement['peak'])
+                self.__stop_tracing()
+            if kind == 'check':
+                self.local.check = previous_check
+            with self.lock:
+                self.records.append(record)
+
+    def __start_tracing(self):
+        with self.lock:
+            if self.active_measurements == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            self.active_measurements += 1
+
+    def __stop_tracing(self):
+        with self.lock:
+            self.active_measurements -= 1
+            if self.active_measurements == 0 and self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def record(self, kind, name, cache):
+        """
+        Record an access that took no measurable time, e.g. a cache hit.
+        """
+        record = {'kind': kind, 'name': name, 'check': self.current_check(), 'cache': cache,
+                  'start': time.perf_counter() - self.origin, 'wall_time': 0.0, 'cpu_time': 0.0,
+                  'peak_memory': float('nan'), 'process': os.getpid(), 'thread': threading.get_ident()}
+        with self.lock:
+            self.records.append(record)
+
+    def extend(self, records):
+        """
+        Add records of another instrumentation, e.g. of a worker process.
+        """
+        with self.lock:
+            self.records.extend(records)
+
+    def profile(self) -> pd.DataFrame:
+        """
+        :return: data frame with one row per record, ordered by start time
+        """
+        with self.lock:
+            records = list(self.records)
+        return pd.DataFrame(records, columns=PROFILE_COLUMNS).sort_values('start').reset_index(drop=True)
+
+    def to_chrome_trace(self, path):
+        """
+        Write the records as Chrome trace events, which can be opened with chrome://tracing or Perfetto.
+        :param path: path of the JSON file
+        """
+        events = []
+        for record in self.profile().to_dict('records'):
+            args = {key: record[key] for key in ('check', 'cache', 'cpu_time', 'peak_memory')
+                    if not pd.isnull(record[key])}
+            events.append({'name': record['name'], 'cat': record['kind'], 'ph': 'X',
+                           'ts': record['start'] * 1e6, 'dur': record['wall_time'] * 1e6,
+                           'pid': record['process'], 'tid': record['thread'], 'args': args})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from shift_detector.utils.lazy_import import LazyModule
+
+langdetect_exception = LazyModule('langdetect.lang_detect_exception')
+langdetect_factory = LazyModule('langdetect.detector_factory')
+
+# number of texts whose languages a LanguageIdentifier remembers
+LANGUAGE_CACHE_SIZE = 100000
+
+
+class LanguageIdentifier:
+    """
+    Identify the languages of texts with langdetect. The language profiles are loaded once per process and
+    the languages of texts are memoized, so that texts that occur several times or that several metadata types
+    ask for are identified once. The seed is passed to every detector instead of setting the global
+    DetectorFactory.seed, so the languages do not depend on the order of the texts or on other users of langdetect.
+    Use language_identifier to share the identifiers of a process.
+    :param seed: seed of the detectors of langdetect
+    :param max_length: number of characters at the start of a text that its language is identified from,
+    None to use langdetect's default of 10000 characters
+    :param cache_size: number of texts whose languages are memoized
+    """
+
+    def __init__(self, seed=0, max_length=None, cache_size=LANGUAGE_CACHE_SIZE):
+        if max_length is not None and (not isinstance(max_length, int) or max_length < 1):
+            raise ValueError("max_length should be None or an integer greater than 0. Received: {}".format(max_length))
+        self.seed = seed
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self.languages = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def load():
+        """
+        Load the language profiles of langdetect, if they are not loaded yet.
+        """
+        langdetect_factory.init_factory()
+
+    def identify(self, text):
+        """
+        :param text: a text
+        :return: ISO 639-1 code of the language of the text, or None if the text has no features
+        to identify its language from (e.g. if it only consists of digits)
+        """
+        with self.lock:
+            if text in self.languages:
+                self.languages.move_to_end(text)
+                return self.languages[text]
+
+        language = self.__detect(text)
+        with self.lock:
+            self.languages[text] = language
+            if len(self.languages) > self.cache_size:
+                self.languages.popitem(last=False)
+        return language
+
+    def identify_batch(self, texts):
+        """
+        :param texts: sequence of texts
+        :return: list of the languages of the texts, see identify
+        """
+        self.load()
+        return [self.identify(text) for text in texts]
+
+    def __detect(self, text):
+        self.load()
+        # noinspection PyProtectedMember
+        detector = langdetect_factory._factory.create()
+        detector.seed = self.seed
+        if self.max_length is not None:
+            text = text[:self.max_length]
+            detector.set_max_text_length(self.max_length)
+        detector.append(text)
+        try:
+            return detector.detect()
+        except langdetect_exception.LangDetectException:
+            return None
+
+
+@lru_cache(maxsize=None)
+def language_identifier(seed=0, max_length=None) -> LanguageIdentifier:
+    """
+    :param seed: see LanguageIdentifier
+    :param max_length: see LanguageIdentifier
+    :return: the LanguageIdentifier of this process for the parameters, which all metadata types share
+    """
+    return LanguageIdentifier(seed, max_length)
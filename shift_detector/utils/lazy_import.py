@@ -0,0 +1,17 @@
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Placeholder for a module that is imported when one of its attributes is accessed for the first time.
+    Heavy dependencies like matplotlib, scipy or nltk are bound to module level names with it,
+    so that importing a module of shift_detector only pays for the dependencies of the code that is executed.
+    :param name: full name of the module, e.g. 'matplotlib.pyplot'
+    """
+
+    def __getattr__(self, attribute):
+        return getattr(importlib.import_module(self.__name__), attribute)
+
+    def __repr__(self):
+        return "<lazy module '{}'>".format(self.__name__)
@@ -0,0 +1,47 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# number of elements of a collection whose sizes are measured to extrapolate the size of the collection
+SIZE_SAMPLE = 100
+
+
+def estimate_size(obj, depth=3) -> int:
+    """
+    Estimate the memory usage of obj in bytes, including the objects it contains.
+    Large collections are estimated from a sample of their elements.
+    :param obj: the object, e.g. a data frame, an array, a collection or a tuple of them
+    :param depth: maximum depth of nested collections that are inspected
+    :return: estimated size in bytes
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(sum(estimate_series_size(obj[column], depth) for column in obj.columns)
+                   + obj.index.memory_usage())
+    if isinstance(obj, pd.Series):
+        return estimate_series_size(obj, depth) + obj.index.memory_usage()
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return obj.nbytes + estimate_elements_size(obj.ravel(), len(obj.ravel()), depth)
+        return obj.nbytes
+    if depth > 0 and isinstance(obj, dict):
+        items = list(obj.items())[:SIZE_SAMPLE]
+        sampled = sum(estimate_size(key, depth - 1) + estimate_size(value, depth - 1) for key, value in items)
+        return sys.getsizeof(obj) + (sampled * len(obj) // len(items) if items else 0)
+    if depth > 0 and isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + estimate_elements_size(list(obj)[:SIZE_SAMPLE], len(obj), depth)
+    return sys.getsizeof(obj)
+
+
+def estimate_series_size(series: pd.Series, depth) -> int:
+    values = series.values
+    if series.dtype != object or len(values) == 0:
+        return int(series.memory_usage(index=False, deep=False))
+    return values.nbytes + estimate_elements_size(values[:SIZE_SAMPLE], len(values), depth)
+
+
+def estimate_elements_size(sample, count, depth) -> int:
+    if len(sample) == 0:
+        return 0
+    sampled = sum(estimate_size(element, depth - 1) for element in sample[:SIZE_SAMPLE])
+    return int(sampled * count / min(len(sample), SIZE_SAMPLE))
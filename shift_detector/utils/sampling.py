@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+SAMPLING_STRATEGIES = ('uniform', 'reservoir', 'stratified')
+
+# number of rows that are passed to the ReservoirSampler at once when a data frame is sampled
+RESERVOIR_CHUNK_SIZE = 100000
+
+
+def validate_sampling(rows, strategy, stratify_by=None):
+    """
+    :raises ValueError: if the sampling parameters are invalid, see sample_rows
+    """
+    if rows is not None and (not isinstance(rows, int) or rows < 1):
+        raise ValueError("sample_rows should be None or an integer greater than 0. Received: {}".format(rows))
+    if strategy not in SAMPLING_STRATEGIES:
+        raise ValueError("sampling_strategy should be one of {}. "
+                         "Received: {}".format(', '.join(SAMPLING_STRATEGIES), strategy))
+    if strategy == 'stratified' and stratify_by is None:
+        raise ValueError("stratify_by is required for stratified sampling")
+
+
+def sample_rows(df: pd.DataFrame, rows: int, strategy='uniform', seed=0, stratify_by=None) -> pd.DataFrame:
+    """
+    Draw a deterministic sample of rows. The sampled rows keep their order and their index.
+    :param df: data frame to sample
+    :param rows: number of rows to sample, data frames that are not larger are returned as they are
+    :param strategy: 'uniform' draws the rows uniformly without replacement,
+    'reservoir' passes over the rows chunk by chunk (see ReservoirSampler) and
+    'stratified' draws from the rows of every value of the column stratify_by in proportion to its frequency
+    :param seed: seed of the random number generator
+    :param stratify_by: column to stratify by
+    :return: the sampled data frame
+    """
+    validate_sampling(rows, strategy, stratify_by)
+    if len(df) <= rows:
+        return df
+
+    if strategy == 'reservoir':
+        sampler = ReservoirSampler(rows, seed)
+        for start in range(0, len(df), RESERVOIR_CHUNK_SIZE):
+            sampler.update(df.iloc[start:start + RESERVOIR_CHUNK_SIZE])
+        return sampler.sample()
+
+    random = np.random.RandomState(seed)
+    if strategy == 'uniform':
+        positions = random.choice(len(df), rows, replace=False)
+    else:
+        if stratify_by not in df.columns:
+            raise ValueError("stratify_by should be a column of the data. Received: {}".format(stratify_by))
+        strata = list(df.groupby(df[stratify_by], dropna=False, sort=False).indices.values())
+        quotas = stratum_quotas(np.array([len(stratum) for stratum in strata]), rows)
+        positions = np.concatenate([random.choice(stratum, quota, replace=False)
+                                    for stratum, quota in zip(strata, quotas)])
+    return df.iloc[np.sort(positions)]
+
+
+def stratum_quotas(sizes, rows):
+    """
+    Allocate rows to strata in proportion to their sizes with the largest remainder method.
+    :param sizes: array with the number of rows of every stratum
+    :param rows: total number of rows to allocate
+    :return: array with the number of rows of every stratum, which sums up to rows
+    """
+    exact = sizes * rows / sizes.sum()
+    quotas = np.floor(exact).astype(int)
+    remainders = np.argsort(-(exact - quotas), kind='stable')
+    quotas[remainders[:rows - quotas.sum()]] += 1
+    return quotas
+
+
+class ReservoirSampler:
+    """
+    Uniform sample of a fixed number of rows of data that is passed chunk by chunk (reservoir sampling),
+    so that data that does not fit into memory is sampled in a single pass.
+    :param rows: number of rows to sample
+    :param seed: seed of the random number generator
+    """
+
+    def __init__(self, rows, seed=0):
+        self.rows = rows
+        self.random = np.random.RandomState(seed)
+        self.count = 0
+        self.reservoir = None
+        # positions of the rows of the reservoir in the passed data
+        self.positions = np.empty(0, dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        :param chunk: the next rows of the data
+        """
+        free = max(self.rows - len(self.positions), 0)
+        filling, rest = chunk.iloc[:free], chunk.iloc[free:]
+        reservoir = filling if self.reservoir is None else pd.concat([self.reservoir, filling])
+        positions = np.concatenate([self.positions, self.count + np.arange(len(filling))])
+
+        if len(rest) > 0:
+            rest_positions = self.count + len(filling) + np.arange(len(rest))
+            # every row replaces a random slot with probability rows / (position + 1)
+            slots = (self.random.random_sample(len(rest)) * (rest_positions + 1)).astype(np.int64)
+            accepted = np.flatnonzero(slots < self.rows)
+            # of several rows for the same slot, the last one remains
+            _, last = np.unique(slots[accepted][::-1], return_index=True)
+            accepted = accepted[len(accepted) - 1 - last]
+            kept = np.setdiff1d(np.arange(len(positions)), slots[accepted])
+            reservoir = pd.concat([reservoir.iloc[kept], rest.iloc[accepted]])
+            positions = np.concatenate([positions[kept], rest_positions[accepted]])
+
+        self.reservoir = reservoir
+        self.positions = positions
+        self.count += len(chunk)
+
+    def sample(self) -> pd.DataFrame:
+        """
+        :return: the sampled rows in the order of the data
+        """
+        if self.reservoir is None:
+            return pd.DataFrame()
+        return self.reservoir.iloc[np.argsort(self.positions, kind='stable')]
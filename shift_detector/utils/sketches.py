@@ -0,0 +1,130 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable sketch of a distribution of numbers that answers rank and quantile queries approximately
+    in bounded memory. The sketch uses a hierarchy of compactors as in the KLL sketch (Karnin, Lang and Liberty,
+    "Optimal Quantile Approximation in Streams", 2016), but alternates the compaction offsets
+    deterministically, so that equal inputs always lead to equal sketches.
+    Missing values (NaN) are ignored.
+    :param k: accuracy parameter, the sketch retains at most about 3 * k numbers
+    """
+
+    def __init__(self, k=1000):
+        if not isinstance(k, int) or k < 2:
+            raise ValueError("k should be an integer greater than 1. Received: {}".format(k))
+        self.k = k
+        self.compactors = [np.empty(0)]
+        self.compactions = [0]
+        self.count = 0
+        self.min = float('nan')
+        self.max = float('nan')
+        # upper bound of the absolute rank error introduced by all compactions so far
+        self.max_rank_error = 0
+
+    def __len__(self):
+        return self.count
+
+    def capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        """
+        Add values to the sketch.
+        :param values: array-like of numbers
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.__compress()
+
+    def merge(self, other):
+        """
+        Add all values summarized by other to this sketch.
+        :param other: QuantileSketch with the same k
+        :return: this sketch
+        """
+        if not isinstance(other, QuantileSketch) or other.k != self.k:
+            raise ValueError("Only QuantileSketches with the same k can be merged.")
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+            self.compactions.append(0)
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+            self.compactions[level] += other.compactions[level]
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self.max_rank_error += other.max_rank_error
+        self.__compress()
+        return self
+
+    def __compress(self):
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                    self.compactions.append(0)
+                items = np.sort(items)
+                # an odd number of items leaves the largest one on this level
+                even = len(items) - len(items) % 2
+                offset = self.compactions[level] % 2
+                self.compactions[level] += 1
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], items[offset:even:2]])
+                self.compactors[level] = items[even:]
+                self.max_rank_error += 2 ** level
+            level += 1
+
+    def weighted_items(self):
+        """
+        :return: the retained numbers in ascending order and their weights
+        """
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(compactor), 2 ** level, dtype=np.int64)
+                                  for level, compactor in enumerate(self.compactors)])
+        order = np.argsort(items, kind='mergesort')
+        return items[order], weights[order]
+
+    def cdf(self, points):
+        """
+        Approximate the ratio of values that are smaller or equal to each point.
+        :param points: array-like of numbers
+        :return: array of ratios
+        """
+        points = np.asarray(points, dtype=float)
+        if self.count == 0:
+            return np.full(points.shape, float('nan'))
+        ranks = np.zeros(points.shape, dtype=np.int64)
+        for level, compactor in enumerate(self.compactors):
+            ranks += np.searchsorted(np.sort(compactor), points, side='right') * 2 ** level
+        return ranks / self.count
+
+    def quantile(self, q):
+        """
+        Approximate the q-quantile of the values.
+        :param q: number or array-like of numbers between 0 and 1
+        :return: the quantile(s)
+        """
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, float('nan'))[()]
+        items, weights = self.weighted_items()
+        positions = np.searchsorted(np.cumsum(weights), q * self.count, side='left')
+        return items[np.clip(positions, 0, len(items) - 1)][()]
+
+    def rank_error(self):
+        """
+        :return: upper bound of the error of cdf
+        """
+        if self.count == 0:
+            return 0.0
+        return self.max_rank_error / self.count
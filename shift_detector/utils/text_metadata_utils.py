@@ -1,4 +1,19 @@
-from collections import OrderedDict
+import string
+import unicodedata
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+import numpy as np
+import regex
+
+from shift_detector.utils.lazy_import import LazyModule
+from shift_detector.utils.ucb_list import BMP_SIZE
+
+# noinspection PyPackageRequirements
+iso639 = LazyModule('iso639')
+nltk_corpus = LazyModule('nltk.corpus')
+# noinspection PyPackageRequirements
+spellchecker = LazyModule('spellchecker')
 
 delimiters = OrderedDict()
 delimiters['HTML'] = r'<\s*br\s*/?\s*>|<\s*p\s*>'
@@ -10,6 +25,136 @@ delimiters['comma'] = r'\s*,\s'
 delimiters['dash'] = r'\s*\p{Pd}+\s'
 delimiters['tab'] = r'\t'
 delimiters['whitespace'] = r'\s'
+# compiled patterns of the delimiters, in the order in which they are searched for
+delimiter_patterns = OrderedDict((key, regex.compile(value)) for key, value in delimiters.items())
+NO_DELIMITER = 'no delimiter'
+
+
+def delimiter_type(text):
+    """
+    :param text: a text
+    :return: the first of the delimiters that occurs in the text or NO_DELIMITER
+    """
+    for key, pattern in delimiter_patterns.items():
+        if pattern.search(text):
+            return key
+    return NO_DELIMITER
+
+
+def split_by_delimiter(text, delimiter):
+    """
+    :param text: a text
+    :param delimiter: its delimiter type, see delimiter_type
+    :return: list of the parts of the text between the occurrences of the delimiter,
+    or an empty list if the text has no delimiter
+    """
+    if delimiter not in delimiter_patterns:
+        return []
+    return delimiter_patterns[delimiter].split(text)
+
+# general categories of unicodedata.category
+UNICODE_CATEGORIES = ['Lu', 'Ll', 'Lt', 'Lm', 'Lo', 'Mn', 'Mc', 'Me', 'Nd', 'Nl', 'No', 'Pc', 'Pd', 'Ps', 'Pe', 'Pi',
+                      'Pf', 'Po', 'Sm', 'Sc', 'Sk', 'So', 'Zs', 'Zl', 'Zp', 'Cc', 'Cf', 'Cs', 'Co', 'Cn']
+
+
+def codepoints(text) -> np.ndarray:
+    """
+    :param text: a text, which may contain surrogates
+    :return: array of the code points of the characters of the text
+    """
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+
+@lru_cache(maxsize=None)
+def bmp_category_ids() -> np.ndarray:
+    """
+    :return: table of the positions of the categories of the code points of the Basic Multilingual Plane in
+    UNICODE_CATEGORIES, computed once per process
+    """
+    ids = {category: i for i, category in enumerate(UNICODE_CATEGORIES)}
+    return np.array([ids[unicodedata.category(chr(codepoint))] for codepoint in range(BMP_SIZE)], dtype=np.int8)
+
+
+def category_ids(codepoints: np.ndarray) -> np.ndarray:
+    """
+    :param codepoints: array of code points
+    :return: array of the positions of their categories in UNICODE_CATEGORIES
+    """
+    table = bmp_category_ids()
+    if len(codepoints) == 0 or codepoints.max() < BMP_SIZE:
+        return table[codepoints]
+    ids = {category: i for i, category in enumerate(UNICODE_CATEGORIES)}
+    return np.array([table[codepoint] if codepoint < BMP_SIZE else ids[unicodedata.category(chr(codepoint))]
+                     for codepoint in codepoints], dtype=np.int8)
+
+
+# bits of letter_flags
+ALPHA_FLAG = 1
+UPPER_FLAG = 2
+
+
+def character_flags(character) -> int:
+    """
+    :param character: a single character
+    :return: its letter flags, see letter_flags
+    """
+    return (ALPHA_FLAG if character.isalpha() else 0) | (UPPER_FLAG if character.isupper() else 0)
+
+
+@lru_cache(maxsize=None)
+def bmp_letter_flags() -> np.ndarray:
+    """
+    :return: table of the letter flags (see letter_flags) of the code points of the Basic Multilingual Plane,
+    computed once per process
+    """
+    return np.array([character_flags(chr(codepoint)) for codepoint in range(BMP_SIZE)], dtype=np.uint8)
+
+
+def letter_flags(codepoints: np.ndarray) -> np.ndarray:
+    """
+    :param codepoints: array of code points
+    :return: array with ALPHA_FLAG set for the letters (str.isalpha) and UPPER_FLAG set for
+    the uppercase characters (str.isupper)
+    """
+    table = bmp_letter_flags()
+    if len(codepoints) == 0 or codepoints.max() < BMP_SIZE:
+        return table[codepoints]
+    return np.array([table[codepoint] if codepoint < BMP_SIZE else character_flags(chr(codepoint))
+                     for codepoint in codepoints], dtype=np.uint8)
+
+
+def segment_sums(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    :param values: array of the concatenated values of several segments
+    :param lengths: array of the lengths of the segments
+    :return: array of the sums of the values of every segment, 0 for empty segments
+    """
+    sums = np.zeros(len(lengths), dtype=np.int64)
+    non_empty = lengths > 0
+    if non_empty.any():
+        # the values of the empty segments in between are empty, so every non-empty segment ends at the next one
+        starts = np.cumsum(lengths) - lengths
+        sums[non_empty] = np.add.reduceat(values, starts[non_empty], dtype=np.int64)
+    return sums
+
+
+def id_histogram(ids: np.ndarray, names) -> dict:
+    """
+    :param ids: array of positions in names
+    :param names: list of names
+    :return: dictionary that maps the names that occur to their number of occurrences
+    """
+    return count_histogram(np.bincount(ids, minlength=len(names)), names)
+
+
+def count_histogram(counts: np.ndarray, names) -> dict:
+    """
+    :param counts: array with the number of occurrences of every name
+    :param names: list of names
+    :return: dictionary that maps the names that occur to their number of occurrences
+    """
+    occurring = np.flatnonzero(counts)
+    return dict(zip([names[i] for i in occurring.tolist()], counts[occurring].tolist()))
 
 
 def most_common_n_to_string_frequency(histogram, n):
@@ -29,3 +174,85 @@ def most_common_n_to_string_alphabetically(histogram, n):
     only_keys = [item[0] for item in most_common_n]
     sorted_keys = sorted(only_keys)
     return ', '.join(sorted_keys)
+
+
+# words of the dictionary of pyspellchecker for a language and the length of its longest word
+SpellingDictionary = namedtuple('SpellingDictionary', ['words', 'longest_word_length'])
+
+
+def spelling_dictionary(language):
+    """
+    Load the dictionary of pyspellchecker for a language once per process.
+    The dictionaries are shared by all rows, columns and metadata types, worker processes can load them
+    in advance (see GenericTextMetadata.load_resources).
+    :param language: ISO 639-1 code of the language, or NaN if the language of a text is unknown
+    :return: the SpellingDictionary or None if the language is unknown or pyspellchecker does not support it
+    """
+    if not isinstance(language, str):
+        return None
+    return load_spelling_dictionary(language)
+
+
+@lru_cache(maxsize=None)
+def load_spelling_dictionary(language):
+    """
+    :param language: ISO 639-1 code of the language
+    :return: the cached SpellingDictionary of the language, see spelling_dictionary
+    """
+    try:
+        frequencies = spellchecker.SpellChecker(language).word_frequency
+    except ValueError:
+        return None
+    return SpellingDictionary(frozenset(frequencies.dictionary), frequencies.longest_word_length)
+
+
+def unknown_words(words, dictionary):
+    """
+    Find the words that are not in a dictionary, like SpellChecker.unknown of pyspellchecker does:
+    single punctuation characters, numbers and words that are much longer than all words of the dictionary
+    are not checked.
+    :param words: list of words
+    :param dictionary: the SpellingDictionary
+    :return: set of the lower case unknown words
+    """
+    unknown = set()
+    for word in words:
+        if (len(word) == 1 and word in string.punctuation) or len(word) > dictionary.longest_word_length + 3:
+            continue
+        if word.lower() not in ('nan', 'inf', 'infinity'):
+            try:
+                float(word)
+                continue
+            except ValueError:
+                pass
+        word = word.lower()
+        if word not in dictionary.words:
+            unknown.add(word)
+    return unknown
+
+
+def stopwords(language):
+    """
+    Load the stopwords of nltk for a language once per process, see spelling_dictionary.
+    :param language: ISO 639-1 code of the language, or NaN if the language of a text is unknown
+    :return: frozenset of the lower case stopwords or None if the language is unknown or nltk has no stopwords for it
+    """
+    if not isinstance(language, str):
+        return None
+    return load_stopwords(language)
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(language):
+    """
+    :param language: ISO 639-1 code of the language
+    :return: the cached stopwords of the language, see stopwords
+    """
+    try:
+        language_name = iso639.languages.get(part1=language).name.lower()
+    except KeyError:
+        return None
+    try:
+        return frozenset(nltk_corpus.stopwords.words(language_name))
+    except OSError:
+        return None
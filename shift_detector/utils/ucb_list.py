@@ -1,15 +1,33 @@
 # from https://stackoverflow.com/questions/243831/unicode-block-of-a-character-in-python
+import numpy as np
+
+# code points of the Basic Multilingual Plane, whose blocks are looked up in a table
+BMP_SIZE = 0x10000
 
 
 def block(character):
     """ Return the Unicode block name for character, or None if character has no block.
     from https://stackoverflow.com/questions/243831/unicode-block-of-a-character-in-python
     :param character"""
-    assert isinstance(character, str) and len(character) == 1, repr(character)
-    cp = ord(character)
-    for start, end, name in blocks:
-        if start <= cp <= end:
-            return name
+    return block_names[block_ids(np.array([ord(character)]))[0]]
+
+
+def block_ids(codepoints: np.ndarray) -> np.ndarray:
+    """
+    Look up the blocks of code points, in a table for the Basic Multilingual Plane and
+    with a binary search over the starts of the blocks otherwise.
+    :param codepoints: array of code points
+    :return: array of the positions of the blocks in blocks, or len(blocks) for code points without block
+    """
+    if len(codepoints) == 0 or codepoints.max() < BMP_SIZE:
+        return bmp_block_ids[codepoints]
+    return search_block_ids(codepoints)
+
+
+def search_block_ids(codepoints):
+    ids = np.searchsorted(block_starts, codepoints, side='right') - 1
+    ids[(ids < 0) | (codepoints > block_ends[ids])] = len(blocks)
+    return ids
 
 
 blocks = [(0, 127, 'Basic Latin'),
@@ -313,3 +331,9 @@ blocks = [(0, 127, 'Basic Latin'),
           (917760, 917999, 'Variation Selectors Supplement'),
           (983040, 1048575, 'Supplementary Private Use Area-A'),
           (1048576, 1114111, 'Supplementary Private Use Area-B')]
+
+block_starts = np.array([start for start, _, _ in blocks])
+block_ends = np.array([end for _, end, _ in blocks])
+# names of the blocks by their ids, see block_ids
+block_names = [name for _, _, name in blocks] + [None]
+bmp_block_ids = search_block_ids(np.arange(BMP_SIZE)).astype(np.int16)
@@ -57,7 +57,9 @@ def calculate_value_ratios(columns, top_k):
     value_counts1.index = [str(ix) for ix in value_counts1.index]
     value_counts2 = columns[1].value_counts().sort_values(ascending=False)
     value_counts2.index = [str(ix) for ix in value_counts2.index]
-    indices = set(value_counts1.head(top_k).index).union(set(value_counts2.head(top_k).index))
+    # categorical columns also count the categories that only occur in the other column
+    indices = set(value_counts1[value_counts1 > 0].head(top_k).index).union(
+        set(value_counts2[value_counts2 > 0].head(top_k).index))
     value_counts = pd.concat([value_counts1[indices], value_counts2[indices]], axis=1).sort_index().fillna(0.0)
     return value_counts.fillna(0).apply(axis='columns',
                                         func=lambda row: pd.Series([row.iloc[0] / len(columns[0]),
@@ -1,6 +1,7 @@
 import unittest
 from unittest import mock
 
+import numpy as np
 import pandas as pd
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
@@ -9,7 +10,7 @@ from pandas.util.testing import assert_frame_equal
 
 from shift_detector.detector import Detector
 from shift_detector.checks.statistical_checks.categorical_statistical_check import chi2_test, \
-    CategoricalStatisticalCheck
+    CategoricalStatisticalCheck, chi2_tests, category_counts
 from shift_detector.precalculations.store import Store
 
 
@@ -35,6 +36,31 @@ class TestCategoricalStatisticalCheck(unittest.TestCase):
         p = chi2_test(part1, part2)
         self.assertAlmostEqual(0.17471089, p)
 
+    def test_chi2_tests(self):
+        random = np.random.RandomState(0)
+        categories = pd.CategoricalDtype(['a', 'b', 'c', 'unused'])
+        df1 = pd.DataFrame({'three': random.choice(['a', 'b', 'c'], 100),
+                            'two': random.choice(['a', 'b'], 100),
+                            'constant': ['a'] * 100,
+                            'numbers': random.choice([1.0, 2.0, np.nan], 100),
+                            'categorical': pd.Series(random.choice(['a', 'b'], 100), dtype=categories)})
+        df2 = pd.DataFrame({'three': random.choice(['a', 'b', 'c', 'd'], 80),
+                            'two': random.choice(['a', 'b'], 80, p=[.8, .2]),
+                            'constant': ['a'] * 80,
+                            'numbers': random.choice([1.0, 3.0], 80),
+                            'categorical': pd.Series(random.choice(['b', 'c'], 80), dtype=categories)})
+        expected = [chi2_test(df1[column], df2[column]) for column in df1.columns]
+        np.testing.assert_allclose(expected, chi2_tests(df1, df2, df1.columns), rtol=1e-9)
+        self.assertEqual(1.0, chi2_tests(df1, df2, ['constant'])[0])
+        self.assertListEqual([], chi2_tests(df1, df2, []))
+
+    def test_category_counts(self):
+        column1 = pd.Series(['a', 'b', 'a', None], dtype=pd.CategoricalDtype(['a', 'b', 'c', 'unused']))
+        column2 = pd.Series(['c', 'a'], dtype=column1.dtype)
+        counts1, counts2 = category_counts(column1, column2)
+        self.assertListEqual([2, 1, 0], list(counts1))
+        self.assertListEqual([1, 0, 1], list(counts2))
+
     def test_not_significant(self):
         store = Store(self.df1_not_sig, self.df2_not_sig)
         result = CategoricalStatisticalCheck().run(store)
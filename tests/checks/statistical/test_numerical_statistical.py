@@ -10,7 +10,7 @@ from pandas.util.testing import assert_frame_equal
 
 from shift_detector.checks.statistical_checks import numerical_statistical_check
 from shift_detector.checks.statistical_checks.numerical_statistical_check import kolmogorov_smirnov_test, \
-    NumericalStatisticalCheck
+    NumericalStatisticalCheck, kolmogorov_smirnov_tests
 from shift_detector.detector import Detector
 from shift_detector.precalculations.store import Store
 
@@ -84,6 +84,48 @@ class TestCategoricalStatisticalCheck(unittest.TestCase):
         p = kolmogorov_smirnov_test(part1, part2)
         self.assertAlmostEqual(0.043055, p, places=2)  # this should be equal in 5 places, but travis fails otherwise
 
+    def test_kolmogorov_smirnov_tests(self):
+        random = np.random.RandomState(0)
+        for rows1, rows2 in [(len(self.kolmogorov_smirnov_1), len(self.kolmogorov_smirnov_2)), (12000, 11000)]:
+            df1 = pd.DataFrame(random.randint(0, 30, (rows1, 5)).astype(float))
+            df2 = pd.DataFrame(random.normal(15, 8, (rows2, 5)).round())
+            df1[0] = (self.kolmogorov_smirnov_1 * rows1)[:rows1]
+            df2[0] = (self.kolmogorov_smirnov_2 * rows2)[:rows2]
+            df1.iloc[3, 1] = np.nan
+            expected = [kolmogorov_smirnov_test(df1[column], df2[column]) for column in df1.columns]
+            for workers in [1, 2]:
+                with self.subTest(rows=(rows1, rows2), workers=workers):
+                    pvalues = kolmogorov_smirnov_tests(df1, df2, df1.columns, workers=workers)
+                    np.testing.assert_array_equal(expected, pvalues)
+                    self.assertTrue(np.isnan(pvalues[1]))
+
+    def test_workers(self):
+        self.assertRaises(ValueError, NumericalStatisticalCheck, workers=0)
+        df1 = pd.DataFrame({'a': self.significant_1, 'b': (self.not_significant_1 * 10)[:len(self.significant_1)]})
+        df2 = pd.DataFrame({'a': self.significant_2, 'b': (self.not_significant_2 * 10)[:len(self.significant_2)]})
+        reports = [NumericalStatisticalCheck(workers=workers).run(Store(df1, df2)) for workers in [1, 3]]
+        assert_frame_equal(reports[0].information['test_results'], reports[1].information['test_results'])
+        self.assertIn('a', reports[1].shifted_columns)
+
+    def test_sketches(self):
+        random = np.random.RandomState(0)
+        df1 = pd.DataFrame({'same': random.normal(size=20000), 'shifted': random.normal(size=20000)})
+        df2 = pd.DataFrame({'same': random.normal(size=15000), 'shifted': random.normal(0.1, size=15000)})
+        store = Store(df1, df2)
+        exact = NumericalStatisticalCheck().run(store)
+        approximate = NumericalStatisticalCheck(sketch_k=200).run(store)
+        self.assertListEqual(exact.shifted_columns, approximate.shifted_columns)
+        self.assertListEqual(['shifted'], approximate.shifted_columns)
+
+        errors = approximate.information['statistic_errors']
+        sketches1, sketches2 = store[NumericalStatisticalCheck(sketch_k=200).needed_precalculations(store)[0]]
+        for column in df1.columns:
+            statistic, max_error = numerical_statistical_check.kolmogorov_smirnov_sketch_statistic(
+                sketches1[column], sketches2[column])
+            exact_statistic = numerical_statistical_check.stats.ks_2samp(df1[column], df2[column]).statistic
+            self.assertLessEqual(abs(statistic - exact_statistic), max_error)
+            self.assertEqual(max_error, errors.loc['max_error', column])
+
     def test_not_significant(self):
         df1 = pd.DataFrame(self.not_significant_1)
         df2 = pd.DataFrame(self.not_significant_2)
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+import unittest
+
+from shift_detector.precalculations.precalculation_cache import PrecalculationCache
+
+
+class TestPrecalculationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = PrecalculationCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        self.cache.save('key', {'result': [1, 2, 3]})
+        self.assertIn('key', self.cache)
+        self.assertEqual(self.cache.load('key'), {'result': [1, 2, 3]})
+        self.assertRaises(KeyError, self.cache.load, 'missing')
+
+    def test_unpicklable_and_corrupt_results(self):
+        self.cache.save('lambda', lambda x: x)
+        self.assertNotIn('lambda', self.cache)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+        with open(self.cache.path('corrupt'), 'wb') as file:
+            file.write(b'no pickle')
+        self.assertRaises(KeyError, self.cache.load, 'corrupt')
+        self.assertNotIn('corrupt', self.cache)
+
+    def test_invalidate_and_clear(self):
+        self.cache.save('first', 1)
+        self.cache.save('second', 2)
+        self.cache.invalidate('first')
+        self.assertNotIn('first', self.cache)
+        self.assertIn('second', self.cache)
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_least_recently_used_results_are_evicted(self):
+        self.cache.save('old', 'x' * 1000)
+        self.cache.save('new', 'x' * 1000)
+        past = time.time() - 100
+        os.utime(self.cache.path('old'), (past, past))
+        os.utime(self.cache.path('new'), (past + 1, past + 1))
+        self.cache.load('old')
+
+        self.cache.max_size = 2500
+        self.cache.save('newest', 'x' * 1000)
+        self.assertIn('old', self.cache)
+        self.assertNotIn('new', self.cache)
+        self.assertIn('newest', self.cache)
+        self.assertLessEqual(self.cache.size(), 2500)
+
+    def test_invalid_max_size(self):
+        self.assertRaises(ValueError, PrecalculationCache, self.directory.name, max_size=-1)
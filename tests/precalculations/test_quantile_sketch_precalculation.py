@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.precalculations.precalculation import DatasetwiseResult
+from shift_detector.precalculations.quantile_sketch_precalculation import QuantileSketchPrecalculation, \
+    sketch_columns
+from shift_detector.precalculations.reference_profile import ReferenceProfile
+from shift_detector.precalculations.store import Store
+
+
+class TestQuantileSketchPrecalculation(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.df1 = pd.DataFrame({'number': random.normal(size=5000), 'text': ['a', 'b'] * 2500})
+        self.df2 = pd.DataFrame({'number': random.normal(0.5, size=3000), 'text': ['b', 'c'] * 1500})
+
+    def test_equal(self):
+        self.assertEqual(QuantileSketchPrecalculation(100), QuantileSketchPrecalculation(100))
+        self.assertNotEqual(QuantileSketchPrecalculation(100), QuantileSketchPrecalculation(200))
+        self.assertEqual(hash(QuantileSketchPrecalculation(100)), hash(QuantileSketchPrecalculation(100)))
+        self.assertRaises(ValueError, QuantileSketchPrecalculation, 1)
+
+    def test_process(self):
+        store = Store(self.df1, self.df2)
+        sketches1, sketches2 = store[QuantileSketchPrecalculation(100)]
+        self.assertListEqual(['number'], list(sketches1))
+        self.assertEqual(5000, sketches1['number'].count)
+        self.assertEqual(3000, sketches2['number'].count)
+        self.assertAlmostEqual(0.5, float(sketches2['number'].quantile(0.5)), delta=0.1)
+
+    def test_chunks_can_be_merged(self):
+        whole = sketch_columns(self.df1, ['number'], k=100)['number']
+        merged = sketch_columns(self.df1.head(2000), ['number'], k=100)['number']
+        merged.merge(sketch_columns(self.df1.tail(3000), ['number'], k=100)['number'])
+        self.assertEqual(whole.count, merged.count)
+        points = np.linspace(-2, 2, 9)
+        exact = np.searchsorted(np.sort(self.df1['number']), points, side='right') / len(self.df1)
+        self.assertLessEqual(np.max(np.abs(merged.cdf(points) - exact)), merged.rank_error())
+
+    def test_profile(self):
+        precalculation = QuantileSketchPrecalculation(100)
+        profile = ReferenceProfile.from_data(self.df1, precalculation)
+        self.assertIn(DatasetwiseResult(precalculation, 0), profile.preprocessings)
+        store = Store.from_profile(profile, self.df2)
+        sketches1, _ = store[precalculation]
+        self.assertIs(profile.preprocessings[DatasetwiseResult(precalculation, 0)], sketches1)
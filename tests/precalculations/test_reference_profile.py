@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from shift_detector.precalculations.n_gram import NGram, NGramType
+from shift_detector.precalculations.precalculation import DatasetwiseResult
+from shift_detector.precalculations.reference_profile import ReferenceProfile
+from shift_detector.precalculations.store import Store
+from shift_detector.precalculations.text_metadata import TextMetadata, NumCharsMetadata, NumWordsMetadata
+from shift_detector.utils.column_management import ColumnType, column_statistics
+
+
+class TestReferenceProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.df1 = pd.DataFrame({'text': ['This is a text.', 'Another short text', 'Three words here'] * 20,
+                                 'number': list(range(60))})
+        self.df2 = pd.DataFrame({'text': ['Different texts', 'in the second data frame', 'Short'] * 25,
+                                 'number': list(range(75))})
+        self.precalculations = [TextMetadata([NumCharsMetadata(), NumWordsMetadata()]),
+                                NGram(3, NGramType.character)]
+        self.column_types = {'text': ColumnType.text}
+        self.profile = ReferenceProfile.from_data(self.df1, *self.precalculations,
+                                                  custom_column_types=self.column_types)
+
+    def test_profile_contains_reference_results(self):
+        self.assertEqual(self.profile.column_types(), {'text': ColumnType.text, 'number': ColumnType.numerical})
+        self.assertIn(DatasetwiseResult(self.precalculations[0], 0), self.profile.preprocessings)
+        self.assertIn(DatasetwiseResult(NumCharsMetadata(), 0), self.profile.preprocessings)
+        self.assertFalse(any(result.index == 1 for result in self.profile.preprocessings))
+
+    def test_store_from_profile_equals_store(self):
+        expected = Store(self.df1, self.df2, custom_column_types=self.column_types)
+        actual = Store.from_profile(self.profile, self.df2)
+        self.assertEqual(expected.type_to_columns, actual.type_to_columns)
+        for precalculation in self.precalculations:
+            for expected_result, actual_result in zip(expected[precalculation], actual[precalculation]):
+                assert_frame_equal(expected_result, actual_result, check_dtype=False)
+
+    def test_reference_side_is_not_executed_again(self):
+        store = Store.from_profile(self.profile, self.df2)
+        with patch.object(NumCharsMetadata, 'metadata_function', return_value=0) as metadata_function:
+            store[self.precalculations[0]]
+        # every distinct text of df2 is analyzed once
+        self.assertEqual(metadata_function.call_count, self.df2['text'].nunique())
+
+    def test_reference_statistics_and_encodings_are_reused(self):
+        expected = Store(self.df1, self.df2, custom_column_types=self.column_types)
+        with patch('shift_detector.precalculations.store.column_statistics', wraps=column_statistics) as statistics, \
+                patch('shift_detector.precalculations.store.encode_columns') as encode:
+            actual = Store.from_profile(self.profile, self.df2)
+        self.assertEqual(1, statistics.call_count)
+        encode.assert_not_called()
+        self.assertEqual(expected.column_statistics, actual.column_statistics)
+        self.assertEqual(expected.text_encoding('text')[2].tolist(), actual.text_encoding('text')[2].tolist())
+        for expected_codes, actual_codes in zip(expected.text_encoding('text')[:2], actual.text_encoding('text')[:2]):
+            self.assertListEqual(list(expected_codes), list(actual_codes))
+        assert_frame_equal(expected.df2, actual.df2)
+
+    def test_from_store(self):
+        store = Store(self.df1, self.df2, custom_column_types=self.column_types)
+        store[NGram(2, NGramType.word)]
+        profile = ReferenceProfile.from_store(store)
+        self.assertEqual([NGram(2, NGramType.word)], profile.precalculations())
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.pickle')
+            self.profile.save(path)
+            loaded = ReferenceProfile.load(path)
+        self.assertEqual(set(self.profile.precalculations()), set(loaded.precalculations()))
+        assert_frame_equal(self.profile.df, loaded.df)
+
+    def test_invalid_arguments(self):
+        store = Store(self.df1, self.df2, custom_column_types=self.column_types)
+        self.assertRaises(TypeError, ReferenceProfile.from_data, self.df1, store)
+        self.assertRaises(ValueError, Store.from_profile, self.profile, self.df2[['text']])
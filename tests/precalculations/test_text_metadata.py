@@ -1,11 +1,15 @@
 import unittest
+from unittest import mock
 
 from pandas.util.testing import assert_frame_equal
 import math
+import regex
 
 import shift_detector.utils.text_metadata_utils as TmUtils
 
+from shift_detector.precalculations.precalculation import DatasetwiseResult
 from shift_detector.precalculations.store import Store
+from shift_detector.precalculations.text_precalculation import TokenizeIntoLowerWordsPrecalculation
 from shift_detector.precalculations.text_metadata import *
 
 import tests.test_data as td
@@ -132,6 +136,72 @@ class TestTextMetadataPrecalculations(unittest.TestCase):
         assert_frame_equal(solution1, md1.iloc[:2, :])
         assert_frame_equal(solution2, md2.iloc[:2, :])
 
+    def test_language_metadata_of_data_frames_with_different_lengths(self):
+        df1 = pd.DataFrame({'text': ['This is a sentence.', 'Dies ist ein Satz.', 'Ceci est une phrase.'] * 7})
+        df2 = pd.DataFrame({'text': ['Another english sentence.', 'Ein anderer Satz.'] * 15})
+        store = Store(df1, df2, custom_column_types={'text': ColumnType.text})
+        metadata_type = UnknownWordRatioMetadata(infer_language=True)
+        with mock.patch.object(UnknownWordRatioMetadata, 'metadata_batch',
+                               side_effect=metadata_type.metadata_batch) as metadata_batch:
+            md1, md2 = metadata_type.process(store)
+        self.assertEqual(2, metadata_batch.call_count)
+
+        for df, md in [(df1, md1), (df2, md2)]:
+            expected = [metadata_type.metadata_function(LanguageMetadata().metadata_function(text),
+                                                        TokenizeIntoLowerWordsPrecalculation.tokenize_into_words(text))
+                        for text in df['text']]
+            self.assertListEqual(expected, list(md['text']))
+
+    def test_language_metadata_of_texts_without_language(self):
+        df = pd.DataFrame({'text': ['This is a sentence.', '12345', 'Dies ist ein Satz.', '12345'] * 5})
+        store = Store(df, df.copy(), custom_column_types={'text': ColumnType.text})
+        md1, _ = TextMetadata([UnknownWordRatioMetadata()], infer_language=True).process(store)
+        self.assertTrue(md1[('text', 'unknown_word_ratio')][1::2].isna().all())
+        self.assertEqual(0.0, md1[('text', 'unknown_word_ratio')][0])
+
+        words = TokenizeIntoLowerWordsPrecalculation.tokenize_into_words('12345')
+        for metadata_type in [UnknownWordRatioMetadata(), StopwordRatioMetadata()]:
+            with self.subTest(metadata_type.metadata_name()):
+                self.assertTrue(math.isnan(metadata_type.metadata_function(float('nan'), words)))
+                self.assertTrue(math.isnan(metadata_type.metadata_function('zz', words)))
+
+    def test_pos_tags_in_batches(self):
+        # a tagger that tags capitalized words as nouns and all other words as verbs
+        def tag_sents(sentences):
+            return [[(word, 'NNP' if word.istitle() else 'VBZ') for word in sentence] for sentence in sentences]
+
+        df1 = pd.DataFrame({'text': ['Anna sings', 'Bob and Carl', 'x y z', 'Anna sings', 'Dora'] * 4})
+        store = Store(df1, df1, custom_column_types={'text': ColumnType.text})
+        tagger = mock.Mock()
+        tagger.tag_sents.side_effect = tag_sents
+        with mock.patch('nltk.word_tokenize', side_effect=str.split), \
+                mock.patch('shift_detector.precalculations.text_metadata.pos_tagger', return_value=tagger), \
+                mock.patch('shift_detector.precalculations.text_metadata.universal_tag_ids',
+                           return_value={'NNP': UNIVERSAL_TAGS.index('NOUN'), 'VBZ': UNIVERSAL_TAGS.index('VERB')}):
+            counts = PartOfSpeechMetadata.tag_counts(['Anna sings', 'x y z'])
+            md1, md2 = PartOfSpeechMetadata(chunk_size=2).process(store)
+            german = PartOfSpeechMetadata(language='de').process_dataset(store, 0)
+
+        self.assertListEqual([[1, 1], [0, 3]], counts[:, [UNIVERSAL_TAGS.index('NOUN'),
+                                                           UNIVERSAL_TAGS.index('VERB')]].tolist())
+        self.assertEqual(2, counts.sum(axis=1)[0])
+        solution = pd.DataFrame({'text': ['NOUN, VERB', 'NOUN, VERB', 'VERB', 'NOUN, VERB', 'NOUN'] * 4})
+        assert_frame_equal(solution, md1)
+        assert_frame_equal(solution, md2)
+        # one batch for the counted texts and one per chunk of the distinct texts of both data frames
+        self.assertEqual(1 + 2 * 2, tagger.tag_sents.call_count)
+        self.assertTrue(german['text'].isna().all())
+
+    def test_pos_tagger_is_loaded_once(self):
+        pos_tagger.cache_clear()
+        try:
+            with mock.patch('nltk.tag.PerceptronTagger') as perceptron_tagger:
+                PartOfSpeechMetadata().load_resources()
+                self.assertIs(pos_tagger(), pos_tagger())
+            self.assertEqual(1, perceptron_tagger.call_count)
+        finally:
+            pos_tagger.cache_clear()
+
     def test_metadata_precalculation(self):
         md1, md2 = self.store[TextMetadata(text_metadata_types=[NumWordsMetadata(), StopwordRatioMetadata(),
                                                                 UnicodeBlocksMetadata()])]
@@ -151,6 +221,101 @@ class TestTextMetadataPrecalculations(unittest.TestCase):
         assert_frame_equal(solution1, md1)
         assert_frame_equal(solution2, md2)
 
+    def test_fused_metadata_equals_single_metadata(self):
+        metadata_types = [NumCharsMetadata(), RatioUppercaseLettersMetadata(), UnicodeCategoriesMetadata(),
+                          UnicodeBlocksMetadata(), NumWordsMetadata(), DistinctWordsRatioMetadata(),
+                          UniqueWordsRatioMetadata(), DelimiterTypeMetadata(), NumPartsMetadata()]
+        df = self.store[ColumnType.text][0]
+        fused = TextMetadata.process_fused(df, ['text'], metadata_types)
+        for metadata_type in metadata_types:
+            with self.subTest(metadata_type.metadata_name()):
+                assert_frame_equal(metadata_type.process_dataset(self.store, 0), fused[metadata_type])
+
+    def test_fused_metadata_share_intermediate_results(self):
+        metadata_types = [NumWordsMetadata(), DistinctWordsRatioMetadata(), DelimiterTypeMetadata(),
+                          NumPartsMetadata()]
+        df = self.store[ColumnType.text][0]
+        tokenize = TokenizeIntoLowerWordsPrecalculation.tokenize_into_words
+        with mock.patch.object(TokenizeIntoLowerWordsPrecalculation, 'tokenize_into_words',
+                               side_effect=tokenize) as tokenize_into_words, \
+                mock.patch.object(DelimiterTypeMetadata, 'metadata_function', return_value='newline') as delimiter:
+            TextMetadata.process_fused(df, ['text'], metadata_types)
+        self.assertEqual(len(df), tokenize_into_words.call_count)
+        self.assertEqual(len(df), delimiter.call_count)
+
+    def test_fused_metadata_share_delimiter_analysis(self):
+        metadata_types = [DelimiterTypeMetadata(), NumPartsMetadata(), LanguagePerParagraph()]
+        df = self.store[ColumnType.text][0]
+        with mock.patch('shift_detector.precalculations.text_metadata.delimiter_type',
+                        side_effect=TmUtils.delimiter_type) as delimiter_type, \
+                mock.patch('shift_detector.precalculations.text_metadata.split_by_delimiter',
+                           side_effect=TmUtils.split_by_delimiter) as split_by_delimiter:
+            fused = TextMetadata.process_fused(df, ['text'], metadata_types)
+        self.assertEqual(len(df), delimiter_type.call_count)
+        self.assertEqual(len(df), split_by_delimiter.call_count)
+        assert_frame_equal(NumPartsMetadata().process_dataset(self.store, 0), fused[NumPartsMetadata()])
+
+    def test_metadata_precalculation_adds_single_metadata(self):
+        metadata_types = [NumCharsMetadata(), NumWordsMetadata()]
+        self.store[TextMetadata(metadata_types)]
+        for metadata_type in metadata_types:
+            self.assertTrue(self.store.is_executed(DatasetwiseResult(metadata_type, 0)))
+        with mock.patch.object(TextMetadata, 'process_fused') as process_fused:
+            self.store[TextMetadata([NumCharsMetadata()])]
+        self.assertFalse(process_fused.called)
+
+    def test_metadata_of_unique_texts(self):
+        df1 = pd.DataFrame({'text': ['a b', 'c', 'a b', 'd e f'] * 5})
+        df2 = pd.DataFrame({'text': ['c', 'g h', 'c'] * 5})
+        store = Store(df1, df2, custom_column_types={'text': ColumnType.text})
+        metadata_function = NumWordsMetadata().metadata_function
+        with mock.patch.object(NumWordsMetadata, 'metadata_function', side_effect=metadata_function) as num_words:
+            md1, md2 = NumWordsMetadata().process(store)
+        self.assertEqual(5, num_words.call_count)
+        self.assertListEqual([2, 1, 2, 3] * 5, list(md1['text']))
+        self.assertListEqual([1, 2, 1] * 5, list(md2['text']))
+
+        tokenize = TokenizeIntoLowerWordsPrecalculation.tokenize_into_words
+        with mock.patch.object(TokenizeIntoLowerWordsPrecalculation, 'tokenize_into_words',
+                               side_effect=tokenize) as tokenize_into_words:
+            md1, md2 = TextMetadata([NumCharsMetadata(), DistinctWordsRatioMetadata()]).process(store)
+        self.assertEqual(4, tokenize_into_words.call_count)
+        self.assertListEqual([3, 1, 3, 5] * 5, list(md1[('text', 'num_chars')]))
+        self.assertListEqual([1, 3, 1] * 5, list(md2[('text', 'num_chars')]))
+
+    def test_fused_metadata_in_processes(self):
+        metadata_types = [NumCharsMetadata(), UnicodeBlocksMetadata(), NumWordsMetadata(), NumPartsMetadata(),
+                          LanguageMetadata(), LanguagePerParagraph()]
+        df = self.store[ColumnType.text][0]
+        sequential = TextMetadata.process_fused(df, ['text'], metadata_types)
+        parallel = TextMetadata.process_fused(df, ['text'], metadata_types, n_jobs=2, chunk_size=3)
+        for metadata_type in metadata_types:
+            with self.subTest(metadata_type.metadata_name()):
+                assert_frame_equal(sequential[metadata_type], parallel[metadata_type])
+
+    def test_metadata_resources_are_loaded_once_per_process(self):
+        metadata_types = [NumCharsMetadata(), LanguageMetadata()]
+        with mock.patch.object(LanguageMetadata, 'load_resources') as load_resources, \
+                mock.patch('shift_detector.precalculations.text_metadata.loaded_metadata_types', set()):
+            first = analyze_texts_in_worker(['Some text', 'Another text'], metadata_types)
+            analyze_texts_in_worker(['More text'], metadata_types)
+        self.assertEqual(1, load_resources.call_count)
+        self.assertEqual(9, first[0][0])
+
+    def test_fingerprint_does_not_depend_on_parallelism(self):
+        self.assertEqual(TextMetadata(n_jobs=1).fingerprint(), TextMetadata(n_jobs=4, chunk_size=10).fingerprint())
+        self.assertNotEqual(TextMetadata().fingerprint(), TextMetadata([NumCharsMetadata()]).fingerprint())
+        self.assertEqual(PartOfSpeechMetadata().fingerprint(), PartOfSpeechMetadata(n_jobs=4).fingerprint())
+        self.assertEqual(TextMetadata([PartOfSpeechMetadata()]).fingerprint(),
+                         TextMetadata([PartOfSpeechMetadata(chunk_size=10)]).fingerprint())
+        self.assertNotEqual(PartOfSpeechMetadata().fingerprint(), PartOfSpeechMetadata(language='de').fingerprint())
+
+    def test_metadata_precalculation_parameters(self):
+        self.assertEqual(TextMetadata(n_jobs=1), TextMetadata(n_jobs=4, chunk_size=100))
+        for parameters in [{'n_jobs': 0}, {'n_jobs': 1.5}, {'chunk_size': 0}, {'chunk_size': None}]:
+            with self.subTest(parameters=parameters):
+                self.assertRaises(ValueError, lambda: TextMetadata(**parameters))
+
 
 class TestTextMetadataFunctions(unittest.TestCase):
 
@@ -291,6 +456,19 @@ class TestTextMetadataFunctions(unittest.TestCase):
         self.assertEqual(unique_words_ratio(self.empty_array), 0.0)
         self.assertIsNaN(unique_words_ratio(self.nan))
 
+    def test_vectorized_ratio_upper(self):
+        texts = [self.english_string, self.unicode_string, self.punctuation_string, self.empty_string,
+                 self.lower_string, self.upper_string, '\U0001D504\U0001D586 Ab', self.nan]
+        ratio_upper = RatioUppercaseLettersMetadata()
+        expected = [ratio_upper.metadata_function(text) for text in texts]
+        batch = ratio_upper.metadata_batch(texts)
+        self.assertEqual(len(expected), len(batch))
+        for expected_value, value in zip(expected[:-1], batch[:-1]):
+            self.assertAlmostEqual(expected_value, value)
+        self.assertIsNaN(batch[-1])
+        self.assertListEqual([0.0, 0.0], ratio_upper.metadata_batch([self.empty_string, self.empty_string]))
+        self.assertEqual(0.0, RatioUppercaseLettersMetadata().metadata_function(self.punctuation_string))
+
     def test_unknown_words(self):
         unknown_word_ratio = UnknownWordRatioMetadata().metadata_function
         self.assertEqual(unknown_word_ratio('en', self.english_array), 0.00)
@@ -301,6 +479,23 @@ class TestTextMetadataFunctions(unittest.TestCase):
         self.assertIsNaN(unknown_word_ratio('en', self.nan))
         self.assertIsNaN(unknown_word_ratio(self.nan, self.nan))
 
+    def test_unknown_words_like_spellchecker(self):
+        import spellchecker
+        words = ['hello', 'wrld', '2019', 'nan', 'a', ',', "don't", 'x' * 40, 'Teh']
+        self.assertSetEqual(spellchecker.SpellChecker('en').unknown(words),
+                            TmUtils.unknown_words(words, TmUtils.spelling_dictionary('en')))
+
+    def test_spelling_dictionary_is_loaded_once(self):
+        import spellchecker
+        TmUtils.load_spelling_dictionary.cache_clear()
+        with mock.patch.object(spellchecker, 'SpellChecker', wraps=spellchecker.SpellChecker) as spell_checker:
+            UnknownWordRatioMetadata().load_resources()
+            for words in [self.english_array, self.incorrect_english_array, self.english_array]:
+                UnknownWordRatioMetadata().metadata_function('en', words)
+            UnknownWordRatioMetadata().metadata_function('so', self.unsupported_language_array)
+            UnknownWordRatioMetadata().metadata_function('so', self.unsupported_language_array)
+        self.assertListEqual([mock.call('en'), mock.call('so')], spell_checker.call_args_list)
+
     def test_stopwords(self):
         stopword_ratio = StopwordRatioMetadata().metadata_function
         self.assertEqual(stopword_ratio('en', self.no_stopwords_array), 0.0)
@@ -336,6 +531,16 @@ class TestTextMetadataFunctions(unittest.TestCase):
         self.assertEqual(num_parts(self.empty_string), 0)
         self.assertIsNaN(num_parts(self.nan))
 
+    def test_split_by_delimiter(self):
+        self.assertListEqual(['some text', 'some other text -- more text.'],
+                             TmUtils.split_by_delimiter(self.comma_string, 'comma'))
+        self.assertListEqual([], TmUtils.split_by_delimiter(self.empty_string, TmUtils.NO_DELIMITER))
+        for text in [self.html_string, self.english_string, self.whitespace_string, self.html_sentence_other_string]:
+            with self.subTest(text=text):
+                delimiter = TmUtils.delimiter_type(text)
+                self.assertEqual(regex.split(TmUtils.delimiters[delimiter], text),
+                                 TmUtils.split_by_delimiter(text, delimiter))
+
     def test_languages(self):
         language = LanguagePerParagraph().detect_languages
         self.assertEqual(language(self.english_string), {'en': 1})
@@ -348,6 +553,16 @@ class TestTextMetadataFunctions(unittest.TestCase):
         self.assertIsNaN(language(self.empty_string))
         self.assertIsNaN(language(self.nan))
 
+    def test_language_metadata(self):
+        language = LanguageMetadata().metadata_function
+        self.assertEqual('en', language(self.english_string))
+        self.assertEqual('de', language(self.german_string))
+        self.assertIsNaN(language('42'))
+        self.assertIsNaN(language(self.nan))
+        self.assertEqual(LanguageMetadata(), LanguageMetadata(0, None))
+        self.assertNotEqual(LanguageMetadata(), LanguageMetadata(1))
+        self.assertNotEqual(LanguageMetadata(), LanguageMetadata(max_length=100))
+
     def test_complexity(self):
         # hard = "Quantum mechanics (QM; also known as quantum physics, quantum theory, the wave mechanical model, "\
         #       "or matrix mechanics), including quantum field theory, is a fundamental theory in physics which "\
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from shift_detector.detector import Detector
+from shift_detector.utils.data_io import read_column_names, read_data, file_format
+
+
+class TestDataIO(unittest.TestCase):
+
+    def setUp(self):
+        self.df1 = pd.DataFrame({'a': list(range(20)), 'b': ['x', 'y'] * 10, 'only_in_1': [0.5] * 20})
+        self.df2 = pd.DataFrame({'only_in_2': [1] * 20, 'b': ['y', 'z'] * 10, 'a': list(range(20, 40))})
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, df, file_name):
+        path = os.path.join(self.directory.name, file_name)
+        if file_name.endswith('.parquet'):
+            df.to_parquet(path)
+        elif file_name.endswith('.feather') or file_name.endswith('.arrow'):
+            df.to_feather(path)
+        else:
+            df.to_csv(path, index=False)
+        return path
+
+    def test_file_format(self):
+        self.assertEqual(file_format('data.PARQUET'), 'parquet')
+        self.assertEqual(file_format('data.feather'), 'arrow')
+        self.assertEqual(file_format('data.arrow'), 'arrow')
+        self.assertEqual(file_format('data.csv'), 'csv')
+
+    def test_read_column_names_and_projection(self):
+        for extension in ['csv', 'parquet', 'feather', 'arrow']:
+            with self.subTest(extension=extension):
+                path = self.write(self.df1, 'df1.' + extension)
+                self.assertEqual(read_column_names(path, ','), ['a', 'b', 'only_in_1'])
+                assert_frame_equal(read_data(path, ',', columns=['b', 'a']), self.df1[['b', 'a']])
+                assert_frame_equal(read_data(path, ','), self.df1)
+
+    def test_arrow_formats(self):
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.ipc
+
+        table = pyarrow.Table.from_pandas(self.df1, preserve_index=False)
+        feather_v1 = os.path.join(self.directory.name, 'df1_v1.feather')
+        pyarrow.feather.write_feather(self.df1, feather_v1, version=1)
+        feather_v2 = os.path.join(self.directory.name, 'df1_v2.feather')
+        pyarrow.feather.write_feather(self.df1, feather_v2, version=2)
+        stream = os.path.join(self.directory.name, 'df1_stream.arrow')
+        with pyarrow.ipc.new_stream(stream, table.schema) as writer:
+            writer.write_table(table)
+
+        for path in [feather_v1, feather_v2, stream]:
+            with self.subTest(os.path.basename(path)):
+                self.assertEqual(read_column_names(path, ','), ['a', 'b', 'only_in_1'])
+                assert_frame_equal(read_data(path, ',', columns=['b', 'a']), self.df1[['b', 'a']])
+                assert_frame_equal(read_data(path, ','), self.df1)
+                detector = Detector(path, self.df2, log_print=False)
+                assert_frame_equal(detector.df1, self.df1[['a', 'b']])
+
+    def test_detector_reads_only_shared_columns(self):
+        path1 = self.write(self.df1, 'df1.parquet')
+        path2 = self.write(self.df2, 'df2.feather')
+        detector = Detector(path1, path2, log_print=False)
+        self.assertEqual(list(detector.df1.columns), ['a', 'b'])
+        self.assertEqual(list(detector.df2.columns), ['a', 'b'])
+        assert_frame_equal(detector.df2, self.df2[['a', 'b']])
+
+        detector = Detector(self.df1, self.write(self.df2, 'df2.csv'), log_print=False)
+        self.assertEqual(list(detector.df2.columns), ['a', 'b'])
@@ -1,11 +1,19 @@
 import os
+import pickle
 import unittest
 from unittest.mock import Mock, MagicMock, patch, call
 
 import pandas as pd
 
 from shift_detector.checks.check import Check
-from shift_detector.detector import Detector
+from shift_detector.checks.statistical_checks.categorical_statistical_check import CategoricalStatisticalCheck
+from shift_detector.checks.statistical_checks.numerical_statistical_check import NumericalStatisticalCheck
+from shift_detector.checks.statistical_checks.text_metadata_statistical_check import TextMetadataStatisticalCheck
+from shift_detector.detector import Detector, load_worker_store
+from shift_detector.precalculations.n_gram import NGram, NGramType
+from shift_detector.precalculations.reference_profile import ReferenceProfile
+from shift_detector.precalculations.text_metadata import NumWordsMetadata
+from shift_detector.utils.column_management import ColumnType
 
 
 class TestCreateDetector(unittest.TestCase):
@@ -68,6 +76,142 @@ class TestDetector(unittest.TestCase):
             error_msg = self.detector.check_reports[0].information['Exception']
             self.assertEqual(error_msg, "Test Exception")
 
+    def test_run_concurrently(self):
+        df1 = pd.DataFrame({'number': list(range(100)), 'category': ['a', 'b'] * 50})
+        df2 = pd.DataFrame({'number': list(range(50, 150)), 'category': ['a', 'b', 'b', 'b'] * 25})
+        checks = [NumericalStatisticalCheck(), CategoricalStatisticalCheck()]
+
+        detector = Detector(df1, df2, log_print=False)
+        detector.run(*checks)
+        expected = [(report.check_name, report.shifted_columns) for report in detector.check_reports]
+
+        for backend in ['thread', 'process']:
+            with self.subTest(backend=backend):
+                detector = Detector(df1, df2, log_print=False)
+                detector.run(*checks, workers=2, backend=backend)
+                actual = [(report.check_name, report.shifted_columns) for report in detector.check_reports]
+                self.assertEqual(expected, actual)
+
+        with self.subTest("Precalculations of worker processes are added to the store"):
+            self.assertEqual(1, len(detector.store.preprocessings))
+
+        with self.subTest("Invalid parameters"):
+            self.assertRaises(ValueError, self.detector.run, *checks, workers=0)
+            self.assertRaises(ValueError, self.detector.run, *checks, backend='no_backend')
+
+    def test_shared_precalculations_are_computed_once_in_processes(self):
+        df1 = pd.DataFrame({'text': ['some text {}'.format(i % 7) for i in range(400)]})
+        df2 = pd.DataFrame({'text': ['a b text {}'.format(i % 5) for i in range(400)]})
+        detector = Detector(df1, df2, log_print=False, text=ColumnType.text)
+        checks = [TextMetadataStatisticalCheck(text_metadata_types=[NumWordsMetadata()]) for _ in range(2)]
+        detector.run(*checks, workers=2, backend='process')
+
+        profile = detector.profile()
+        misses = profile[(profile['kind'] == 'precalculation') & (profile['cache'] == 'miss')]
+        self.assertEqual(1, misses['name'].value_counts()['TextMetadata[df1]'])
+        self.assertTrue((misses['name'].value_counts() == 1).all())
+
+    def test_worker_store_is_unpickled_once_per_run(self):
+        detector = Detector(pd.DataFrame({'number': list(range(100))}), pd.DataFrame({'number': list(range(100))}),
+                            log_print=False)
+        pickled_store = pickle.dumps(detector.store)
+        store = load_worker_store('first', pickled_store)
+        self.assertIsNot(detector.store, store)
+        self.assertIs(store, load_worker_store('first', pickled_store))
+        self.assertIsNot(store, load_worker_store('second', pickled_store))
+
+    def test_release_precalculations(self):
+        df1 = pd.DataFrame({'number': list(range(100)), 'category': ['a', 'b'] * 50})
+        df2 = pd.DataFrame({'number': list(range(50, 150)), 'category': ['a', 'b', 'b', 'b'] * 25})
+        checks = [NumericalStatisticalCheck(), CategoricalStatisticalCheck()]
+
+        for backend in ['thread', 'process']:
+            with self.subTest(backend=backend):
+                detector = Detector(df1, df2, log_print=False, release_precalculations=True)
+                detector.run(*checks, workers=2, backend=backend)
+                self.assertEqual(['category'], detector.check_reports[1].shifted_columns)
+                self.assertEqual(0, len(detector.store.preprocessings))
+
+    def test_plan(self):
+        df1 = pd.DataFrame({'number': list(range(100)), 'category': ['a', 'b'] * 50,
+                            'text': ['text number {}'.format(i) for i in range(100)]})
+        detector = Detector(df1, df1.copy(), log_print=False, text=ColumnType.text)
+        ngram_check = Mock(spec=Check)
+        ngram_check.needed_precalculations.return_value = [NGram(3, NGramType.character)]
+        unknown_check = Mock(spec=Check)
+        unknown_check.needed_precalculations.return_value = None
+        checks = [CategoricalStatisticalCheck(), ngram_check, ngram_check, unknown_check]
+
+        plan = detector.plan(*checks)
+        self.assertEqual(['LowCardinalityPrecalculation', 'NGram[df1]', 'NGram[df2]', 'NGram'],
+                         list(plan[plan['kind'] == 'precalculation']['name']))
+        self.assertEqual([1, 2], plan.loc[3, 'dependencies'])
+        self.assertEqual([5, 6], plan.loc[1, 'consumers'])
+        self.assertEqual(2 * 2 * 100, plan.loc[0, 'cost'])
+        self.assertAlmostEqual(df1['text'].str.len().sum(), plan.loc[1, 'cost'])
+        self.assertEqual(plan.loc[1, 'cost'] + plan.loc[2, 'cost'], plan.loc[5, 'total_cost'])
+
+        with self.subTest("Checks without declared precalculations are incomplete"):
+            self.assertEqual([True, True, True, False], list(plan[plan['kind'] == 'check']['complete']))
+
+        with self.subTest("Executed precalculations cost nothing"):
+            detector.run(CategoricalStatisticalCheck())
+            plan = detector.plan(CategoricalStatisticalCheck())
+            self.assertTrue(plan.loc[0, 'executed'])
+            self.assertEqual(0.0, plan.loc[1, 'total_cost'])
+
+    def test_sampling(self):
+        df1 = pd.DataFrame({'number': list(range(300)), 'category': ['a', 'b', 'c'] * 100})
+        df2 = pd.DataFrame({'number': list(range(100, 400)), 'category': ['a', 'b', 'b'] * 100})
+        df1.to_csv('sample1.csv', index=False)
+        df2.to_csv('sample2.csv', index=False)
+        try:
+            for strategy in ['uniform', 'reservoir', 'stratified']:
+                with self.subTest(strategy=strategy):
+                    detector = Detector('sample1.csv', 'sample2.csv', log_print=False, sample_rows=100,
+                                        sampling_strategy=strategy, stratify_by='category')
+                    self.assertEqual((100, 100), (len(detector.store.df1), len(detector.store.df2)))
+                    detector.run(NumericalStatisticalCheck(), CategoricalStatisticalCheck())
+                    self.assertEqual([['number'], ['category']],
+                                     [report.shifted_columns for report in detector.check_reports])
+        finally:
+            os.remove('sample1.csv')
+            os.remove('sample2.csv')
+
+        with self.subTest("Checks can opt out of sampling"):
+            detector = Detector(df1, df2, log_print=False, sample_rows=100)
+            check = NumericalStatisticalCheck()
+            check.use_full_data = True
+            with patch.object(NumericalStatisticalCheck, 'run', autospec=True) as run:
+                detector.run(check)
+                self.assertEqual(300, len(run.call_args[0][1].df1))
+
+    def test_from_profile(self):
+        df1 = pd.DataFrame({'number': list(range(100)), 'text': ['some text', 'another text'] * 50})
+        df2 = pd.DataFrame({'number': list(range(50, 150)), 'text': ['a third text'] * 100})
+
+        detector = Detector(df1, df2, log_print=False)
+        detector.run(NumericalStatisticalCheck())
+        profile = ReferenceProfile.from_data(df1)
+
+        profiled_detector = Detector.from_profile(profile, df2, log_print=False)
+        profiled_detector.run(NumericalStatisticalCheck())
+        self.assertEqual(detector.store.type_to_columns, profiled_detector.store.type_to_columns)
+        self.assertEqual(detector.check_reports[0].shifted_columns, profiled_detector.check_reports[0].shifted_columns)
+        self.assertEqual(profiled_detector.reference_profile().column_types(), profile.column_types())
+
+    def test_profile(self):
+        df1 = pd.DataFrame({'number': list(range(100)), 'category': ['a', 'b'] * 50})
+        df2 = pd.DataFrame({'number': list(range(50, 150)), 'category': ['a', 'b', 'b', 'b'] * 25})
+        detector = Detector(df1, df2, log_print=False)
+        detector.run(CategoricalStatisticalCheck(), CategoricalStatisticalCheck())
+
+        profile = detector.profile()
+        self.assertEqual(list(profile['kind']), ['check', 'precalculation', 'check', 'precalculation'])
+        self.assertEqual(list(profile['cache'].fillna('-')), ['-', 'miss', '-', 'hit'])
+        self.assertEqual(set(profile['check']), {'CategoricalStatisticalCheck'})
+        self.assertEqual(profile['name'][1], 'LowCardinalityPrecalculation')
+
     @patch('builtins.print')
     def test_evaluate(self, mocked_print):
         mock = MagicMock()
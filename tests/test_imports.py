@@ -0,0 +1,53 @@
+import subprocess
+import sys
+import unittest
+
+from shift_detector import checks
+
+# dependencies that are only imported by the code paths that use them
+HEAVY_MODULES = ['matplotlib', 'IPython', 'scipy', 'nltk', 'langdetect', 'spellchecker', 'textstat', 'gensim',
+                 'datawig', 'mxnet', 'keras', 'tensorflow', 'sklearn']
+
+# seconds to import the detector and a statistical check in a fresh interpreter
+IMPORT_TIME_BUDGET = 5.0
+
+IMPORT_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+from shift_detector.detector import Detector
+from shift_detector.checks import NumericalStatisticalCheck, DQMetricsCheck, TextMetadataStatisticalCheck
+print(time.perf_counter() - start)
+print(','.join(sorted({module.split('.')[0] for module in sys.modules})))
+"""
+
+
+class TestImports(unittest.TestCase):
+
+    def test_heavy_dependencies_are_imported_lazily(self):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], check=True, stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout.splitlines()
+        import_time, modules = float(output[0]), output[1].split(',')
+
+        self.assertEqual([], [module for module in HEAVY_MODULES if module in modules])
+        self.assertLess(import_time, IMPORT_TIME_BUDGET)
+
+    def test_check_registry(self):
+        from shift_detector.checks.statistical_checks.numerical_statistical_check import NumericalStatisticalCheck
+        self.assertIs(NumericalStatisticalCheck, checks.NumericalStatisticalCheck)
+        self.assertIn('NumericalStatisticalCheck', dir(checks))
+        self.assertIs(NumericalStatisticalCheck, checks.get_check('NumericalStatisticalCheck'))
+        with self.assertRaises(AttributeError):
+            checks.NoCheck
+        with self.assertRaises(ImportError):
+            from shift_detector.checks import NoCheck
+
+        checks.register_check('CustomCheck', 'tests.test_imports')
+        try:
+            self.assertIs(CustomCheck, checks.CustomCheck)
+        finally:
+            del checks.CHECKS['CustomCheck']
+
+
+class CustomCheck:
+    pass
@@ -1,13 +1,100 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import pandas as pd
-from pandas.core.dtypes.common import is_numeric_dtype, is_string_dtype
+from pandas.core.dtypes.common import is_numeric_dtype, is_string_dtype, is_categorical_dtype
 from pandas.util.testing import assert_frame_equal
 
+from shift_detector.checks.check import Check
+from shift_detector.precalculations.precalculation import Precalculation
+from shift_detector.precalculations.precalculation_cache import PrecalculationCache
 from shift_detector.precalculations.store import InsufficientDataError, Store
 from shift_detector.utils.column_management import ColumnType
 
 
+class SlowPrecalculation(Precalculation):
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.executions = 0
+        self.executions_lock = threading.Lock()
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__)
+
+    def __hash__(self):
+        return hash(self.__class__)
+
+    def process(self, store):
+        with self.executions_lock:
+            self.executions += 1
+        time.sleep(0.1)
+        if self.fail:
+            raise ValueError("Test Exception")
+        return object()
+
+
+class CountingPrecalculation(Precalculation):
+
+    executions = 0
+
+    def __init__(self, column):
+        self.column = column
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.column == other.column
+
+    def __hash__(self):
+        return hash((self.__class__, self.column))
+
+    def process(self, store):
+        CountingPrecalculation.executions += 1
+        df1, df2 = store[ColumnType.numerical]
+        return df1[self.column].sum() + df2[self.column].sum()
+
+
+class UnpicklablePrecalculation(Precalculation):
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__)
+
+    def __hash__(self):
+        return hash(self.__class__)
+
+    def process(self, store):
+        return lambda: None
+
+
+class TotalPrecalculation(Precalculation):
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__)
+
+    def __hash__(self):
+        return hash(self.__class__)
+
+    def process(self, store):
+        return store[CountingPrecalculation('a')] + store[CountingPrecalculation('b')]
+
+
+class NeedsCheck(Check):
+
+    def __init__(self, *precalculations, unknown=False):
+        self.precalculations = list(precalculations)
+        self.unknown = unknown
+
+    def needed_precalculations(self, store):
+        return None if self.unknown else self.precalculations
+
+    def run(self, store):
+        return [store[precalculation] for precalculation in self.precalculations]
+
+
 class TestStore(unittest.TestCase):
 
     def test_init_custom_column_types(self):
@@ -67,15 +154,52 @@ class TestStore(unittest.TestCase):
                                                                         150.0, 200.0, 50.0, 10.0, 5.0, 1.0] * 10)))
 
         with self.subTest("Apply categorical conversion for custom_column_types to dataframes"):
-            self.assertTrue(is_string_dtype(store.df1['to_categorical']))
-            self.assertTrue(store.df1['to_categorical'].equals(pd.Series(['150', '200', '50', '10', '5',
-                                                                          '150', '200', '50', '10', '5', '1'] * 10)))
+            self.assertTrue(is_categorical_dtype(store.df1['to_categorical']))
+            self.assertTrue(store.df1['to_categorical'].astype(object).equals(
+                pd.Series(['150', '200', '50', '10', '5', '150', '200', '50', '10', '5', '1'] * 10)))
+            self.assertListEqual(['1', '10', '150', '200', '5', '50'],
+                                 list(store.df1['to_categorical'].cat.categories))
 
         with self.subTest("Apply textual conversion for custom_column_types to dataframes"):
             self.assertTrue(is_string_dtype(store.df1['to_text']))
             self.assertTrue(store.df1['to_text'].equals(pd.Series(['150', '200', '50', '10', '5',
                                                                           '150', '200', '50', '10', '5', '1'] * 10)))
 
+    def test_dictionary_encoding(self):
+        df1 = pd.DataFrame({'category': ['a', 'b', None] * 10, 'text': ['x y', 'z', 'x y'] * 10})
+        df2 = pd.DataFrame({'category': ['c', 'b', 'a'] * 10, 'text': ['z', 'w', 'z'] * 10})
+        store = Store(df1, df2, custom_column_types={'category': ColumnType.categorical, 'text': ColumnType.text})
+
+        with self.subTest("Categorical columns share their categories"):
+            self.assertListEqual(['None', 'a', 'b', 'c'], list(store.df1['category'].cat.categories))
+            self.assertTrue(store.df1['category'].dtype == store.df2['category'].dtype)
+            self.assertListEqual(['a', 'b', 'None'], list(store.df1['category'][:3]))
+
+        with self.subTest("Text columns are encoded with their unique texts"):
+            codes1, codes2, unique_texts = store.text_encoding('text')
+            self.assertListEqual(['w', 'x y', 'z'], list(unique_texts))
+            self.assertListEqual(list(store.df1['text']), list(unique_texts[codes1]))
+            self.assertListEqual(list(store.df2['text']), list(unique_texts[codes2]))
+            self.assertIs(store.df1['text'][0], store.df1['text'][2])
+
+        with self.subTest("Only text columns are encoded"):
+            self.assertRaises(ValueError, store.text_encoding, 'category')
+
+    def test_unique_texts(self):
+        df1 = pd.DataFrame({'text': ['x y', 'z', 'x y'] * 10})
+        df2 = pd.DataFrame({'text': ['z', 'w', 'z'] * 10})
+        store = Store(df1, df2, custom_column_types={'text': ColumnType.text})
+
+        for index, df in [(None, pd.concat([df1, df2])), (0, df1), (1, df2)]:
+            with self.subTest(index=index):
+                codes, texts = store.unique_texts('text', index)
+                self.assertListEqual(sorted(set(df['text'])), list(texts))
+                self.assertListEqual(list(df['text']), list(texts[codes]))
+
+        deduplication = store.text_deduplication()
+        self.assertListEqual([60, 3], list(deduplication.loc['text', ['texts', 'unique_texts']]))
+        self.assertAlmostEqual(0.95, deduplication.loc['text', 'deduplication_ratio'])
+
     def test_change_column_type(self):
         data = {'to_numerical': ['a', '200', '50', '10', '5', '150', '200', '50', '10', '5', '1'] * 10}
         df1 = df2 = pd.DataFrame.from_dict(data)
@@ -112,3 +236,162 @@ class TestStore(unittest.TestCase):
         df2 = pd.DataFrame(list(range(10)))
         store = Store(df1=df1, df2=df2)
         self.assertRaises(TypeError, lambda: store['Not a Precalculation'])
+
+    def test_concurrent_access(self):
+        df1 = pd.DataFrame(list(range(10)))
+        df2 = pd.DataFrame(list(range(10)))
+
+        with self.subTest("Precalculation is executed exactly once"):
+            store = Store(df1=df1, df2=df2)
+            precalculation = SlowPrecalculation()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: store[precalculation], range(8)))
+            self.assertEqual(1, precalculation.executions)
+            self.assertTrue(all(result is results[0] for result in results))
+
+        with self.subTest("Exceptions are passed to all waiting requesters"):
+            store = Store(df1=df1, df2=df2)
+            precalculation = SlowPrecalculation(fail=True)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(lambda: store[precalculation]) for _ in range(4)]
+            for future in futures:
+                self.assertRaises(ValueError, future.result)
+            self.assertNotIn(precalculation, store.preprocessings)
+
+    def test_persistent_cache(self):
+        df1 = pd.DataFrame({'a': list(range(20)), 'b': list(range(20, 40))})
+        df2 = pd.DataFrame({'a': list(range(10, 30)), 'b': list(range(30, 50))})
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            CountingPrecalculation.executions = 0
+            first = Store(df1, df2, cache_dir=cache_dir)
+            self.assertEqual(first[CountingPrecalculation('a')], 580)
+
+            with self.subTest("Results are reused by a new store on equal data"):
+                second = Store(df1.copy(), df2.copy(), cache_dir=cache_dir)
+                self.assertEqual(second[CountingPrecalculation('a')], 580)
+                self.assertEqual(CountingPrecalculation.executions, 1)
+
+            with self.subTest("Different parameters or data are not served from the cache"):
+                second[CountingPrecalculation('b')]
+                Store(df1, df2.iloc[::-1], cache_dir=cache_dir)[CountingPrecalculation('a')]
+                self.assertEqual(CountingPrecalculation.executions, 3)
+
+            with self.subTest("Invalidated results are executed again"):
+                second.invalidate(CountingPrecalculation('a'))
+                self.assertNotIn(CountingPrecalculation('a'), second.preprocessings)
+                Store(df1, df2, cache_dir=cache_dir)[CountingPrecalculation('a')]
+                self.assertEqual(CountingPrecalculation.executions, 4)
+
+            with self.subTest("Precalculations without a stable fingerprint are not cached"):
+                precalculation = SlowPrecalculation()
+                first[precalculation]
+                self.assertIsNone(first.cache_key(precalculation))
+                Store(df1, df2, cache_dir=cache_dir)[precalculation]
+                self.assertEqual(precalculation.executions, 2)
+
+    def test_release_after_last_consumer(self):
+        df1 = pd.DataFrame({'a': list(range(20)), 'b': list(range(20, 40))})
+        store = Store(df1, df1.copy(), release_precalculations=True)
+        first = NeedsCheck(CountingPrecalculation('a'), TotalPrecalculation())
+        second = NeedsCheck(CountingPrecalculation('a'))
+        store.plan([first, second])
+
+        first.run(store)
+        store.release(first)
+        self.assertIn(CountingPrecalculation('a'), store.preprocessings)
+        self.assertNotIn(TotalPrecalculation(), store.preprocessings)
+        with self.subTest("Results requested by a released precalculation are released with it"):
+            self.assertNotIn(CountingPrecalculation('b'), store.preprocessings)
+
+        second.run(store)
+        store.release(second)
+        self.assertEqual(len(store.preprocessings), 0)
+
+    def test_no_release_with_unknown_consumers(self):
+        df1 = pd.DataFrame({'a': list(range(20))})
+        store = Store(df1, df1.copy(), release_precalculations=True)
+        first = NeedsCheck(CountingPrecalculation('a'))
+        store.plan([first, NeedsCheck(unknown=True)])
+        first.run(store)
+        store.release(first)
+        self.assertIn(CountingPrecalculation('a'), store.preprocessings)
+
+    def test_memory_budget(self):
+        df1 = pd.DataFrame({'a': list(range(20)), 'b': list(range(20, 40))})
+        CountingPrecalculation.executions = 0
+        store = Store(df1, df1.copy(), memory_budget=0)
+
+        self.assertEqual(store[CountingPrecalculation('a')], 380)
+        self.assertEqual(store[CountingPrecalculation('b')], 1180)
+        self.assertEqual(list(store.preprocessings), [CountingPrecalculation('b')])
+        self.assertIn(CountingPrecalculation('a'), store.spilled)
+
+        with self.subTest("Spilled results are loaded instead of executed again"):
+            self.assertEqual(store[CountingPrecalculation('a')], 380)
+            self.assertEqual(CountingPrecalculation.executions, 2)
+            self.assertIn(CountingPrecalculation('b'), store.spilled)
+            self.assertEqual(store.instrumentation.records[-1]['cache'], 'spill')
+
+        with self.subTest("Unpicklable results are dropped"):
+            store[UnpicklablePrecalculation()]
+            store[CountingPrecalculation('a')]
+            self.assertNotIn(UnpicklablePrecalculation(), store.preprocessings)
+            self.assertNotIn(UnpicklablePrecalculation(), store.spilled)
+
+        with self.assertRaises(ValueError):
+            Store(df1, df1.copy(), memory_budget=-1)
+
+    def test_spilling_does_not_block_the_store(self):
+        df1 = pd.DataFrame({'a': list(range(20)), 'b': list(range(20, 40))})
+        CountingPrecalculation.executions = 0
+        store = Store(df1, df1.copy(), memory_budget=0)
+        store[CountingPrecalculation('a')]
+        save = PrecalculationCache.save
+        during_writes = []
+
+        def save_and_access(cache, key, preprocessing):
+            locked = store.lock.locked()
+            during_writes.append((locked, None if locked else store[CountingPrecalculation('a')]))
+            save(cache, key, preprocessing)
+
+        with mock.patch.object(PrecalculationCache, 'save', autospec=True, side_effect=save_and_access):
+            store[CountingPrecalculation('b')]
+        self.assertEqual([(False, 380)], during_writes)
+        self.assertIn(CountingPrecalculation('a'), store.spilled)
+        self.assertEqual(2, CountingPrecalculation.executions)
+
+        with self.subTest("Results that are invalidated while they are written are not spilled"):
+            def save_and_invalidate(cache, key, preprocessing):
+                save(cache, key, preprocessing)
+                store.invalidate(CountingPrecalculation('b'))
+
+            with mock.patch.object(PrecalculationCache, 'save', autospec=True, side_effect=save_and_invalidate):
+                store[CountingPrecalculation('a')]
+            self.assertNotIn(CountingPrecalculation('b'), store.spilled)
+            self.assertNotIn(CountingPrecalculation('b'), store.spilling)
+            self.assertEqual([], os.listdir(store.spill_directory.name))
+
+    def test_sampling(self):
+        df1 = pd.DataFrame({'a': list(range(200)), 'b': list(range(200, 400))})
+        df2 = pd.DataFrame({'a': list(range(100)), 'b': list(range(100))})
+        store = Store(df1, df2, sample_rows=50, sampling_seed=1)
+
+        self.assertEqual((50, 50), (len(store.df1), len(store.df2)))
+        df1_numerical, _ = store[ColumnType.numerical]
+        assert_frame_equal(store.df1, df1_numerical)
+        assert_frame_equal(store.df1, Store(df1, df2, sample_rows=50, sampling_seed=1).df1)
+
+        with self.subTest("Checks that opt out of sampling use the full data"):
+            unsampled = store.unsampled()
+            self.assertEqual((200, 100), (len(unsampled.df1), len(unsampled.df2)))
+            self.assertEqual(store.type_to_columns, unsampled.type_to_columns)
+            self.assertIs(unsampled, store.unsampled())
+            self.assertIs(unsampled.instrumentation, store.instrumentation)
+
+        with self.subTest("Unsampled stores are their own full data"):
+            store = Store(df1, df2, sample_rows=200)
+            self.assertIs(store, store.unsampled())
+
+        with self.assertRaises(ValueError):
+            Store(df1, df2, sample_rows=50, sampling_strategy='stratified')
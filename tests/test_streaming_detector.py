@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.checks.dq_metrics_check import DQMetricsCheck
+from shift_detector.checks.statistical_checks.categorical_statistical_check import CategoricalStatisticalCheck
+from shift_detector.checks.statistical_checks.numerical_statistical_check import NumericalStatisticalCheck
+from shift_detector.detector import Detector
+from shift_detector.streaming_detector import StreamingDetector
+
+
+class TestStreamingDetector(unittest.TestCase):
+
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.df1 = pd.DataFrame({'normal': random_state.normal(size=2000),
+                                 'shifted': random_state.normal(size=2000),
+                                 'category': random_state.choice(['a', 'b', 'c'], size=2000),
+                                 'shifted_category': random_state.choice(['a', 'b'], size=2000)})
+        self.df2 = pd.DataFrame({'normal': random_state.normal(size=3000),
+                                 'shifted': random_state.normal(loc=1, size=3000),
+                                 'category': random_state.choice(['a', 'b', 'c'], size=3000),
+                                 'shifted_category': random_state.choice(['a', 'b'], p=[0.8, 0.2], size=3000)})
+        self.directory = tempfile.TemporaryDirectory()
+        self.path1 = os.path.join(self.directory.name, 'df1.csv')
+        self.path2 = os.path.join(self.directory.name, 'df2.csv')
+        self.df1.to_csv(self.path1, index=False)
+        self.df2.to_csv(self.path2, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_run(self):
+        checks = [NumericalStatisticalCheck(), CategoricalStatisticalCheck(), DQMetricsCheck()]
+        detector = Detector(self.path1, self.path2, log_print=False)
+        detector.run(*checks)
+        streaming_detector = StreamingDetector(self.path1, self.path2, log_print=False, chunk_size=300,
+                                               sample_size=500)
+        streaming_detector.run(*checks)
+
+        self.assertEqual(detector.store.type_to_columns, streaming_detector.store.type_to_columns)
+        for report, streaming_report in zip(detector.check_reports, streaming_detector.check_reports):
+            with self.subTest(check=report.check_name):
+                self.assertEqual(sorted(report.examined_columns), sorted(streaming_report.examined_columns))
+                self.assertEqual(sorted(report.shifted_columns), sorted(streaming_report.shifted_columns))
+
+        with self.subTest("p-values of streaming runs are close to exact p-values"):
+            exact = detector.check_reports[0].information['test_results']
+            approximate = streaming_detector.check_reports[0].information['test_results']
+            self.assertAlmostEqual(exact.loc['pvalue', 'normal'], approximate.loc['pvalue', 'normal'], delta=0.1)
+            exact = detector.check_reports[1].information['test_results']
+            approximate = streaming_detector.check_reports[1].information['test_results']
+            self.assertAlmostEqual(exact.loc['pvalue', 'category'], approximate.loc['pvalue', 'category'])
+
+    def test_unsupported_check(self):
+        detector = StreamingDetector(self.path1, self.path2, log_print=False)
+        detector.run(DQMetricsCheck(check_text_metadata=True))
+        self.assertIn('NotImplementedError', detector.check_reports[0].information)
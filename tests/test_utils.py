@@ -1,11 +1,16 @@
+import unicodedata
 import unittest
 
 import numpy as np
 import pandas as pd
 
-from shift_detector.utils.column_management import is_categorical, detect_column_types, ColumnType, is_binary
+from shift_detector.utils.column_management import is_categorical, detect_column_types, ColumnType, is_binary, \
+    column_statistics, ColumnStatistics, encode_columns, compact_codes, \
+    decode_values, encode_column, merge_encodings
 from shift_detector.utils.data_io import shared_column_names
-from shift_detector.utils.ucb_list import block, blocks
+from shift_detector.utils.text_metadata_utils import codepoints, category_ids, id_histogram, UNICODE_CATEGORIES, \
+    letter_flags, segment_sums, ALPHA_FLAG, UPPER_FLAG
+from shift_detector.utils.ucb_list import block, blocks, block_ids, block_names, BMP_SIZE
 
 
 class TestUtils(unittest.TestCase):
@@ -48,6 +53,51 @@ class TestUtils(unittest.TestCase):
         self.assertFalse(is_categorical(self.df1['payment'], max_unique_fraction=0.05))
         self.assertFalse(is_categorical(self.df1['description']))
 
+    def test_is_categorical_is_stable(self):
+        column = pd.Series(list(range(12)) * 100)
+        self.assertEqual({is_categorical(column)}, {is_categorical(column) for _ in range(20)})
+
+    def test_column_statistics(self):
+        df = pd.DataFrame({'number': list(range(1000)), 'category': ['a', 'b', None, 'c'] * 250,
+                           'mixed': [1, 'a', 2.5, None] * 250})
+        statistics = column_statistics(df)
+        self.assertEqual(ColumnStatistics(100, 100), statistics['number'])
+        self.assertEqual(ColumnStatistics(100, 4), statistics['category'])
+        self.assertEqual(ColumnStatistics(100, 4), statistics['mixed'])
+        self.assertFalse(statistics['number'].is_categorical())
+        self.assertTrue(statistics['category'].is_categorical())
+        self.assertEqual(statistics, column_statistics(df))
+
+        with self.subTest("Short data frames are not sampled"):
+            self.assertEqual(ColumnStatistics(3, 3), column_statistics(df.head(3), ['category'])['category'])
+
+    def test_encode_columns(self):
+        codes1, codes2, dictionary = encode_columns(pd.Series([1, '1', 2.5, np.nan]), pd.Series(['b', None, 1]))
+        self.assertListEqual(['1', '2.5', 'None', 'b', 'nan'], list(dictionary))
+        self.assertListEqual(['1', '1', '2.5', 'nan'], list(dictionary[codes1]))
+        self.assertListEqual(['b', 'None', '1'], list(dictionary[codes2]))
+
+    def test_merge_encodings(self):
+        column1, column2 = pd.Series([1, '1', 2.5, np.nan]), pd.Series(['b', None, 1])
+        codes1, codes2, dictionary = merge_encodings(*encode_column(column1), *encode_column(column2))
+        expected_codes1, expected_codes2, expected_dictionary = encode_columns(column1, column2)
+        self.assertListEqual(list(expected_dictionary), list(dictionary))
+        self.assertListEqual(list(expected_codes1), list(codes1))
+        self.assertListEqual(list(expected_codes2), list(codes2))
+
+    def test_compact_codes(self):
+        used, codes = compact_codes(np.array([4, 1, 4, 4]), 5)
+        self.assertListEqual([1, 4], list(used))
+        self.assertListEqual([1, 0, 1, 1], list(codes))
+
+    def test_decode_values(self):
+        codes = np.array([1, 0, 1])
+        self.assertListEqual([3, 2, 3], list(decode_values([2, 3], codes)))
+        self.assertEqual(np.int64, decode_values([2, 3], codes).dtype)
+        self.assertEqual(object, decode_values([], np.array([], dtype=np.int64)).dtype)
+        words = decode_values([['a'], ['b', 'c']], codes)
+        self.assertListEqual([['b', 'c'], ['a'], ['b', 'c']], list(words))
+
     def test_is_binary(self):
         data = {
             'bool': [True, False, True] * 10,
@@ -86,3 +136,32 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(301, len(blocks))
         self.assertEqual((0, 127, 'Basic Latin'), blocks[0])
         self.assertEqual((1048576, 1114111, 'Supplementary Private Use Area-B'), blocks[-1])
+
+    def test_ucblist_block_ids(self):
+        def scan(codepoint):
+            return next((name for start, end, name in blocks if start <= codepoint <= end), None)
+
+        for name, codepoints in [('Basic Multilingual Plane', np.arange(0, BMP_SIZE, 3)),
+                                 ('all planes', np.arange(0, 0x110000, 97))]:
+            with self.subTest(name):
+                self.assertListEqual([scan(codepoint) for codepoint in codepoints],
+                                     [block_names[i] for i in block_ids(codepoints)])
+        self.assertEqual('Emoticons', block('\U0001F600'))
+
+    def test_unicode_category_ids(self):
+        text = 'Ab 1,\u0600\uDB80\U0001D504\U0001F600'
+        ids = category_ids(codepoints(text))
+        self.assertListEqual([unicodedata.category(c) for c in text], [UNICODE_CATEGORIES[i] for i in ids])
+        self.assertDictEqual({'Lu': 2, 'Ll': 1, 'Zs': 1, 'Nd': 1, 'Po': 1, 'Cf': 1, 'Cs': 1, 'So': 1},
+                             id_histogram(ids, UNICODE_CATEGORIES))
+
+    def test_letter_flags(self):
+        text = 'aB 1\u00df\u01c5\u0600\uDB80\U0001D504\U0001D586'
+        flags = letter_flags(codepoints(text))
+        self.assertListEqual([c.isalpha() for c in text], list(flags & ALPHA_FLAG > 0))
+        self.assertListEqual([c.isupper() for c in text], list(flags & UPPER_FLAG > 0))
+
+    def test_segment_sums(self):
+        self.assertListEqual([3, 0, 7, 0], list(segment_sums(np.array([1, 2, 3, 4]), np.array([2, 0, 2, 0]))))
+        self.assertListEqual([0, 0], list(segment_sums(np.array([], dtype=int), np.array([0, 0]))))
+        self.assertListEqual([0, 3], list(segment_sums(np.array([1, 1, 1], dtype=np.uint8), np.array([0, 3]))))
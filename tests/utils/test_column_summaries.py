@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.utils.column_summaries import NumericalSummary, CategoricalSummary, NGramSummary
+
+
+class TestColumnSummaries(unittest.TestCase):
+
+    def test_numerical_summary(self):
+        values = pd.Series([1.0, 2.0, np.nan, 4.0, 4.0, 10.0, np.nan, 3.5])
+        summary = NumericalSummary()
+        summary.update(values[:3])
+        summary.update(values[3:])
+        self.assertEqual(summary.count, 6)
+        self.assertEqual(summary.missing, 2)
+        self.assertAlmostEqual(summary.mean, values.mean())
+        self.assertAlmostEqual(summary.std(), values.std())
+        self.assertEqual(summary.min, 1.0)
+        self.assertEqual(summary.max, 10.0)
+        self.assertAlmostEqual(summary.completeness(), 0.75)
+        self.assertAlmostEqual(summary.categorical_summary().uniqueness(), 4 / 6)
+
+    def test_numerical_summary_stops_counting_distinct_values(self):
+        summary = NumericalSummary(max_distinct=5)
+        summary.update(pd.Series(range(10)))
+        self.assertIsNone(summary.categorical_summary())
+        self.assertEqual(summary.count, 10)
+
+    def test_categorical_summary(self):
+        summary = CategoricalSummary()
+        summary.update(pd.Series(['a', 'b', 'a', None]))
+        other = CategoricalSummary()
+        other.update(pd.Series(['c', 'a']))
+        summary.merge(other)
+        self.assertEqual(summary.counts, {'a': 3, 'b': 1, 'c': 1})
+        self.assertEqual(summary.count, 5)
+        self.assertAlmostEqual(summary.completeness(), 5 / 6)
+        self.assertAlmostEqual(summary.uniqueness(), 2 / 5)
+
+    def test_ngram_summary(self):
+        texts = pd.Series(['abcd', 'ABC', 'xyz'] * 100)
+        summary = NGramSummary(3)
+        summary.update(texts[:150])
+        summary.update(texts[150:])
+        self.assertEqual(summary.rows['all'], 300)
+        self.assertEqual(summary.rows['baseline'] + summary.rows['remaining'], 300)
+        self.assertGreater(summary.rows['baseline'], 0)
+        self.assertAlmostEqual(summary.normalized_histogram()[('a', 'b', 'c')], 2 / 3)
+
+        words = NGramSummary(2, words=True)
+        words.update(pd.Series(['one two three', 'two three']))
+        self.assertEqual(words.histograms['all'][('two', 'three')], 2)
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+import threading
+import unittest
+from enum import Enum
+
+import pandas as pd
+
+from shift_detector.utils.fingerprint import stable_fingerprint, data_fingerprint
+
+
+class Color(Enum):
+    red = 1
+    blue = 2
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_stable_fingerprint(self):
+        value = {'b': (1, 2.0, None), 'a': frozenset({'x', 'y'}), 'c': Color.red}
+        self.assertEqual(stable_fingerprint(value), stable_fingerprint(dict(reversed(list(value.items())))))
+        self.assertNotEqual(stable_fingerprint(1), stable_fingerprint(1.0))
+        self.assertNotEqual(stable_fingerprint(Color.red), stable_fingerprint(Color.blue))
+        self.assertNotEqual(stable_fingerprint((1, 2)), stable_fingerprint((2, 1)))
+        self.assertRaises(TypeError, stable_fingerprint, threading.Lock())
+
+    def test_fingerprint_is_equal_across_processes(self):
+        code = "from shift_detector.utils.fingerprint import stable_fingerprint; " \
+               "print(stable_fingerprint({'a': frozenset({'x', 'y'}), 'b': (1, 'text')}))"
+        output = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+        self.assertEqual(output, stable_fingerprint({'a': frozenset({'x', 'y'}), 'b': (1, 'text')}))
+
+    def test_data_fingerprint(self):
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+        self.assertEqual(data_fingerprint(df), data_fingerprint(df.copy().set_index('b', drop=False)))
+        self.assertNotEqual(data_fingerprint(df), data_fingerprint(df.iloc[::-1]))
+        self.assertNotEqual(data_fingerprint(df), data_fingerprint(df.rename(columns={'a': 'c'})))
+        self.assertNotEqual(data_fingerprint(df), data_fingerprint(df.astype({'a': float})))
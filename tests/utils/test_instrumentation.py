@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from shift_detector.utils import instrumentation as instrumentation_module
+from shift_detector.utils.instrumentation import Instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_measurements_are_attributed_to_checks(self):
+        instrumentation = Instrumentation()
+        with instrumentation.measure('check', 'SomeCheck'):
+            with instrumentation.measure('precalculation', 'SomePrecalculation', cache='miss') as record:
+                record['cache'] = 'disk'
+            instrumentation.record('precalculation', 'SomePrecalculation', 'hit')
+        with instrumentation.measure('precalculation', 'OtherPrecalculation'):
+            pass
+
+        profile = instrumentation.profile()
+        self.assertEqual(list(profile['name']), ['SomeCheck', 'SomePrecalculation', 'SomePrecalculation',
+                                                 'OtherPrecalculation'])
+        self.assertEqual(list(profile['check'].fillna('-')), ['SomeCheck', 'SomeCheck', 'SomeCheck', '-'])
+        self.assertEqual(list(profile['cache'].fillna('-')), ['-', 'disk', 'hit', '-'])
+        self.assertTrue((profile['wall_time'] >= 0).all())
+        self.assertTrue(profile['peak_memory'].isnull().all())
+
+    def test_peak_memory(self):
+        instrumentation = Instrumentation(trace_memory=True)
+        with instrumentation.measure('check', 'SomeCheck'):
+            with instrumentation.measure('precalculation', 'LargePrecalculation'):
+                large = bytearray(10 ** 7)
+                del large
+            with instrumentation.measure('precalculation', 'SmallPrecalculation'):
+                small = bytearray(10 ** 3)
+                del small
+
+        peak_memory = instrumentation.profile().set_index('name')['peak_memory']
+        self.assertGreaterEqual(peak_memory['LargePrecalculation'], 10 ** 7)
+        self.assertLess(peak_memory['SmallPrecalculation'], 10 ** 6)
+        self.assertGreaterEqual(peak_memory['SomeCheck'], 10 ** 7)
+
+    def test_measurements_without_thread_time_and_reset_peak(self):
+        with mock.patch.object(instrumentation_module, 'thread_time', time.process_time), \
+                mock.patch.object(instrumentation_module, 'reset_peak', None):
+            instrumentation = Instrumentation(trace_memory=True)
+            with instrumentation.measure('check', 'SomeCheck'):
+                with instrumentation.measure('precalculation', 'LargePrecalculation'):
+                    large = bytearray(10 ** 7)
+                    del large
+
+        profile = instrumentation.profile().set_index('name')
+        self.assertTrue((profile['cpu_time'] >= 0).all())
+        self.assertGreaterEqual(profile['peak_memory']['LargePrecalculation'], 10 ** 7)
+        self.assertGreaterEqual(profile['peak_memory']['SomeCheck'], 10 ** 7)
+
+    def test_chrome_trace(self):
+        instrumentation = Instrumentation()
+        with instrumentation.measure('check', 'SomeCheck'):
+            instrumentation.record('precalculation', 'SomePrecalculation', 'hit')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            instrumentation.to_chrome_trace(path)
+            with open(path) as file:
+                events = json.load(file)['traceEvents']
+        self.assertEqual([event['name'] for event in events], ['SomeCheck', 'SomePrecalculation'])
+        self.assertEqual(events[1]['args'], {'check': 'SomeCheck', 'cache': 'hit', 'cpu_time': 0.0})
+        self.assertTrue(all(event['ph'] == 'X' for event in events))
@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+
+import langdetect
+
+from shift_detector.utils.language_identification import LanguageIdentifier, language_identifier
+
+
+class TestLanguageIdentification(unittest.TestCase):
+
+    def setUp(self):
+        self.texts = ['This is a normal sentence. This is for testing.', 'Dies ist ein einfacher Satz.',
+                      'Ceci est une phrase simple.', '1234 5678']
+
+    def test_languages_equal_langdetect(self):
+        identifier = LanguageIdentifier(seed=0)
+        for text in self.texts[:3]:
+            with self.subTest(text=text):
+                langdetect.DetectorFactory.seed = 0
+                self.assertEqual(langdetect.detect(text), identifier.identify(text))
+        self.assertIsNone(identifier.identify(self.texts[3]))
+        self.assertListEqual(['en', 'de', 'fr', None, 'en'], identifier.identify_batch(self.texts + self.texts[:1]))
+
+    def test_languages_are_memoized(self):
+        identifier = LanguageIdentifier(cache_size=2)
+        identifier.identify_batch(self.texts[:2] * 3)
+        self.assertListEqual(self.texts[:2], list(identifier.languages))
+
+        with mock.patch.object(langdetect.detector.Detector, 'detect', return_value='xx') as detect:
+            self.assertListEqual(['en', 'de', 'xx'], identifier.identify_batch(self.texts[:3]))
+        self.assertEqual(1, detect.call_count)
+        self.assertListEqual(self.texts[1:3], list(identifier.languages))
+
+    def test_bounded_prefix(self):
+        text = self.texts[1] + ' ' + self.texts[0] * 20
+        self.assertEqual('en', LanguageIdentifier().identify(text))
+        self.assertEqual('de', LanguageIdentifier(max_length=len(self.texts[1])).identify(text))
+        self.assertRaises(ValueError, lambda: LanguageIdentifier(max_length=0))
+
+    def test_shared_identifiers(self):
+        self.assertIs(language_identifier(0), language_identifier(0))
+        self.assertIsNot(language_identifier(0), language_identifier(1))
+        self.assertIsNot(language_identifier(0), language_identifier(0, 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.utils.memory import estimate_size
+
+
+class TestMemory(unittest.TestCase):
+
+    def test_estimate_size_of_data_frames(self):
+        df = pd.DataFrame({'numbers': np.arange(1000),
+                           'texts': ['text number {}'.format(i) for i in range(1000)]})
+        deep_size = df.memory_usage(index=True, deep=True).sum()
+        self.assertAlmostEqual(estimate_size(df), deep_size, delta=deep_size * 0.1)
+
+    def test_estimate_size_of_collections(self):
+        array = np.zeros(1000)
+        self.assertGreaterEqual(estimate_size((array, array)), 2 * array.nbytes)
+        self.assertGreater(estimate_size({'a': list(range(1000))}), estimate_size({'a': list(range(10))}))
+        self.assertGreater(estimate_size([array] * 1000), 1000 * array.nbytes)
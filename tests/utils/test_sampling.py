@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from shift_detector.utils.sampling import sample_rows, ReservoirSampler, stratum_quotas
+
+
+class TestSampling(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({'number': np.arange(1000), 'stratum': ['a'] * 900 + ['b'] * 90 + [None] * 10},
+                               index=np.arange(1000) * 2)
+
+    def test_strategies(self):
+        for strategy in ['uniform', 'reservoir', 'stratified']:
+            with self.subTest(strategy=strategy):
+                sample = sample_rows(self.df, 100, strategy, seed=3, stratify_by='stratum')
+                self.assertEqual(100, len(sample))
+                self.assertTrue(sample['number'].is_unique)
+                self.assertTrue(sample['number'].is_monotonic_increasing)
+                self.assertTrue((sample.index == sample['number'] * 2).all())
+                pd.testing.assert_frame_equal(sample, sample_rows(self.df, 100, strategy, seed=3,
+                                                                   stratify_by='stratum'))
+
+        with self.subTest("Small data frames are not sampled"):
+            self.assertIs(self.df, sample_rows(self.df, 1000))
+
+    def test_stratified(self):
+        sample = sample_rows(self.df, 100, 'stratified', stratify_by='stratum')
+        self.assertEqual({'a': 90, 'b': 9, None: 1},
+                         sample['stratum'].value_counts(dropna=False).rename(lambda v: v if v == v else None)
+                         .to_dict())
+        self.assertEqual([1, 1, 1], list(stratum_quotas(np.array([5, 5, 5]), 3)))
+        self.assertEqual(7, stratum_quotas(np.array([10, 3, 1]), 7).sum())
+
+    def test_reservoir_sampler_is_uniform(self):
+        counts = np.zeros(50)
+        data = pd.DataFrame({'number': np.arange(50)})
+        for seed in range(300):
+            sampler = ReservoirSampler(10, seed)
+            for start in range(0, 50, 7):
+                sampler.update(data.iloc[start:start + 7])
+            counts[sampler.sample()['number']] += 1
+        self.assertTrue(np.all(np.abs(counts - 60) < 30))
+
+    def test_invalid_parameters(self):
+        self.assertRaises(ValueError, sample_rows, self.df, 0)
+        self.assertRaises(ValueError, sample_rows, self.df, 10, 'systematic')
+        self.assertRaises(ValueError, sample_rows, self.df, 10, 'stratified')
+        self.assertRaises(ValueError, sample_rows, self.df, 10, 'stratified', stratify_by='no_column')
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from shift_detector.utils.sketches import QuantileSketch
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.RandomState(0).normal(size=200000)
+        self.points = np.linspace(-3, 3, 25)
+        self.exact_cdf = np.searchsorted(np.sort(self.values), self.points, side='right') / len(self.values)
+
+    def test_cdf_is_within_error_bound(self):
+        sketch = QuantileSketch()
+        for chunk in np.array_split(self.values, 20):
+            sketch.update(chunk)
+        self.assertEqual(len(sketch), len(self.values))
+        self.assertLess(sum(len(compactor) for compactor in sketch.compactors), 3 * sketch.k)
+        error = np.max(np.abs(sketch.cdf(self.points) - self.exact_cdf))
+        self.assertLessEqual(error, sketch.rank_error())
+        self.assertLess(error, 0.01)
+
+    def test_merge(self):
+        sketch1 = QuantileSketch()
+        sketch2 = QuantileSketch()
+        sketch1.update(self.values[:50000])
+        sketch2.update(self.values[50000:])
+        sketch1.merge(sketch2)
+        self.assertEqual(len(sketch1), len(self.values))
+        self.assertEqual(sketch1.min, self.values.min())
+        self.assertEqual(sketch1.max, self.values.max())
+        self.assertLess(np.max(np.abs(sketch1.cdf(self.points) - self.exact_cdf)), 0.01)
+        self.assertRaises(ValueError, sketch1.merge, QuantileSketch(k=10))
+
+    def test_quantile(self):
+        sketch = QuantileSketch()
+        sketch.update(self.values)
+        np.testing.assert_allclose(sketch.quantile([0.25, 0.5, 0.75]),
+                                   np.quantile(self.values, [0.25, 0.5, 0.75]), atol=0.02)
+        small = QuantileSketch()
+        small.update([3, 1, float('nan'), 2])
+        self.assertEqual(len(small), 3)
+        self.assertEqual(small.quantile(0.5), 2)
+        self.assertTrue(np.isnan(QuantileSketch().quantile(0.5)))
+
+    def test_sketch_is_deterministic(self):
+        sketch1 = QuantileSketch(k=50)
+        sketch2 = QuantileSketch(k=50)
+        sketch1.update(self.values)
+        sketch2.update(self.values)
+        np.testing.assert_array_equal(sketch1.weighted_items()[0], sketch2.weighted_items()[0])